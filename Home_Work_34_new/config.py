@@ -1,4 +1,5 @@
 # config.py
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -8,6 +9,14 @@ class Settings(BaseSettings):
     # tg_bot_key: str = Field(..., description="Telegram Bot API Key") # Старое имя, оставлено для совместимости
     telegram_bot_api_key: str = Field(..., description="Telegram Bot API Key")
     telegram_user_id: str = Field(..., description="Telegram Chat ID для получения уведомлений")
+    # Диспетчер уведомлений: общий клиент, сводки и ограничение частоты
+    telegram_api_base_url: Optional[str] = Field(None, description="Базовый URL Bot API (например, локальный фейковый сервер)")
+    telegram_digest_window_seconds: float = Field(2.0, description="Окно объединения сообщений в сводку, с")
+    telegram_digest_max_messages: int = Field(20, description="Максимум сообщений в одной сводке")
+    telegram_rate_per_second: float = Field(1.0, description="Лимит сообщений в секунду на чат")
+    telegram_rate_burst: int = Field(3, description="Допустимая пачка сообщений подряд")
+    telegram_max_retries: int = Field(5, description="Количество повторов при сетевых ошибках")
+    telegram_drain_timeout_seconds: float = Field(10.0, description="Сколько ждать отправки очереди при остановке, с")
 
     class Config:
         env_file = ".env"
@@ -1,15 +1,33 @@
 # main.py
+import logging
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 # Импортируем роутер для продуктов
 from routes.products import router as products_router
 # Импортируем настройки
 from config import settings
+# Импортируем диспетчер уведомлений Telegram
+from utils.telegram import dispatcher
+
+# Настройка логирования
+logging.basicConfig(level=logging.INFO)
+
+# Контекстный менеджер для управления жизненным циклом приложения
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускает диспетчер уведомлений при старте и отправляет остаток очереди при остановке
+    """
+    await dispatcher.start()
+    yield
+    await dispatcher.stop()
 
 # Создаем экземпляр FastAPI приложения
 app = FastAPI(
     title="Бондарчук Андрей — Домашнее задание №34",
     description="Рефакторинг REST API для интернет-магазина товаров из вселенной Рика и Морти",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Подключаем роутер для продуктов к главному приложению
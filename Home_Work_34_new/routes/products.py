@@ -175,8 +175,7 @@ from fastapi import APIRouter, HTTPException, Path, Query, BackgroundTasks
 from typing import List, Optional
 from schemas.product import Product
 from schemas.product_create import ProductCreate
-from data.products import products
-from utils.helpers import get_next_id
+from utils.product_store import product_store
 from utils.telegram import send_telegram_message
 
 router = APIRouter(
@@ -194,9 +193,21 @@ router = APIRouter(
 async def get_products(
     search: Optional[str] = Query(None, description="Поиск по названию или описанию"),
     currency: Optional[str] = Query(None, description="Валюта для сортировки (shmeckles, credits, flurbos)"),
-    sort_order: Optional[str] = Query(None, description="Направление сортировки (asc, desc)")
+    sort_order: Optional[str] = Query(None, description="Направление сортировки (asc, desc)"),
+    skip: int = Query(0, ge=0, description="Сколько продуктов пропустить"),
+    limit: Optional[int] = Query(None, ge=1, description="Максимум продуктов в ответе (по умолчанию — все)")
 ):
-    result = products
+    if currency and sort_order and not search:
+        # Страница берётся прямо из отсортированного индекса цен — O(limit), без обхода каталога
+        return product_store.sorted_by_price(
+            currency,
+            descending=sort_order.lower() == "desc",
+            missing_value=float('inf'),
+            offset=skip,
+            limit=limit
+        )
+
+    result = product_store.all()
 
     if search:
         result = [
@@ -205,20 +216,16 @@ async def get_products(
         ]
 
     if currency and sort_order:
-        if any(currency in product["prices"] for product in result):
-            reverse = sort_order.lower() == "desc"
-            try:
-                result = sorted(
-                    result,
-                    key=lambda p: p["prices"].get(currency, float('inf')),  # изменения здесь
-                    reverse=reverse
-                )
-            except TypeError:
-                raise HTTPException(status_code=500, detail="Ошибка сортировки: неверный формат цены")
-        else:
-            result = []
-
-    return result
+        # Результаты поиска упорядочиваются по индексу цен, без сортировки на каждый запрос.
+        # Товары без цены в валюте идут последними (как key=float('inf'))
+        result = product_store.sorted_by_price(
+            currency,
+            descending=sort_order.lower() == "desc",
+            missing_value=float('inf'),
+            candidates=result
+        )
+
+    return result[skip:None if limit is None else skip + limit]
 
 
 # --- READ (One) ---
@@ -231,10 +238,10 @@ async def get_products(
 async def get_product(
     product_id: int = Path(..., ge=1, description="ID продукта")
 ):
-    for product in products:
-        if product["id"] == product_id:
-            return product
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    product = product_store.get(product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return product
 
 
 # --- CREATE ---
@@ -248,12 +255,7 @@ async def create_product(
     product_data: ProductCreate,  # Параметр без умолчания
     background_tasks: BackgroundTasks = None  # Параметр с умолчанием
 ):
-    new_id = get_next_id()
-    new_product = {
-        "id": new_id,
-        **product_data.dict()  # Здесь используйте dict()
-    }
-    products.append(new_product)
+    new_product = product_store.create(product_data.dict())
 
     message = f"""🆕 *Создан новый продукт*
 
@@ -280,27 +282,21 @@ async def update_product(
     product_id: int = Path(..., ge=1, description="ID продукта"),  # Обязательный параметр
     background_tasks: BackgroundTasks = None  # Параметр с умолчанием
 ):
-    for i, product in enumerate(products):
-        if product["id"] == product_id:
-            updated_product = {
-                "id": product_id,
-                **product_data.dict()  # Здесь используйте dict()
-            }
-            products[i] = updated_product
+    updated_product = product_store.update(product_id, product_data.dict())
+    if updated_product is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
 
-            message = f"""🔄 *Обновлён продукт*
+    message = f"""🔄 *Обновлён продукт*
 
 📦 *Название:* {updated_product['name']}
 🆔 *ID:* {updated_product['id']}
 📝 *Описание:* {updated_product['description'][:100]}...
 💰 *Цены:* `{updated_product['prices']}`
-            """
-
-            background_tasks.add_task(send_telegram_message, message)
+    """
 
-            return updated_product
+    background_tasks.add_task(send_telegram_message, message)
 
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    return updated_product
 
 
 # --- DELETE ---
@@ -312,11 +308,9 @@ async def update_product(
 async def delete_product(
     product_id: int = Path(..., ge=1, description="ID продукта")  # Обязательный параметр
 ):
-    for i, product in enumerate(products):
-        if product["id"] == product_id:
-            products.pop(i)
-            return  # Удаляем успешно, возвращаем 204 без содержимого
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    if not product_store.delete(product_id):
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return  # Удаляем успешно, возвращаем 204 без содержимого
 
 
 
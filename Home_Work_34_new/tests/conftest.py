@@ -0,0 +1,32 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+# Настройки читаются при импорте приложения; токен Telegram пустой — уведомления отключены
+os.environ.update(TELEGRAM_BOT_API_KEY="", TELEGRAM_USER_ID="1")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from shop_common.product_store import ProductStore  # noqa: E402
+
+import routes.products  # noqa: E402
+from data.products import products  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture
+def store(monkeypatch) -> ProductStore:
+    """Своё хранилище на каждый тест: изменения не переходят в следующие тесты"""
+    fresh = ProductStore(products)
+    monkeypatch.setattr(routes.products, "product_store", fresh)
+
+    async def skip_notification(message: str, parse_mode: str = "Markdown") -> None:
+        pass
+
+    monkeypatch.setattr(routes.products, "send_telegram_message", skip_notification)
+    return fresh
+
+
+@pytest.fixture
+def client(store):
+    return TestClient(app)
@@ -0,0 +1,59 @@
+# tests/test_products.py
+import pytest
+
+from data.products import products
+
+
+def names(response) -> list[str]:
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()]
+
+
+def expected_by_price(items: list[dict], currency: str, descending: bool) -> list[str]:
+    ordered = sorted(items, key=lambda product: product["prices"].get(currency, float("inf")), reverse=descending)
+    return [product["name"] for product in ordered]
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_price_sort_matches_sorted(client, sort_order):
+    response = client.get("/products/", params={"currency": "credits", "sort_order": sort_order})
+
+    assert names(response) == expected_by_price(products, "credits", sort_order == "desc")
+
+
+def test_sorted_pages_are_slices_of_full_order(client):
+    expected = expected_by_price(products, "flurbos", descending=False)
+
+    for skip in range(0, len(products), 3):
+        response = client.get("/products/", params={"currency": "flurbos", "sort_order": "asc", "skip": skip, "limit": 3})
+        assert names(response) == expected[skip:skip + 3]
+
+
+def test_search_results_are_sorted_by_price(client):
+    found = [product for product in products if "просто" in (product["name"] + product["description"]).lower()]
+    assert len(found) > 1
+
+    response = client.get("/products/", params={"search": "просто", "currency": "shmeckles", "sort_order": "desc"})
+
+    assert names(response) == expected_by_price(found, "shmeckles", descending=True)
+
+
+def test_created_and_deleted_products_update_price_order(client):
+    created = client.post("/products/", json={
+        "name": "Самый дешёвый",
+        "description": "Дешевле всех в каталоге",
+        "prices": {"credits": 0.01},
+        "image_url": "/images/cheap.webp",
+    }).json()
+
+    first = client.get("/products/", params={"currency": "credits", "sort_order": "asc", "limit": 1})
+    assert names(first) == ["Самый дешёвый"]
+
+    assert client.delete(f"/products/{created['id']}").status_code == 204
+    first = client.get("/products/", params={"currency": "credits", "sort_order": "asc", "limit": 1})
+    assert names(first) == expected_by_price(products, "credits", descending=False)[:1]
+
+
+def test_missing_product_is_404(client):
+    assert client.get("/products/100000").status_code == 404
+    assert client.delete("/products/100000").status_code == 404
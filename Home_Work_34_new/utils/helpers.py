@@ -1,11 +1,9 @@
 # utils/helpers.py
-# Обновлен импорт, чтобы указывать на новый путь к файлу products.py
-from data.products import products
+# Следующий ID выдаёт хранилище товаров по счётчику, без перебора списка
+from utils.product_store import product_store
 
 def get_next_id():
     """
     Возвращает следующий доступный ID.
     """
-    if not products:
-        return 1
-    return max(product["id"] for product in products) + 1
\ No newline at end of file
+    return product_store.peek_next_id()
\ No newline at end of file
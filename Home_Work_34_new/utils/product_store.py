@@ -0,0 +1,8 @@
+# utils/product_store.py
+# Индексированное хранилище товаров: реализация общая — пакет shop_common
+from shop_common.product_store import ProductStore
+
+from data.products import products
+
+# Общее хранилище приложения, заполненное датасетом
+product_store = ProductStore(products)
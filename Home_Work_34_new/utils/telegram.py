@@ -1,32 +1,54 @@
 # utils/telegram.py
+# Диспетчер уведомлений: реализация общая — пакет shop_common
 import logging
+
 import telegram
+from shop_common.telegram_dispatcher import TelegramDispatcher
 from config import settings
 
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG)
+# Общий диспетчер приложения (запускается в lifespan)
+dispatcher = TelegramDispatcher(
+    token=settings.telegram_bot_api_key,
+    chat_id=settings.telegram_user_id,
+    base_url=settings.telegram_api_base_url,
+    window_seconds=settings.telegram_digest_window_seconds,
+    max_batch=settings.telegram_digest_max_messages,
+    rate_per_second=settings.telegram_rate_per_second,
+    burst=settings.telegram_rate_burst,
+    max_retries=settings.telegram_max_retries,
+    drain_timeout=settings.telegram_drain_timeout_seconds,
+)
 
 
 async def send_telegram_message(message: str, parse_mode: str = "Markdown") -> None:
-    """Отправка сообщения в Telegram через бота"""
+    """
+    Отправка сообщения в Telegram через бота.
+    Если диспетчер запущен, сообщение ставится в его очередь;
+    иначе (например, из скриптов) отправляется напрямую.
+
+    Args:
+        message (str): Текст сообщения для отправки.
+        parse_mode (str, optional): Режим форматирования текста. Defaults to "Markdown".
+    """
+    if dispatcher.running:
+        dispatcher.enqueue(message, parse_mode)
+        return
+
     try:
-        bot = telegram.Bot(token=settings.telegram_bot_api_key)
-        await bot.send_message(
-            chat_id=settings.telegram_user_id,
-            text=message,
-            parse_mode=parse_mode
-        )
-        # Логируем успешную отправку
+        kwargs = {"base_url": settings.telegram_api_base_url} if settings.telegram_api_base_url else {}
+        async with telegram.Bot(token=settings.telegram_bot_api_key, **kwargs) as bot:
+            await bot.send_message(
+                chat_id=settings.telegram_user_id,
+                text=message,
+                parse_mode=parse_mode
+            )
         logging.info(
-            f'Сообщение "{message}" отправлено в чат {settings.telegram_user_id}'
+            f'Сообщение "{message[:50]}..." отправлено в чат {settings.telegram_user_id}' # Логируем начало сообщения
         )
     except Exception as e:
-        # Логируем ошибку, если она произошла
         logging.error(
             f"Ошибка отправки сообщения в чат {settings.telegram_user_id}: {e}"
         )
-        # Пробрасываем исключение дальше
-        raise
+        raise # Пробрасываем исключение дальше, чтобы FastAPI мог его обработать, если нужно
     else:
-        # Логируем успешную отправку (альтернативно или дополнительно)
-        logging.debug(f"Сообщение успешно отправлено: {message}")
\ No newline at end of file
+        logging.debug(f"Сообщение успешно отправлено в чат {settings.telegram_user_id}")
@@ -17,6 +17,9 @@ class Settings(BaseSettings):
         ..., 
         description="URL для подключения к базе данных"
     )
+    # Метрики Prometheus (/metrics) и журнал медленных SQL-запросов
+    metrics_enabled: bool = Field(True, description="Собирать метрики HTTP и SQL и отдавать их на /metrics")
+    slow_query_ms: float = Field(200.0, description="Порог медленного SQL-запроса для журнала, мс")
 
 
     class Config:
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте приложения: БД — во временной папке
+WORK_DIR = tempfile.mkdtemp(prefix="shop-tests-")
+os.chdir(WORK_DIR)
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{WORK_DIR}/test.db",
+    TG_BOT_KEY="test-bot-key",
+    TELEGRAM_BOT_API_KEY="",
+    TELEGRAM_USER_ID="1",
+    METRICS_ENABLED="true",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+engine.echo = False
+
+
+@pytest.fixture
+def client():
+    # lifespan вызывает init_db и создаёт таблицы
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
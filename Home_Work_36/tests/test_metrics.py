@@ -0,0 +1,32 @@
+# tests/test_metrics.py
+import re
+
+
+def series(text: str, name: str) -> dict[str, float]:
+    """Временные ряды метрики: строка меток -> значение"""
+    values = {}
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{name}\{{(.*)\}} (\S+)", line)
+        if match:
+            values[match.group(1)] = float(match.group(2))
+    return values
+
+
+def test_metrics_use_route_templates(client):
+    for product_id in (101, 102, 103):
+        client.get(f"/products/{product_id}")
+
+    text = client.get("/metrics").text
+
+    labels = series(text, "http_requests_total")
+    assert labels['method="GET",route="/products/{product_id}",status="404"'] >= 3
+    # Фактические id в метки не попадают
+    assert not any("101" in label for label in labels)
+
+
+def test_metrics_include_sql_timing(client):
+    client.get("/products/101")
+
+    text = client.get("/metrics").text
+
+    assert series(text, "db_query_duration_seconds_count").get('operation="SELECT"', 0) >= 1
@@ -1,4 +1,5 @@
 # core/config.py
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -12,11 +13,22 @@ class Settings(BaseSettings):
     tg_bot_key: str = Field(..., description="Telegram Bot API Key (from previous HW)")
     telegram_bot_api_key: str = Field(..., description="Telegram Bot API Token")
     telegram_user_id: str = Field(..., description="Telegram Chat ID for notifications")
+    # Диспетчер уведомлений: общий клиент, сводки и ограничение частоты
+    telegram_api_base_url: Optional[str] = Field(None, description="Базовый URL Bot API (например, локальный фейковый сервер)")
+    telegram_digest_window_seconds: float = Field(2.0, description="Окно объединения сообщений в сводку, с")
+    telegram_digest_max_messages: int = Field(20, description="Максимум сообщений в одной сводке")
+    telegram_rate_per_second: float = Field(1.0, description="Лимит сообщений в секунду на чат")
+    telegram_rate_burst: int = Field(3, description="Допустимая пачка сообщений подряд")
+    telegram_max_retries: int = Field(5, description="Количество повторов при сетевых ошибках")
+    telegram_drain_timeout_seconds: float = Field(10.0, description="Сколько ждать отправки очереди при остановке, с")
     # Новое поле для подключения к БД
     database_url: str = Field(
         ..., 
         description="URL для подключения к базе данных"
     )
+    # Метрики Prometheus (/metrics) и журнал медленных SQL-запросов
+    metrics_enabled: bool = Field(True, description="Собирать метрики HTTP и SQL и отдавать их на /metrics")
+    slow_query_ms: float = Field(200.0, description="Порог медленного SQL-запроса для журнала, мс")
 
 
     class Config:
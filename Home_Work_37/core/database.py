@@ -8,6 +8,8 @@ import asyncio
 from models.base import Base  # Импортируем Base из пакета models
 from models.product import Product  # noqa: F401 (импортируем, чтобы зарегистрировать модель)
 from models.category import Category  # noqa: F401 (импортируем, чтобы зарегистрировать модель)
+# Импорт также регистрирует создание полнотекстового индекса FTS5 вместе с products
+from models.product_search import rebuild_search_index
 
 # URL для подключения к асинхронной SQLite
 DATABASE_URL = settings.database_url
@@ -34,8 +36,13 @@ async def init_db():
     Инициализация базы данных:
     - Удаляет все существующие таблицы (для чистоты эксперимента)
     - Создает таблицы заново на основе зарегистрированных моделей
+    - Строит полнотекстовый индекс по уже существующим товарам
     """
     async with engine.begin() as conn:
         # Для чистоты эксперимента будем удалять таблицы и пересоздавать их
         await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        # Если drop_all убрать, products сохранится, а индекс для неё не создастся
+        # событием after_create — поэтому индекс всегда перестраивается по текущим товарам
+        if conn.dialect.name == "sqlite":
+            await rebuild_search_index(conn)
\ No newline at end of file
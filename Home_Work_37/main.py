@@ -1,4 +1,5 @@
 # main.py
+import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 # Импортируем роутеры для продуктов и категорий
@@ -7,8 +8,14 @@ from routes.categories import router as categories_router
 # Импортируем настройки из нового места
 from core.config import settings
 # Импортируем функцию инициализации БД
-from core.database import init_db
+from core.database import engine, init_db
+# Метрики HTTP и SQL в формате Prometheus
+from shop_common.metrics import MetricsMiddleware, install_sql_metrics, metrics_response
+# Импортируем диспетчер уведомлений Telegram
+from utils.telegram import dispatcher
 
+# Настройка логирования
+logging.basicConfig(level=logging.INFO)
 
 # Контекстный менеджер для управления жизненным циклом приложения
 @asynccontextmanager
@@ -19,10 +26,12 @@ async def lifespan(app: FastAPI):
     # Код, который выполняется при запуске приложения
     await init_db()
     print("База данных инициализирована")
+    await dispatcher.start()
     
     yield  # Здесь приложение работает
     
     # Код, который выполняется при остановке приложения
+    await dispatcher.stop()
     print("Приложение остановлено")
 
 
@@ -34,6 +43,16 @@ app = FastAPI(
     lifespan=lifespan  # Передаем lifespan
 )
 
+# Метрики: задержка по маршрутам, запросы в обработке, статусы, время SQL
+if settings.metrics_enabled:
+    install_sql_metrics(engine, settings.slow_query_ms)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики в формате Prometheus"""
+        return metrics_response()
+
 # Подключаем роутеры для продуктов и категорий к главному приложению
 app.include_router(products_router)
 app.include_router(categories_router)
@@ -0,0 +1,114 @@
+# models/product_search.py
+import re
+from typing import Optional
+
+from sqlalchemy import DDL, Column, Integer, MetaData, Table, Text, event, func, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from models.product import Product
+
+# Имя виртуальной таблицы полнотекстового индекса (SQLite FTS5)
+FTS_TABLE = "products_fts"
+
+# Вес совпадений в названии относительно описания при ранжировании (bm25)
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def normalize_text(value: str) -> str:
+    """
+    Нормализация русского текста для индекса и запросов.
+    Регистр Кириллицы FTS5 (unicode61) сворачивает сам, а "ё" и "е" — нет.
+    """
+    return value.replace("ё", "е").replace("Ё", "Е")
+
+
+# SQL-выражение той же нормализации для триггеров
+def _normalized_sql(column: str) -> str:
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+# Описание виртуальной таблицы для построения запросов.
+# Отдельный MetaData: create_all не должен создавать её как обычную таблицу.
+products_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("name", Text),
+    Column("description", Text),
+    # Скрытый столбец с именем таблицы — левая часть оператора MATCH
+    Column(FTS_TABLE, Text),
+)
+
+# Индекс хранит собственную нормализованную копию текста.
+# prefix='2 3' — дополнительные префиксные индексы для быстрых запросов "плю*"
+CREATE_FTS_TABLE = DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', "
+    "prefix = '2 3')"
+)
+
+# Триггеры поддерживают индекс в актуальном состоянии при любых изменениях products
+CREATE_FTS_TRIGGERS = [
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+        f"VALUES (new.id, {_normalized_sql('new.name')}, {_normalized_sql('new.description')}); "
+        "END"
+    ),
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+        "END"
+    ),
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON products BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+        f"VALUES (new.id, {_normalized_sql('new.name')}, {_normalized_sql('new.description')}); "
+        "END"
+    ),
+]
+
+DROP_FTS_TABLE = DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+# Индекс создаётся и удаляется вместе с таблицей products (только для SQLite)
+event.listen(Product.__table__, "after_create", CREATE_FTS_TABLE.execute_if(dialect="sqlite"))
+for trigger in CREATE_FTS_TRIGGERS:
+    event.listen(Product.__table__, "after_create", trigger.execute_if(dialect="sqlite"))
+event.listen(Product.__table__, "before_drop", DROP_FTS_TABLE.execute_if(dialect="sqlite"))
+
+
+async def rebuild_search_index(conn: AsyncConnection) -> None:
+    """
+    Полностью перестраивает индекс по текущему содержимому products.
+    Нужна для баз, созданных до появления полнотекстового поиска.
+    """
+    await conn.execute(text(CREATE_FTS_TABLE.statement))
+    for trigger in CREATE_FTS_TRIGGERS:
+        await conn.execute(text(trigger.statement))
+    await conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    await conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+        f"SELECT id, {_normalized_sql('name')}, {_normalized_sql('description')} FROM products"
+    ))
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    Превращает пользовательский ввод в выражение FTS5 MATCH.
+    Каждое слово экранируется кавычками и ищется по префиксу,
+    слова объединяются через AND: "порт пушк" найдёт "Портальная пушка".
+
+    Returns:
+        Optional[str]: Выражение MATCH или None, если в запросе нет слов
+    """
+    terms = re.findall(r"\w+", normalize_text(search))
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_rank():
+    """Релевантность bm25 (меньше — лучше) с приоритетом совпадений в названии"""
+    return func.bm25(literal_column(FTS_TABLE), NAME_WEIGHT, DESCRIPTION_WEIGHT)
@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 from core.database import AsyncSessionLocal
 from models.product import Product as ProductModel  # Импортируем ORM-модель как ProductModel
 from models.category import Category as CategoryModel  # Импортируем ORM-модель категории
+from models.product_search import products_fts, build_match_query, search_rank
 # Импорт функции для отправки уведомлений
 from utils.telegram import send_telegram_message
 
@@ -41,7 +42,17 @@ async def get_products(
         query = select(ProductModel).options(selectinload(ProductModel.category))
 
         # Фильтрация поиска
-        if search:
+        # В SQLite используем полнотекстовый индекс FTS5 (префиксный поиск, ранжирование);
+        # LIKE '%...%' остаётся запасным вариантом для других СУБД и запросов без слов
+        match_query = build_match_query(search) if search else None
+        ranked = False
+        if match_query and session.bind.dialect.name == "sqlite":
+            query = (
+                query.join(products_fts, products_fts.c.rowid == ProductModel.id)
+                .where(products_fts.c.products_fts.op("MATCH")(match_query))
+            )
+            ranked = True
+        elif search:
             query = query.where(
                 or_(
                     ProductModel.name.ilike(f"%{search}%"),
@@ -62,6 +73,9 @@ async def get_products(
             except AttributeError:
                 # Если валюта не найдена в модели (например, price_undefined)
                 raise HTTPException(status_code=400, detail=f"Неподдерживаемая валюта для сортировки: {currency}")
+        elif ranked:
+            # Без явной сортировки выдаём самые релевантные результаты первыми
+            query = query.order_by(search_rank())
 
         # Выполняем запрос
         result = await session.execute(query)
@@ -0,0 +1,59 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте приложения: БД — во временной папке,
+# токен Telegram пустой — уведомления отключены
+WORK_DIR = tempfile.mkdtemp(prefix="shop-tests-")
+os.chdir(WORK_DIR)
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{WORK_DIR}/test.db",
+    TG_BOT_KEY="test-bot-key",
+    TELEGRAM_BOT_API_KEY="",
+    TELEGRAM_USER_ID="1",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.database import AsyncSessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models.category import Category  # noqa: E402
+from models.product import Product  # noqa: E402
+
+# SQL в консоль не нужен
+engine.echo = False
+
+PRODUCTS = [
+    ("Стандартный Плюмбус", "Каждый дом должен иметь плюмбус", 30.0),
+    ("Коробка с Мисиксами", "Ёлочная игрушка и помощь по дому", 80.0),
+    ("Портальная пушка", "Слегка поцарапана, плюмбус не прилагается", 500.0),
+]
+
+
+async def seed_products() -> None:
+    async with AsyncSessionLocal() as session:
+        category = Category(name="Гаджеты")
+        session.add(category)
+        await session.flush()
+        for name, description, price in PRODUCTS:
+            session.add(Product(
+                name=name,
+                description=description,
+                image_url="/static/placeholder.png",
+                price_shmeckles=price,
+                price_flurbos=price,
+                price_credits=price,
+                category_id=category.id,
+            ))
+        await session.commit()
+
+
+@pytest.fixture
+def client():
+    # lifespan вызывает init_db: таблицы и индекс FTS создаются заново для каждого теста
+    with TestClient(app) as test_client:
+        test_client.portal.call(seed_products)
+        yield test_client
+        test_client.portal.call(engine.dispose)
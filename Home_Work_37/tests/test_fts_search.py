@@ -0,0 +1,70 @@
+# tests/test_fts_search.py
+import pytest
+from sqlalchemy import text
+
+from core.database import engine
+from models.product_search import build_match_query, rebuild_search_index
+
+
+def search(client, query: str, **params) -> list[str]:
+    response = client.get("/products/", params={"search": query, **params})
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("плюмбус", '"плюмбус"*'),
+    ("порт пушк", '"порт"* "пушк"*'),
+    ("Ёлка", '"Елка"*'),
+    ('плюм" OR "*', '"плюм"* "OR"*'),
+    ("!!!", None),
+])
+def test_build_match_query(query, expected):
+    assert build_match_query(query) == expected
+
+
+def test_prefix_search_ignores_case(client):
+    assert sorted(search(client, "ПЛЮМ")) == ["Портальная пушка", "Стандартный Плюмбус"]
+
+
+def test_name_matches_rank_above_description_matches(client):
+    assert search(client, "плюмбус") == ["Стандартный Плюмбус", "Портальная пушка"]
+
+
+def test_all_words_must_match(client):
+    assert search(client, "порт пушк") == ["Портальная пушка"]
+    assert search(client, "порт плюмбус") == ["Портальная пушка"]
+    assert search(client, "нет такого") == []
+
+
+def test_yo_and_ye_are_equivalent(client):
+    assert search(client, "елочн") == ["Коробка с Мисиксами"]
+
+
+def test_explicit_sort_overrides_rank(client):
+    names = search(client, "плюмбус", currency="shmeckles", sort_order="desc")
+    assert names == ["Портальная пушка", "Стандартный Плюмбус"]
+
+
+def test_index_follows_updates_and_deletes(client):
+    async def change_products():
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE products SET name = 'Переименованный товар' WHERE id = 1"))
+            await conn.execute(text("DELETE FROM products WHERE id = 3"))
+
+    client.portal.call(change_products)
+
+    assert search(client, "переимен") == ["Переименованный товар"]
+    # Описание первого товара по-прежнему содержит "плюмбус", третий удалён
+    assert search(client, "плюмбус") == ["Переименованный товар"]
+
+
+def test_rebuild_indexes_rows_created_before_the_index(client):
+    async def drop_index_and_rebuild():
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE products_fts"))
+            await rebuild_search_index(conn)
+
+    client.portal.call(drop_index_and_rebuild)
+
+    assert search(client, "пушк") == ["Портальная пушка"]
@@ -1,28 +1,48 @@
 # utils/telegram.py
+# Диспетчер уведомлений: реализация общая — пакет shop_common
 import logging
+
 import telegram
+from shop_common.telegram_dispatcher import TelegramDispatcher
 # Обновлен импорт настроек
 from core.config import settings
 
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG)
+# Общий диспетчер приложения (запускается в lifespan)
+dispatcher = TelegramDispatcher(
+    token=settings.telegram_bot_api_key,
+    chat_id=settings.telegram_user_id,
+    base_url=settings.telegram_api_base_url,
+    window_seconds=settings.telegram_digest_window_seconds,
+    max_batch=settings.telegram_digest_max_messages,
+    rate_per_second=settings.telegram_rate_per_second,
+    burst=settings.telegram_rate_burst,
+    max_retries=settings.telegram_max_retries,
+    drain_timeout=settings.telegram_drain_timeout_seconds,
+)
 
 
 async def send_telegram_message(message: str, parse_mode: str = "Markdown") -> None:
     """
     Отправка сообщения в Telegram через бота.
+    Если диспетчер запущен, сообщение ставится в его очередь;
+    иначе (например, из скриптов) отправляется напрямую.
 
     Args:
         message (str): Текст сообщения для отправки.
         parse_mode (str, optional): Режим форматирования текста. Defaults to "Markdown".
     """
+    if dispatcher.running:
+        dispatcher.enqueue(message, parse_mode)
+        return
+
     try:
-        bot = telegram.Bot(token=settings.telegram_bot_api_key)
-        await bot.send_message(
-            chat_id=settings.telegram_user_id,
-            text=message,
-            parse_mode=parse_mode
-        )
+        kwargs = {"base_url": settings.telegram_api_base_url} if settings.telegram_api_base_url else {}
+        async with telegram.Bot(token=settings.telegram_bot_api_key, **kwargs) as bot:
+            await bot.send_message(
+                chat_id=settings.telegram_user_id,
+                text=message,
+                parse_mode=parse_mode
+            )
         logging.info(
             f'Сообщение "{message[:50]}..." отправлено в чат {settings.telegram_user_id}' # Логируем начало сообщения
         )
@@ -32,4 +52,4 @@ async def send_telegram_message(message: str, parse_mode: str = "Markdown") -> N
         )
         raise # Пробрасываем исключение дальше, чтобы FastAPI мог его обработать, если нужно
     else:
-        logging.debug(f"Сообщение успешно отправлено в чат {settings.telegram_user_id}")
\ No newline at end of file
+        logging.debug(f"Сообщение успешно отправлено в чат {settings.telegram_user_id}")
@@ -23,6 +23,10 @@ class Settings:
         
         # Настройки безопасности
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
+        
+        # Метрики Prometheus (/metrics) и журнал медленных SQL-запросов
+        self.metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.slow_query_ms = float(os.getenv("SLOW_QUERY_MS", "200"))  # мс
 
 # Создаем экземпляр настроек
 settings = Settings()
\ No newline at end of file
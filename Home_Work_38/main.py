@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 import logging
 from core.config import settings
+from core.database import engine
+from shop_common.metrics import MetricsMiddleware, install_sql_metrics, metrics_response
 from routes import categories, products
 
 # Настройка логирования
@@ -15,6 +17,17 @@ app = FastAPI(
     description=settings.app_description
 )
 
+# Метрики: задержка по маршрутам, запросы в обработке, статусы, время SQL
+if settings.metrics_enabled:
+    install_sql_metrics(engine, settings.slow_query_ms)
+    app.add_middleware(MetricsMiddleware)
+    logger.info("📈 Метрики Prometheus доступны на /metrics")
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики в формате Prometheus"""
+        return metrics_response()
+
 # Подключаем роутеры
 app.include_router(products.router, prefix="/api/v1", tags=["products"])
 app.include_router(categories.router, prefix="/api/v1", tags=["categories"])
@@ -0,0 +1,26 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте приложения: БД — во временной папке
+WORK_DIR = tempfile.mkdtemp(prefix="shop-tests-")
+os.chdir(WORK_DIR)
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{WORK_DIR}/test.db",
+    METRICS_ENABLED="true",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.database import create_tables, engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        test_client.portal.call(create_tables)
+        yield test_client
+        test_client.portal.call(engine.dispose)
@@ -0,0 +1,28 @@
+"""Add index on products.image_url
+
+Revision ID: 3c9d0e4f7b12
+Revises: a21728880ebe
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d0e4f7b12'
+down_revision: Union[str, Sequence[str], None] = 'a21728880ebe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_products_image_url'), 'products', ['image_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_products_image_url'), table_name='products')
@@ -0,0 +1,39 @@
+"""Add compound and partial indexes for product queries
+
+Revision ID: 7e2b5c1d9a40
+Revises: 3c9d0e4f7b12
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2b5c1d9a40'
+down_revision: Union[str, Sequence[str], None] = '3c9d0e4f7b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_category_id_price', 'products', ['category_id', 'price'], unique=False)
+    op.create_index('ix_products_category_id_id', 'products', ['category_id', 'id'], unique=False)
+    op.create_index(
+        'ix_products_in_stock_category_id_price',
+        'products',
+        ['category_id', 'price'],
+        unique=False,
+        sqlite_where=sa.text('stock > 0'),
+        postgresql_where=sa.text('stock > 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_in_stock_category_id_price', table_name='products')
+    op.drop_index('ix_products_category_id_id', table_name='products')
+    op.drop_index('ix_products_category_id_price', table_name='products')
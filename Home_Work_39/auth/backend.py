@@ -1,4 +1,5 @@
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
+from auth.claims import ClaimsJWTStrategy
 from core.config import settings
 
 # Секретный ключ для подписи JWT токенов
@@ -10,11 +11,15 @@ bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 def get_jwt_strategy() -> JWTStrategy:
     """
     Создает и возвращает стратегию JWT для аутентификации.
+    В режиме AUTH_MODE=claims пользователь восстанавливается из подписанных
+    claims токена без запроса к БД, в режиме database — читается из БД.
     
     Returns:
         JWTStrategy: Стратегия с указанным секретным ключом и временем жизни токена
     """
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)  # Токен живет 1 час
+    if settings.auth_mode == "claims":
+        return ClaimsJWTStrategy(secret=SECRET, lifetime_seconds=settings.jwt_lifetime_seconds)
+    return JWTStrategy(secret=SECRET, lifetime_seconds=settings.jwt_lifetime_seconds)  # По умолчанию токен живет 1 час
 
 # Бэкенд аутентификации, объединяющий транспорт и стратегию
 auth_backend = AuthenticationBackend(
@@ -0,0 +1,176 @@
+# auth/claims.py
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import jwt
+from fastapi_users import BaseUserManager, exceptions
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from sqlalchemy.orm import make_transient_to_detached
+
+from core.config import settings
+from models.user import User
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Поля пользователя, которые кладутся в токен и достаточны для UserRead и проверок доступа
+CLAIM_FIELDS = ("email", "is_active", "is_superuser", "is_verified")
+
+
+class UserCache:
+    """
+    Кэш снимков пользователей в памяти процесса: id -> словарь полей, LRU + TTL.
+    Хранятся словари, а не ORM-объекты: каждый запрос получает свой экземпляр User,
+    не привязанный к чужой сессии.
+    """
+
+    def __init__(self, ttl_seconds: int, max_items: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self._data: "OrderedDict[int, tuple[float, dict]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[dict]:
+        item = self._data.get(user_id)
+        if item is None:
+            return None
+        expires_at, snapshot = item
+        if expires_at < time.monotonic():
+            del self._data[user_id]
+            return None
+        self._data.move_to_end(user_id)
+        return snapshot
+
+    def set(self, user_id: int, snapshot: dict) -> None:
+        self._data[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def delete(self, user_id: int) -> None:
+        self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RevocationList:
+    """
+    Явный список отзыва токенов:
+    - отдельные токены по jti (выход из системы) — хранятся до истечения токена
+    - все токены пользователя, выпущенные до момента отзыва (блокировка,
+      смена прав или пароля)
+    """
+
+    def __init__(self):
+        self._tokens: dict[str, float] = {}
+        self._users: dict[int, float] = {}
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        self._tokens[jti] = expires_at
+        self._prune()
+
+    def revoke_user(self, user_id: int) -> None:
+        self._users[user_id] = time.time()
+
+    def is_revoked(self, claims: dict) -> bool:
+        if claims.get("jti") in self._tokens:
+            return True
+        revoked_at = self._users.get(int(claims["sub"]))
+        return revoked_at is not None and claims.get("iat", 0) <= revoked_at
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._tokens.items() if expires_at < now]:
+            del self._tokens[jti]
+
+
+user_cache = UserCache(settings.auth_user_cache_ttl, settings.auth_user_cache_max_items)
+revocations = RevocationList()
+
+
+def user_snapshot(user: User) -> dict:
+    return {"id": user.id, **{field: getattr(user, field) for field in CLAIM_FIELDS}}
+
+
+def user_from_snapshot(snapshot: dict) -> User:
+    """
+    Экземпляр User без запроса к БД. Объект помечается как detached с известным
+    первичным ключом: если обработчик изменит его (PATCH /users/me), сессия
+    выполнит UPDATE, а не INSERT. Поле hashed_password не загружено.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Отзывает все выданные пользователю токены и сбрасывает его снимок в кэше"""
+    revocations.revoke_user(user_id)
+    user_cache.delete(user_id)
+    logger.info(f"🔒 Токены пользователя ID={user_id} отозваны")
+
+
+class ClaimsJWTStrategy(JWTStrategy):
+    """
+    JWT-стратегия с быстрым путём: id, email и флаги пользователя подписываются
+    в токене, и на время его жизни им доверяют — без запроса к таблице user.
+
+    - проверка подписи, срока и списка отзыва — в памяти
+    - снимок пользователя берётся из кэша, иначе из claims
+    - токены старого формата (только sub) один раз читаются из БД и кэшируются
+    - выход из системы отзывает токен по jti
+    """
+
+    async def write_token(self, user: User) -> str:
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "jti": uuid.uuid4().hex,
+            "iat": time.time(),
+            **{field: getattr(user, field) for field in CLAIM_FIELDS},
+        }
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    def decode(self, token: Optional[str]) -> Optional[dict]:
+        if token is None:
+            return None
+        try:
+            claims = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+        except jwt.PyJWTError:
+            return None
+        if claims.get("sub") is None or revocations.is_revoked(claims):
+            return None
+        return claims
+
+    async def read_token(self, token: Optional[str], user_manager: BaseUserManager[User, int]) -> Optional[User]:
+        claims = self.decode(token)
+        if claims is None:
+            return None
+
+        try:
+            user_id = user_manager.parse_id(claims["sub"])
+        except exceptions.InvalidID:
+            return None
+
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            if all(field in claims for field in CLAIM_FIELDS):
+                snapshot = {"id": user_id, **{field: claims[field] for field in CLAIM_FIELDS}}
+            else:
+                # Токен выдан до появления claims — один раз идём в БД
+                try:
+                    snapshot = user_snapshot(await user_manager.get(user_id))
+                except exceptions.UserNotExists:
+                    return None
+            user_cache.set(user_id, snapshot)
+
+        return user_from_snapshot(snapshot)
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        claims = self.decode(token)
+        if claims is not None and claims.get("jti"):
+            revocations.revoke_token(claims["jti"], claims.get("exp", time.time() + (self.lifetime_seconds or 0)))
@@ -1,6 +1,10 @@
+from typing import Any, Dict
 from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, IntegerIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, IntegerIDMixin, exceptions, schemas
+from auth.claims import CLAIM_FIELDS, revoke_user_tokens
 from auth.database import get_user_db
+from auth.passwords import password_helper
 from core.config import settings
 from models.user import User
 
@@ -10,8 +14,68 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    # create, authenticate и _update повторяют BaseUserManager, но хешируют
+    # и проверяют пароль через пул (await), а не синхронно в event loop
+
+    async def create(self, user_create: schemas.UC, safe: bool = False, request: Request | None = None) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await self.password_helper.hash_async(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> User | None:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем всё равно — время ответа не выдаёт, существует ли email
+            await self.password_helper.hash_async(credentials.password)
+            return None
+
+        verified, updated_password_hash = await self.password_helper.verify_and_update_async(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        # Хеш со старыми параметрами пересчитан — сохраняем новый
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {key: value for key, value in update_dict.items() if key != "password"}
+            update_dict["hashed_password"] = await self.password_helper.hash_async(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Request | None = None):
         print(f"User {user.id} has registered.")
 
+    # Токены несут email и флаги пользователя, поэтому при их изменении
+    # (и при смене пароля) ранее выданные токены отзываются
+
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Request | None = None):
+        if "password" in update_dict or any(field in update_dict for field in CLAIM_FIELDS):
+            revoke_user_tokens(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Request | None = None):
+        revoke_user_tokens(user.id)
+
+    async def on_after_verify(self, user: User, request: Request | None = None):
+        revoke_user_tokens(user.id)
+
+    async def on_after_delete(self, user: User, request: Request | None = None):
+        revoke_user_tokens(user.id)
+
 async def get_user_manager(user_db=Depends(get_user_db)):
-    yield UserManager(user_db)
\ No newline at end of file
+    yield UserManager(user_db, password_helper)
\ No newline at end of file
@@ -0,0 +1,100 @@
+# auth/passwords.py
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from core.config import settings
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+_password_hash: Optional[PasswordHash] = None
+
+
+def get_password_hash() -> PasswordHash:
+    """
+    Хешер с параметрами из настроек. Создаётся лениво — в том числе
+    в каждом процессе пула. Argon2id — для новых хешей, bcrypt — чтобы
+    проверять старые; хеши с другими параметрами пересчитываются при входе.
+    """
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = PasswordHash((
+            Argon2Hasher(
+                time_cost=settings.argon2_time_cost,
+                memory_cost=settings.argon2_memory_cost,
+                parallelism=settings.argon2_parallelism,
+            ),
+            BcryptHasher(),
+        ))
+    return _password_hash
+
+
+# Функции уровня модуля — их можно передать в ProcessPoolExecutor
+
+def hash_password(password: str) -> str:
+    return get_password_hash().hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return get_password_hash().verify_and_update(plain_password, hashed_password)
+
+
+class PooledPasswordHelper(PasswordHelper):
+    """
+    PasswordHelper для fastapi-users, который считает хеши вне event loop.
+
+    Хеширование пароля — десятки миллисекунд CPU. В обработчике async оно
+    останавливает все остальные запросы процесса. Здесь работа уходит в пул
+    фиксированного размера: при всплеске входов лишние вызовы ждут в очереди пула,
+    а event loop продолжает обслуживать остальные эндпоинты.
+
+    - thread — argon2-cffi и bcrypt отпускают GIL на время вычисления
+    - process — полная изоляция от GIL ценой передачи данных между процессами
+    - inline — старое поведение (прямо в event loop), для сравнения в бенчмарке
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 2):
+        super().__init__(get_password_hash())
+        self.mode = mode
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    def get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.mode == "inline":
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get_executor(), func, *args)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Останавливает пул (вызывается при остановке приложения)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Общий помощник приложения
+password_helper = PooledPasswordHelper(
+    mode=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+)
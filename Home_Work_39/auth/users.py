@@ -0,0 +1,14 @@
+# auth/users.py
+from fastapi_users import FastAPIUsers
+from auth.backend import auth_backend
+from auth.manager import get_user_manager
+from models.user import User
+
+# Общий экземпляр FastAPI Users: роутеры аутентификации и зависимости для защиты эндпоинтов
+fastapi_users = FastAPIUsers[User, int](
+    get_user_manager,
+    [auth_backend],
+)
+
+current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
@@ -0,0 +1,15 @@
+# benchmarks/__init__.py
+"""
+Нагрузочный бенчмарк API магазина.
+
+Приложение запускается в том же процессе (httpx.ASGITransport) на отдельной
+временной БД, наполненной через seed_data.py. Виртуальные пользователи
+выполняют смесь операций (чтение, запись, поиск, загрузка изображений),
+по каждой операции считаются p50/p95/p99 и RPS; результат сохраняется в JSON
+и может сравниваться с сохранённым ранее базовым прогоном.
+
+Запуск из корня проекта:
+    python -m benchmarks run --workload mixed --products 5000 --duration 20 --output benchmarks/results/baseline.json
+    python -m benchmarks run --workload mixed --products 5000 --duration 20 --compare benchmarks/results/baseline.json
+    python -m benchmarks compare benchmarks/results/baseline.json benchmarks/results/mixed.json
+"""
@@ -0,0 +1,98 @@
+# benchmarks/__main__.py
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.report import compare_reports, load_report, print_comparison, print_report, save_report
+from benchmarks.workloads import WORKLOADS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def prepare_environment(database_url: str | None) -> None:
+    """
+    Отдельная БД и рабочая папка, чтобы не трогать test.db и uploads проекта.
+    Вызывается до импорта приложения: настройки и папка uploads читаются при импорте.
+    """
+    workdir = tempfile.mkdtemp(prefix="shop-bench-")
+    os.environ.setdefault("DATABASE_URL", database_url or f"sqlite+aiosqlite:///{workdir}/bench.db")
+    # Профилирование SQL и ограничение частоты искажают замер и не нужны нагрузке
+    os.environ.setdefault("QUERY_PROFILING", "false")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.chdir(workdir)
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    logging.disable(logging.WARNING)
+
+
+def run(args: argparse.Namespace) -> int:
+    output = Path(args.output or PROJECT_ROOT / "benchmarks" / "results" / f"{args.workload}.json").resolve()
+    baseline = load_report(Path(args.compare).resolve()) if args.compare else None
+
+    prepare_environment(args.database_url)
+    from benchmarks.runner import run_benchmark
+
+    report = asyncio.run(run_benchmark(
+        workload=args.workload,
+        categories=args.categories,
+        products=args.products,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        warmup=args.warmup,
+        seed_value=args.seed,
+    ))
+    print_report(report)
+    save_report(report, output)
+    print(f"\n💾 Отчёт сохранён: {output}")
+
+    if baseline is None:
+        return 0
+    rows = compare_reports(baseline, report, args.tolerance, args.min_delta_ms)
+    print_comparison(rows)
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    rows = compare_reports(load_report(args.baseline), load_report(args.current), args.tolerance, args.min_delta_ms)
+    print_comparison(rows)
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Нагрузочный бенчмарк API магазина")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_compare_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--tolerance", type=float, default=0.15, help="Допустимое ухудшение, доля (0.15 = 15%%)")
+        command.add_argument("--min-delta-ms", type=float, default=1.0, help="Минимальный рост задержки, который считается ухудшением")
+
+    run_parser = commands.add_parser("run", help="Выполнить прогон и сохранить отчёт")
+    run_parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed", help="Профиль нагрузки")
+    run_parser.add_argument("--categories", type=int, default=20, help="Количество категорий")
+    run_parser.add_argument("--products", type=int, default=2000, help="Количество товаров")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Виртуальных пользователей")
+    run_parser.add_argument("--duration", type=float, default=15.0, help="Длительность замера, с")
+    run_parser.add_argument("--warmup", type=float, default=3.0, help="Прогрев перед замером, с")
+    run_parser.add_argument("--seed", type=int, default=42, help="Seed данных и выбора операций")
+    run_parser.add_argument("--database-url", help="Своя БД вместо временной SQLite")
+    run_parser.add_argument("--output", help="Куда сохранить JSON (по умолчанию benchmarks/results/<workload>.json)")
+    run_parser.add_argument("--compare", help="Базовый отчёт для сравнения")
+    add_compare_options(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Сравнить два сохранённых отчёта")
+    compare_parser.add_argument("baseline", type=Path, help="Базовый отчёт")
+    compare_parser.add_argument("current", type=Path, help="Новый отчёт")
+    add_compare_options(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
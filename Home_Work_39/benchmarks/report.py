@@ -0,0 +1,132 @@
+# benchmarks/report.py
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+# Какие показатели сравниваются и в какую сторону изменение — ухудшение
+COMPARED_METRICS = {"p50_ms": "up", "p95_ms": "up", "p99_ms": "up", "rps": "down"}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (как в scripts/bench_passwords.py)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Сводка по одной операции; задержки в секундах, результат в мс"""
+    if not latencies:
+        return {"requests": 0, "errors": errors, "rps": 0.0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """Где и на чём выполнялся прогон — без этого цифры разных машин несравнимы"""
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_report(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float, min_delta_ms: float) -> list[dict]:
+    """
+    Сравнивает два прогона по операциям.
+
+    Ухудшением считается рост перцентиля или падение RPS больше чем на tolerance
+    (доля). Для задержек изменение также должно превышать min_delta_ms —
+    иначе шум на субмиллисекундных операциях даёт ложные срабатывания.
+
+    Returns:
+        list[dict]: Строка на каждую пару (операция, показатель)
+    """
+    rows = []
+    for name in sorted(set(baseline["endpoints"]) | set(current["endpoints"])):
+        before = baseline["endpoints"].get(name)
+        after = current["endpoints"].get(name)
+        if not before or not after or not before.get("requests") or not after.get("requests"):
+            rows.append({"endpoint": name, "metric": "-", "before": None, "after": None, "change": None, "status": "missing"})
+            continue
+        for metric, worse in COMPARED_METRICS.items():
+            old, new = before[metric], after[metric]
+            change = (new - old) / old if old else 0.0
+            regressed = change > tolerance if worse == "up" else change < -tolerance
+            if regressed and metric.endswith("_ms") and new - old < min_delta_ms:
+                regressed = False
+            improved = change < -tolerance if worse == "up" else change > tolerance
+            rows.append({
+                "endpoint": name,
+                "metric": metric,
+                "before": old,
+                "after": new,
+                "change": round(change, 4),
+                "status": "regression" if regressed else "improvement" if improved else "ok",
+            })
+    return rows
+
+
+def print_report(report: dict) -> None:
+    meta = report["meta"]
+    print(
+        f"\n📊 Нагрузка {meta['workload']}: {meta['concurrency']} пользователей, {meta['duration']} с, "
+        f"{meta['products']} товаров / {meta['categories']} категорий"
+    )
+    print(f"{'операция':<26}{'запросов':>9}{'ошибок':>8}{'RPS':>9}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}")
+    rows = list(report["endpoints"].items()) + [("ВСЕГО", report["total"])]
+    for name, stats in rows:
+        if not stats["requests"]:
+            continue
+        print(
+            f"{name:<26}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+        )
+
+
+def print_comparison(rows: list[dict]) -> None:
+    marks = {"regression": "🔴", "improvement": "🟢", "ok": "  ", "missing": "⚪"}
+    print(f"\n{'':2} {'операция':<26}{'показатель':<10}{'было':>10}{'стало':>10}{'изменение':>11}")
+    for row in rows:
+        if row["status"] == "missing":
+            print(f"{marks['missing']} {row['endpoint']:<26}нет в одном из прогонов")
+            continue
+        print(
+            f"{marks[row['status']]} {row['endpoint']:<26}{row['metric']:<10}"
+            f"{row['before']:>10.2f}{row['after']:>10.2f}{row['change'] * 100:>+10.1f}%"
+        )
+    regressions = sum(row["status"] == "regression" for row in rows)
+    print(f"\n{'❌ Ухудшений: ' + str(regressions) if regressions else '✅ Ухудшений нет'}")
@@ -0,0 +1,136 @@
+# benchmarks/runner.py
+"""
+Прогон нагрузки. Импортирует приложение, поэтому окружение (DATABASE_URL,
+рабочая папка для uploads) должно быть настроено до импорта этого модуля —
+это делает benchmarks/__main__.py.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+from sqlalchemy import select
+
+import seed_data
+from auth.passwords import password_helper
+from core.database import AsyncSessionLocal, engine
+from core.images import shutdown_executor
+from main import app
+from models.product import ProductModel
+from benchmarks.report import environment, summarize
+from benchmarks.workloads import OPERATIONS, WORKLOADS, BenchContext, make_images
+
+
+async def seed(categories: int, products: int, seed_value: int) -> tuple[list[int], list[int]]:
+    """Наполняет пустую БД через seed_data.py и возвращает id товаров и категорий"""
+    await seed_data.create_tables()
+    async with AsyncSessionLocal() as session:
+        await seed_data.clear_tables(session)
+    category_ids = await seed_data.generate_catalog(categories, products, seed_value)
+    async with AsyncSessionLocal() as session:
+        product_ids = (await session.execute(select(ProductModel.id))).scalars().all()
+    return list(product_ids), category_ids
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    ctx: BenchContext,
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> tuple[dict, dict, float]:
+    """
+    Замкнутая нагрузка: concurrency виртуальных пользователей без пауз
+    выполняют случайные операции с заданными весами. Запросы, начатые
+    во время прогрева, не учитываются.
+
+    Returns:
+        tuple: Задержки по операциям (с), ошибки по операциям, длительность замера (с)
+    """
+    operations = [OPERATIONS[name] for name in weights]
+    op_weights = list(weights.values())
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def user() -> None:
+        while True:
+            op = ctx.rng.choices(operations, op_weights)[0]
+            op_started = time.perf_counter()
+            if op_started >= deadline:
+                return
+            try:
+                response = await op.call(client, ctx)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - op_started
+            if op_started >= measure_from:
+                latencies[op.name].append(elapsed)
+                errors[op.name] += failed
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - measure_from
+
+
+async def run_benchmark(
+    workload: str,
+    categories: int,
+    products: int,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed_value: int,
+) -> dict:
+    """Наполняет БД, выполняет нагрузку и возвращает отчёт для JSON"""
+    print(f"🌱 Наполнение БД: {categories} категорий, {products} товаров...")
+    product_ids, category_ids = await seed(categories, products, seed_value)
+
+    ctx = BenchContext(
+        rng=random.Random(seed_value),
+        product_ids=product_ids,
+        category_ids=category_ids,
+        images=make_images(16, seed_value) if "upload_image" in WORKLOADS[workload] else [],
+    )
+
+    print(f"🚀 Нагрузка {workload}: {concurrency} пользователей, прогрев {warmup} с, замер {duration} с...")
+    # Ошибки приложения возвращаются как ответы 500, а не исключения клиента
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            latencies, errors, elapsed = await run_load(
+                client, ctx, WORKLOADS[workload], concurrency, duration, warmup
+            )
+    finally:
+        shutdown_executor()
+        password_helper.shutdown()
+        await engine.dispose()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            **environment(),
+            "workload": workload,
+            "weights": WORKLOADS[workload],
+            "categories": categories,
+            "products": products,
+            "concurrency": concurrency,
+            "duration": duration,
+            "warmup": warmup,
+            "seed": seed_value,
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {
+            name: {
+                "method": OPERATIONS[name].method,
+                "path": OPERATIONS[name].path,
+                **summarize(latencies.get(name, []), errors.get(name, 0), elapsed),
+            }
+            for name in WORKLOADS[workload]
+        },
+    }
@@ -0,0 +1,144 @@
+# benchmarks/workloads.py
+import io
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Слова из названий и описаний, которые генерирует seed_data.py: от частых до редких
+SEARCH_TERMS = ["смартфон", "чайник", "наушники", "nimbus", "orbis", "pro", "ultra", "гарантия", "цветах", "z999"]
+
+
+@dataclass
+class BenchContext:
+    """Состояние прогона, общее для всех виртуальных пользователей"""
+    rng: random.Random
+    product_ids: list[int]
+    category_ids: list[int]
+    images: list[bytes] = field(default_factory=list)
+
+    def product_id(self) -> int:
+        return self.rng.choice(self.product_ids)
+
+    def product_payload(self) -> dict:
+        return {
+            "name": f"Бенчмарк-товар {self.rng.randint(1, 10**9)}",
+            "description": "Товар, созданный нагрузочным тестом",
+            "price": round(self.rng.uniform(1, 2000), 2),
+            "stock": self.rng.randint(0, 100),
+            "category_id": self.rng.choice(self.category_ids),
+        }
+
+
+@dataclass
+class Operation:
+    """Одна операция нагрузки: метка в отчёте, шаблон маршрута и вызов"""
+    name: str
+    method: str
+    path: str
+    call: Callable[[httpx.AsyncClient, BenchContext], Awaitable[httpx.Response]]
+
+
+async def list_products(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    skip = ctx.rng.randint(0, max(len(ctx.product_ids) - 50, 0))
+    return await client.get("/api/v1/products/", params={"skip": skip, "limit": 50})
+
+
+async def list_products_filtered(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.get("/api/v1/products/", params={
+        "category_id": ctx.rng.choice(ctx.category_ids),
+        "in_stock": "true",
+        "sort": "price_asc",
+        "limit": 50,
+    })
+
+
+async def get_product(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.get(f"/api/v1/products/{ctx.product_id()}")
+
+
+async def keyset_page(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.get("/api/v1/products/keyset", params={"limit": 100, "sort": "name"})
+
+
+async def search_products(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.get("/api/v1/products/search", params={"q": ctx.rng.choice(SEARCH_TERMS), "limit": 20})
+
+
+async def category_summary(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.get("/api/v1/categories/summary")
+
+
+async def create_product(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    response = await client.post("/api/v1/products/", json=ctx.product_payload())
+    if response.status_code == 200:
+        ctx.product_ids.append(response.json()["id"])
+    return response
+
+
+async def update_product(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    return await client.put(f"/api/v1/products/{ctx.product_id()}", json=ctx.product_payload())
+
+
+async def upload_image(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+    content = ctx.rng.choice(ctx.images)
+    return await client.post(
+        f"/api/v1/products/{ctx.product_id()}/upload-image",
+        files={"file": ("bench.png", content, "image/png")},
+    )
+
+
+OPERATIONS = {
+    op.name: op for op in [
+        Operation("list_products", "GET", "/api/v1/products/", list_products),
+        Operation("list_products_filtered", "GET", "/api/v1/products/?category_id&in_stock&sort", list_products_filtered),
+        Operation("get_product", "GET", "/api/v1/products/{product_id}", get_product),
+        Operation("keyset_page", "GET", "/api/v1/products/keyset", keyset_page),
+        Operation("search_products", "GET", "/api/v1/products/search", search_products),
+        Operation("category_summary", "GET", "/api/v1/categories/summary", category_summary),
+        Operation("create_product", "POST", "/api/v1/products/", create_product),
+        Operation("update_product", "PUT", "/api/v1/products/{product_id}", update_product),
+        Operation("upload_image", "POST", "/api/v1/products/{product_id}/upload-image", upload_image),
+    ]
+}
+
+# Профили нагрузки: операция -> вес
+WORKLOADS = {
+    "read": {
+        "get_product": 40, "list_products": 20, "list_products_filtered": 15,
+        "keyset_page": 10, "search_products": 10, "category_summary": 5,
+    },
+    "write": {"create_product": 50, "update_product": 50},
+    "search": {"search_products": 80, "list_products_filtered": 20},
+    "upload": {"upload_image": 100},
+    "mixed": {
+        "get_product": 35, "list_products": 15, "list_products_filtered": 10, "keyset_page": 5,
+        "search_products": 15, "category_summary": 5, "create_product": 7, "update_product": 5,
+        "upload_image": 3,
+    },
+}
+
+
+def make_images(count: int, seed: int) -> list[bytes]:
+    """
+    Набор небольших PNG для загрузки. Изображений меньше, чем загрузок,
+    поэтому часть загрузок попадает в уже сохранённый блоб (дедупликация).
+    """
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        if Image is None:
+            # Без Pillow — просто уникальные байты: проверяется только расширение
+            images.append(b"\x89PNG\r\n\x1a\n" + rng.randbytes(4096))
+            continue
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        buffer = io.BytesIO()
+        Image.new("RGB", (320, 240), color).save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
@@ -0,0 +1,205 @@
+# core/cache.py
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from core.config import settings
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """Счётчики обращений к кэшу"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class BaseCache:
+    """
+    Базовый интерфейс кэша. Значения — JSON-совместимые объекты
+    (например, результат model_dump() Pydantic-схемы), а не ORM-объекты.
+    """
+
+    backend_name = "none"
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        self.stats.invalidations += len(keys)
+
+    async def clear(self) -> None:
+        return None
+
+    def info(self) -> dict:
+        return {"backend": self.backend_name, **self.stats.as_dict()}
+
+
+class MemoryCache(BaseCache):
+    """
+    Кэш в памяти процесса: LRU-вытеснение + TTL.
+    Все операции синхронны внутри корутин, поэтому в рамках одного
+    event loop дополнительная блокировка не нужна.
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, ttl_seconds: int, max_items: int):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            # Запись устарела — удаляем и считаем промахом
+            del self._data[key]
+            self.stats.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        self.stats.sets += 1
+        # Вытесняем самые давно использованные записи
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+        self.stats.invalidations += len(keys)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def info(self) -> dict:
+        return {**super().info(), "size": len(self._data), "max_items": self.max_items}
+
+
+class RedisCache(BaseCache):
+    """
+    Кэш в Redis (или совместимом сервере). Ошибки соединения не ломают
+    запрос: кэш просто считается промахом, и данные читаются из БД.
+    """
+
+    backend_name = "redis"
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "shop:"):
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis недоступен при чтении {key}: {e}")
+            raw = None
+
+        if raw is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=self.ttl_seconds)
+            self.stats.sets += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Redis недоступен при записи {key}: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            logger.error(f"❌ Не удалось инвалидировать {keys} в Redis: {e}")
+        self.stats.invalidations += len(keys)
+
+    async def clear(self) -> None:
+        try:
+            async for key in self.client.scan_iter(match=self.prefix + "*"):
+                await self.client.delete(key)
+        except Exception as e:
+            logger.error(f"❌ Не удалось очистить кэш в Redis: {e}")
+
+
+def product_cache_key(product_id: int) -> str:
+    """Ключ товара в кэше"""
+    return f"product:{product_id}"
+
+
+# Сводка по категориям: сбрасывается при любом изменении товаров или категорий
+CATEGORY_SUMMARY_CACHE_KEY = "categories:summary"
+
+
+def create_cache(backend: str) -> BaseCache:
+    """
+    Создаёт кэш выбранного типа.
+
+    Args:
+        backend: "memory", "redis" или "none"
+
+    Returns:
+        BaseCache: Экземпляр кэша. Если Redis-клиент не установлен,
+        используется кэш в памяти.
+    """
+    if backend == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("⚠️ Пакет redis не установлен — используется кэш в памяти")
+        else:
+            client = redis_asyncio.from_url(settings.redis_url)
+            return RedisCache(client, ttl_seconds=settings.cache_ttl_seconds)
+
+    if backend == "none":
+        return BaseCache()
+
+    return MemoryCache(
+        ttl_seconds=settings.cache_ttl_seconds,
+        max_items=settings.cache_max_items,
+    )
+
+
+# Общий кэш приложения
+cache = create_cache(settings.cache_backend)
@@ -11,10 +11,51 @@ class Settings:
     def __init__(self):
         # Настройки базы данных
         self.database_url = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+        self.db_echo = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        # Загрузка связей в списках: joined (один запрос с JOIN) или selectin (второй запрос с IN)
+        self.db_loading_strategy = os.getenv("DB_LOADING_STRATEGY", "joined")
+        
+        # Профиль производительности SQLite (PRAGMA при каждом подключении)
+        self.sqlite_tuning = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+        self.sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 МБ
+        self.sqlite_cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # отрицательное значение — в КиБ (64 МБ)
+        self.sqlite_busy_timeout = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # мс
         
         # Настройки Telegram бота
         self.telegram_bot_api_key = os.getenv("TELEGRAM_BOT_API_KEY")
         self.telegram_user_id = os.getenv("TELEGRAM_USER_ID")
+        self.telegram_api_base_url = os.getenv("TELEGRAM_API_BASE_URL")  # например, локальный фейковый Bot API
+        self.telegram_digest_window_seconds = float(os.getenv("TELEGRAM_DIGEST_WINDOW_SECONDS", "2.0"))
+        self.telegram_digest_max_messages = int(os.getenv("TELEGRAM_DIGEST_MAX_MESSAGES", "20"))
+        self.telegram_rate_per_second = float(os.getenv("TELEGRAM_RATE_PER_SECOND", "1.0"))
+        self.telegram_rate_burst = int(os.getenv("TELEGRAM_RATE_BURST", "3"))
+        self.telegram_max_retries = int(os.getenv("TELEGRAM_MAX_RETRIES", "5"))
+        self.telegram_drain_timeout_seconds = float(os.getenv("TELEGRAM_DRAIN_TIMEOUT_SECONDS", "10.0"))
+        
+        # Профилирование SQL по запросам и заголовки X-Query-* — включайте в dev и тестах
+        self.query_profiling = os.getenv("QUERY_PROFILING", "false").lower() in ("1", "true", "yes")
+        self.query_n_plus_one_threshold = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))  # повторов одного SELECT
+        
+        # Метрики Prometheus (/metrics) и журнал медленных SQL-запросов
+        self.metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.slow_query_ms = float(os.getenv("SLOW_QUERY_MS", "200"))  # мс
+        
+        # Многопроцессный запуск (serve.py)
+        self.web_host = os.getenv("WEB_HOST", "0.0.0.0")
+        self.web_port = int(os.getenv("WEB_PORT", "8000"))
+        # Больше одного воркера — только с общим состоянием в Redis (CACHE_BACKEND, RATE_LIMIT_BACKEND)
+        self.web_workers = int(os.getenv("WEB_WORKERS", "1"))
+        self.web_graceful_timeout = float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))  # с
+        self.web_max_requests = int(os.getenv("WEB_MAX_REQUESTS", "0"))  # 0 — воркеры не перезапускаются по счётчику
+        
+        # Семплирующий профилировщик /api/v1/admin/profile (только суперпользователи)
+        self.profiler_max_seconds = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+        self.profiler_interval_ms = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+        self.profiler_block_threshold_ms = float(os.getenv("PROFILER_BLOCK_THRESHOLD_MS", "100"))
         
         # Настройки приложения
         self.app_title = "Бондарчук Андрей домашняя работа № 39"
@@ -23,6 +64,59 @@ class Settings:
         
         # Настройки безопасности
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
+        self.jwt_lifetime_seconds = int(os.getenv("JWT_LIFETIME_SECONDS", "3600"))
+        # database — как в fastapi-users по умолчанию, запрос пользователя на каждый вызов;
+        # claims — пользователь берётся из подписанных claims токена без запроса к БД.
+        # Отзыв токенов и кэш пользователей в режиме claims живут в памяти процесса:
+        # выход, деактивация и снятие прав суперпользователя забываются при перезапуске
+        # и не видны другим воркерам — включать только для одного процесса
+        self.auth_mode = os.getenv("AUTH_MODE", "database")
+        self.auth_user_cache_ttl = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+        self.auth_user_cache_max_items = int(os.getenv("AUTH_USER_CACHE_MAX_ITEMS", "10000"))
+
+        # Хеширование паролей (argon2id) в отдельном пуле: thread | process | inline
+        self.password_hash_executor = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+        self.password_hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(2, (os.cpu_count() or 2) // 2))))
+        self.argon2_time_cost = int(os.getenv("ARGON2_TIME_COST", "3"))
+        self.argon2_memory_cost = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # КиБ
+        self.argon2_parallelism = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+        # Ограничение частоты входа и регистрации: "запросов/секунд"
+        self.rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | redis
+        self.rate_limit_login_ip = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")
+        self.rate_limit_login_email = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60")
+        self.rate_limit_register_ip = os.getenv("RATE_LIMIT_REGISTER_IP", "10/3600")
+        self.rate_limit_register_email = os.getenv("RATE_LIMIT_REGISTER_EMAIL", "3/3600")
+        # Брать IP клиента из X-Forwarded-For (только за доверенным прокси)
+        self.rate_limit_trust_forwarded = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+        # Сколько доверенных прокси стоит перед приложением: каждый дописывает адрес справа
+        self.rate_limit_trusted_proxies = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+
+        # Настройки кэша товаров
+        self.cache_backend = os.getenv("CACHE_BACKEND", "memory")  # memory | redis | none
+        self.cache_ttl_seconds = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+        self.cache_max_items = int(os.getenv("CACHE_MAX_ITEMS", "10000"))
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+        # Производные изображения (миниатюры, WebP/AVIF) и пул процессов для них
+        self.image_derivatives = os.getenv("IMAGE_DERIVATIVES", "true").lower() in ("1", "true", "yes")
+        self.image_workers = int(os.getenv("IMAGE_WORKERS", "2"))
+
+        # Раздача загруженных файлов (/uploads)
+        self.uploads_max_age = int(os.getenv("UPLOADS_MAX_AGE", "3600"))  # с, для файлов без хеша в имени
+        self.uploads_chunk_size = int(os.getenv("UPLOADS_CHUNK_SIZE", str(256 * 1024)))
+        # Префикс internal-location nginx: если задан, файл отдаёт прокси через X-Accel-Redirect (sendfile)
+        self.uploads_accel_redirect = os.getenv("UPLOADS_ACCEL_REDIRECT")
+
+        # Настройки массового импорта товаров
+        self.bulk_batch_size = int(os.getenv("BULK_BATCH_SIZE", "500"))
+        self.bulk_max_rows = int(os.getenv("BULK_MAX_ROWS", "50000"))
+
+        # Границы ценовых диапазонов для фасетного поиска
+        self.facet_price_buckets = [
+            float(edge) for edge in os.getenv("FACET_PRICE_BUCKETS", "50,100,250,500,1000").split(",") if edge.strip()
+        ]
 
 # Создаем экземпляр настроек
 settings = Settings()
\ No newline at end of file
@@ -1,16 +1,81 @@
 
 # core/database.py
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from models.base import Base
 from core.config import settings
 
+def is_sqlite(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+def configure_sqlite(engine: AsyncEngine) -> None:
+    """
+    Вешает на движок обработчик подключения, который выставляет
+    PRAGMA из профиля производительности:
+    - journal_mode=WAL — читатели не блокируют писателя и наоборот
+    - synchronous=NORMAL — в режиме WAL безопасно и без fsync на каждый коммит
+    - mmap_size, cache_size — чтение страниц из памяти вместо системных вызовов
+    - busy_timeout — ожидание блокировки вместо мгновенной ошибки "database is locked"
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        cursor.execute(f"PRAGMA cache_size={settings.sqlite_cache_size}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def py_casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+def register_unicode_functions(engine: AsyncEngine) -> None:
+    """
+    Встроенная в SQLite lower() меняет регистр только у ASCII, поэтому
+    поиск без учёта регистра не находил "Смартфон" по запросу "смарт".
+    Регистрируем отдельную функцию py_casefold (str.casefold из Python) —
+    её вызывает только поиск товаров (core.filters.casefold), а встроенная
+    lower() и все остальные запросы остаются как есть.
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("py_casefold", 1, py_casefold, deterministic=True)
+
+def make_engine(
+    database_url: str = settings.database_url,
+    tuned: bool = settings.sqlite_tuning
+) -> AsyncEngine:
+    """
+    Создает асинхронный движок.
+
+    Args:
+        database_url: URL подключения к БД
+        tuned: Применять ли профиль производительности SQLite
+
+    Returns:
+        AsyncEngine: Настроенный движок
+    """
+    kwargs = {"echo": settings.db_echo, "future": True}
+    # Для файловой SQLite используется пул соединений с очередью;
+    # для in-memory БД SQLAlchemy сам выбирает StaticPool без этих параметров
+    if ":memory:" not in database_url:
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+
+    engine = create_async_engine(database_url, **kwargs)
+    if is_sqlite(database_url):
+        register_unicode_functions(engine)
+        if tuned:
+            configure_sqlite(engine)
+    return engine
+
 # Создаем асинхронный движок для SQLite
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,
-    future=True
-)
+engine = make_engine()
 
 # Создаем фабрику сессий
 AsyncSessionLocal = sessionmaker(
@@ -19,6 +84,14 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+def dispose_inherited_pool() -> None:
+    """
+    Вызывается в воркере сразу после fork (serve.py): выбрасывает пул,
+    унаследованный от мастера, не закрывая его соединения — они принадлежат
+    другому процессу. Воркер открывает собственные соединения с нуля.
+    """
+    engine.sync_engine.dispose(close=False)
+
 async def get_db() -> AsyncSession:
     """
     Dependency для получения асинхронной сессии БД.
@@ -0,0 +1,151 @@
+# core/filters.py
+from typing import Optional, Sequence
+
+from sqlalchemy import String, case, func, literal, null, or_, select, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+from models.category import CategoryModel
+from models.product import ProductModel, IN_STOCK_CONDITION
+
+
+class casefold(GenericFunction):
+    """
+    Приведение регистра для поиска: в SQLite — py_casefold (Unicode, см.
+    core.database.register_unicode_functions), в остальных СУБД — lower().
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(casefold)
+def _casefold_default(element, compiler, **kw):
+    return f"lower({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(casefold, "sqlite")
+def _casefold_sqlite(element, compiler, **kw):
+    return f"py_casefold({compiler.process(element.clauses, **kw)})"
+
+
+def apply_product_filters(
+    query,
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    search: Optional[str] = None,
+):
+    """
+    Добавляет к запросу фильтры каталога. Условия записаны так, чтобы
+    их обслуживали индексы products:
+      category_id (+ цена)        -> ix_products_category_id_price
+      category_id (+ порядок id)  -> ix_products_category_id_id
+      в наличии (+ категория/цена) -> частичный ix_products_in_stock_category_id_price
+    """
+    if category_id is not None:
+        query = query.where(ProductModel.category_id == category_id)
+    if min_price is not None:
+        query = query.where(ProductModel.price >= min_price)
+    if max_price is not None:
+        query = query.where(ProductModel.price <= max_price)
+    if in_stock is True:
+        query = query.where(IN_STOCK_CONDITION)
+    elif in_stock is False:
+        query = query.where(~IN_STOCK_CONDITION)
+    if search:
+        # Подстрока в названии или описании без учёта регистра (в т.ч. кириллицы),
+        # спецсимволы LIKE экранируются
+        needle = search.casefold()
+        query = query.where(or_(
+            casefold(ProductModel.name).contains(needle, autoescape=True),
+            casefold(ProductModel.description).contains(needle, autoescape=True),
+        ))
+    return query
+
+
+def apply_product_sort(query, sort: str):
+    """
+    Порядок выдачи каталога: "id", "price_asc" или "price_desc".
+    id в конце — детерминированный порядок при равных ценах; в SQLite индексы
+    по (category_id, price) уже упорядочены по (price, rowid), так что сортировка не нужна.
+    """
+    if sort == "price_asc":
+        return query.order_by(ProductModel.price, ProductModel.id)
+    if sort == "price_desc":
+        return query.order_by(ProductModel.price.desc(), ProductModel.id.desc())
+    return query.order_by(ProductModel.id)
+
+
+def price_bucket(price_column, edges: Sequence[float]):
+    """
+    Номер ценового диапазона: 0 — до edges[0], i — от edges[i-1] до edges[i],
+    len(edges) — от последней границы и выше.
+    """
+    return case(
+        *((price_column < edge, index) for index, edge in enumerate(edges)),
+        else_=len(edges),
+    )
+
+
+def bucket_bounds(edges: Sequence[float], index: int) -> tuple[Optional[float], Optional[float]]:
+    """Границы диапазона по его номеру: [min, max), None — без ограничения"""
+    lower = edges[index - 1] if index > 0 else None
+    upper = edges[index] if index < len(edges) else None
+    return lower, upper
+
+
+def build_facet_query(
+    edges: Sequence[float],
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    search: Optional[str] = None,
+):
+    """
+    Все счётчики фасетов одним запросом (UNION ALL над общей выборкой).
+
+    Как принято в фильтрах витрины, фасет не учитывает собственный фильтр:
+    количество по категориям считается без фильтра категории (чтобы показать,
+    сколько товаров в соседних категориях), по ценам — без фильтра цены.
+
+    Строки результата: (kind, key, label, count), где kind —
+    "total", "category" (key — id категории) или "price" (key — номер диапазона).
+    """
+    base = apply_product_filters(
+        select(ProductModel.id, ProductModel.category_id, ProductModel.price),
+        in_stock=in_stock,
+        search=search,
+    ).cte("facet_base")
+
+    def in_category(query):
+        return query.where(base.c.category_id == category_id) if category_id is not None else query
+
+    def in_price_range(query):
+        if min_price is not None:
+            query = query.where(base.c.price >= min_price)
+        if max_price is not None:
+            query = query.where(base.c.price <= max_price)
+        return query
+
+    total = in_price_range(in_category(
+        select(literal("total").label("kind"), null().label("key"), null().label("label"), func.count().label("count"))
+        .select_from(base)
+    ))
+
+    categories = in_price_range(
+        select(literal("category"), base.c.category_id, CategoryModel.name, func.count())
+        .select_from(base)
+        .join(CategoryModel, CategoryModel.id == base.c.category_id)
+        .group_by(base.c.category_id, CategoryModel.name)
+    )
+
+    bucket = price_bucket(base.c.price, edges)
+    prices = in_category(
+        select(literal("price"), bucket, null(), func.count())
+        .select_from(base)
+        .group_by(bucket)
+    )
+
+    return union_all(total, categories, prices)
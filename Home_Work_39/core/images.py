@@ -0,0 +1,203 @@
+# core/images.py
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, update
+
+from core.config import settings
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Pillow указан в requirements.txt (>=11.3 — с кодировщиком AVIF); если его нет,
+# производные изображения не создаются, а при запуске пишется ошибка (check_image_support)
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Производные изображения лежат рядом с оригиналами в отдельной папке
+DERIVED_DIR = Path("uploads/products/derived")
+DERIVED_URL_PREFIX = "/uploads/products/derived"
+
+# Размеры (по большей стороне) и форматы производных изображений
+VARIANT_SIZES = {"thumb": 200, "medium": 600}
+VARIANT_FORMATS = {"webp": {"quality": 80, "method": 4}, "avif": {"quality": 55}}
+
+# Пул процессов создаётся при первом использовании и закрывается в lifespan
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def supported_formats() -> list[str]:
+    """Форматы, которые умеет кодировать установленный Pillow"""
+    if Image is None:
+        return []
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def check_image_support() -> None:
+    """Проверка при запуске: включённые производные изображения без Pillow — ошибка конфигурации"""
+    if not settings.image_derivatives:
+        logger.info("ℹ️ Производные изображения отключены (IMAGE_DERIVATIVES=false)")
+        return
+    if Image is None:
+        logger.error("❌ Производные изображения включены, но Pillow не установлен — выполните pip install -r requirements.txt")
+        return
+    missing = [fmt for fmt in VARIANT_FORMATS if fmt not in supported_formats()]
+    if missing:
+        logger.warning(f"⚠️ Pillow собран без поддержки {', '.join(missing)} — эти форматы не создаются")
+
+
+def variant_stem(image_url: str) -> str:
+    """Общий префикс имён производных файлов для оригинала (хеш содержимого)"""
+    return Path(image_url).stem
+
+
+def variant_subdir(image_url: str) -> Path:
+    """Папка производных относительно DERIVED_DIR, шардированная как и оригиналы"""
+    stem = variant_stem(image_url)
+    return Path(stem[:2], stem[2:4])
+
+
+def existing_variants(image_url: str, formats: list[str]) -> Optional[Dict[str, str]]:
+    """
+    Производные, уже созданные для этого блоба другим товаром.
+
+    Returns:
+        Optional[Dict[str, str]]: Ключ варианта -> имя файла или None, если чего-то не хватает
+    """
+    out = DERIVED_DIR / variant_subdir(image_url)
+    stem = variant_stem(image_url)
+    files = {
+        f"{size_name}_{fmt}": f"{stem}_{size_name}.{fmt}"
+        for size_name in VARIANT_SIZES
+        for fmt in formats
+    }
+    if all((out / filename).exists() for filename in files.values()):
+        return files
+    return None
+
+
+def generate_variants(source: str, out_dir: str, stem: str, formats: list[str]) -> Dict[str, str]:
+    """
+    Создаёт уменьшенные копии изображения во всех форматах.
+    Выполняется в отдельном процессе: ресайз и кодирование AVIF/WebP
+    нагружают процессор и не должны блокировать event loop.
+
+    Returns:
+        Dict[str, str]: Ключ варианта ("thumb_webp", ...) -> имя файла
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    result = {}
+
+    with Image.open(source) as original:
+        # Учитываем EXIF-ориентацию и приводим к RGB(A) для кодировщиков
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for size_name, max_side in VARIANT_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side), Image.LANCZOS)
+            for fmt in formats:
+                filename = f"{stem}_{size_name}.{fmt}"
+                resized.save(out / filename, format=fmt.upper(), **VARIANT_FORMATS[fmt])
+                result[f"{size_name}_{fmt}"] = filename
+
+    return result
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.image_workers)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Останавливает пул процессов (вызывается при остановке приложения)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def delete_variants(image_url: str) -> int:
+    """
+    Удаляет все производные изображения оригинала.
+
+    Returns:
+        int: Количество удалённых файлов
+    """
+    removed = 0
+    out = DERIVED_DIR / variant_subdir(image_url)
+    for path in out.glob(f"{variant_stem(image_url)}_*"):
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as e:
+            logger.error(f"❌ Ошибка удаления производного файла {path}: {e}")
+    return removed
+
+
+async def process_product_image(product_id: int, image_url: str, source_path: Path) -> None:
+    """
+    Фоновая задача после загрузки: создаёт производные изображения
+    и сохраняет их URL в товаре. Если блоб уже обрабатывался для другого
+    товара, готовые файлы переиспользуются. Если за это время у товара
+    сменилось изображение, а других ссылок на блоб нет, результат выбрасывается.
+    """
+    # Импорты здесь, чтобы модуль можно было импортировать из воркеров пула без БД
+    from core.cache import cache, product_cache_key
+    from core.database import AsyncSessionLocal
+    from models.product import ProductModel
+
+    if not settings.image_derivatives:
+        return
+    formats = supported_formats()
+    if not formats:
+        logger.warning("⚠️ Pillow не установлен — производные изображения не создаются")
+        return
+
+    subdir = variant_subdir(image_url)
+    files = existing_variants(image_url, formats)
+    if files is None:
+        loop = asyncio.get_running_loop()
+        try:
+            files = await loop.run_in_executor(
+                get_executor(),
+                generate_variants,
+                str(source_path),
+                str(DERIVED_DIR / subdir),
+                variant_stem(image_url),
+                formats,
+            )
+        except Exception as e:
+            logger.error(f"❌ Ошибка обработки изображения {image_url}: {e}")
+            return
+
+    prefix = f"{DERIVED_URL_PREFIX}/{subdir.as_posix()}"
+    variants = {key: f"{prefix}/{filename}" for key, filename in files.items()}
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(ProductModel)
+            .where(ProductModel.id == product_id, ProductModel.image_url == image_url)
+            .values(image_variants=variants)
+        )
+        await session.commit()
+
+        if result.rowcount == 0:
+            # Изображение успели заменить или удалить — варианты нужны, только если блоб используют другие товары
+            references = await session.execute(
+                select(func.count()).select_from(ProductModel).where(ProductModel.image_url == image_url)
+            )
+            if not references.scalar_one():
+                delete_variants(image_url)
+            return
+
+    await cache.delete(product_cache_key(product_id))
+    logger.info(f"🖼️ Созданы производные изображения для товара ID={product_id}: {list(variants)}")
@@ -0,0 +1,31 @@
+# core/loading.py
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from core.config import settings
+
+# Стратегии жадной загрузки связей:
+#   "joined"   -> LEFT OUTER JOIN в том же запросе (лучше для связей многие-к-одному)
+#   "selectin" -> второй запрос с WHERE id IN (...) (лучше для коллекций один-ко-многим)
+LOADING_STRATEGIES = {"joined": joinedload, "selectin": selectinload}
+
+
+def eager_load(relationship, strategy: Optional[str] = None):
+    """
+    Опция загрузки связи для списков, чтобы страница из N объектов
+    читалась за фиксированное число запросов, а не за 1 + N.
+
+    Args:
+        relationship: Атрибут связи, например ProductModel.category
+        strategy: "joined" или "selectin"; по умолчанию — settings.db_loading_strategy
+
+    Returns:
+        Опция для select(...).options()
+    """
+    strategy = strategy or settings.db_loading_strategy
+    try:
+        loader = LOADING_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Неизвестная стратегия загрузки: {strategy}. Доступны: {', '.join(LOADING_STRATEGIES)}")
+    return loader(relationship)
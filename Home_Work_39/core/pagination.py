@@ -0,0 +1,60 @@
+# core/pagination.py
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+# Поддерживаемые ключи сортировки для keyset-пагинации.
+# Каждый ключ обслуживается существующим индексом:
+#   "id"   -> первичный ключ / ix_products_id
+#   "name" -> ix_products_name (в SQLite индекс неявно содержит rowid = id)
+KEYSET_SORT_KEYS = ("id", "name")
+
+
+def encode_cursor(sort: str, values: list[Any]) -> str:
+    """
+    Кодирует позицию последней записи страницы в непрозрачный курсор.
+
+    Args:
+        sort: Ключ сортировки ("id" или "name")
+        values: Значения ключа последней записи, например [id] или [name, id]
+
+    Returns:
+        str: Курсор в формате base64url без паддинга
+    """
+    payload = json.dumps({"s": sort, "k": values}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], sort: str) -> Optional[list[Any]]:
+    """
+    Декодирует курсор, полученный от клиента.
+
+    Args:
+        cursor: Курсор из предыдущего ответа или None для первой страницы
+        sort: Ожидаемый ключ сортировки
+
+    Returns:
+        Optional[list]: Значения ключа, после которых начинается следующая страница
+
+    Raises:
+        HTTPException: Если курсор повреждён или выдан для другой сортировки
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    expected_len = 1 if sort == "id" else 2
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != expected_len:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+
+    return values
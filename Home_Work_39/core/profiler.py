@@ -0,0 +1,156 @@
+# core/profiler.py
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Optional
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Ограничение глубины стека: защита от бесконечной рекурсии в выводе
+MAX_STACK_DEPTH = 200
+
+# Пути библиотек и стандартной библиотеки срезаются в подписях кадров
+LIBRARY_PATHS = sorted(
+    {sysconfig.get_paths()[key] + os.sep for key in ("purelib", "platlib", "stdlib")},
+    key=len,
+    reverse=True,
+)
+
+
+def frame_label(frame: FrameType) -> str:
+    """
+    Подпись кадра в стиле py-spy: "функция (файл:строка)".
+    Файлы проекта — относительно рабочей папки, библиотеки — относительно site-packages.
+    """
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in LIBRARY_PATHS:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    else:
+        if filename.startswith(os.getcwd()):
+            filename = os.path.relpath(filename)
+    name = getattr(code, "co_qualname", code.co_name)
+    # ";" разделяет кадры в collapsed-формате
+    return f"{name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Стек потока одной строкой "корень;...;лист" (формат flamegraph.pl / speedscope)"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+@dataclass
+class BlockingEpisode:
+    """Период, когда event loop не отвечал дольше порога"""
+    started_at: float  # секунды от начала профилирования
+    duration_ms: float
+    stacks: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class ProfileResult:
+    duration: float
+    interval: float
+    samples: int
+    stacks: Counter
+    episodes: list[BlockingEpisode]
+
+    def collapsed(self) -> str:
+        """Профиль в collapsed-формате: строка "стек количество" на каждый стек"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Семплирующий профилировщик event loop текущего процесса.
+
+    - фоновый поток каждые interval секунд снимает стек потока event loop
+      (sys._current_frames) — сам профилируемый код не инструментируется
+    - корутина-пульс отмечает каждый свой запуск; если поток семплирования видит,
+      что пульса нет дольше block_threshold, значит loop занят синхронным кодом,
+      и снятые в этот момент стеки записываются как виновники блокировки
+    """
+
+    def __init__(self, interval: float = 0.01, block_threshold: float = 0.1):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._blocked_stacks: Counter = Counter()
+
+    async def run(self, duration: float) -> ProfileResult:
+        """Профилирует loop, в котором вызван, в течение duration секунд"""
+        loop_thread_id = threading.get_ident()
+        stacks: Counter = Counter()
+        episodes: list[BlockingEpisode] = []
+        stop = threading.Event()
+        started = time.perf_counter()
+        self._last_beat = started
+
+        def sample() -> None:
+            while not stop.wait(self.interval):
+                frame = sys._current_frames().get(loop_thread_id)
+                stack = collapse_stack(frame)
+                del frame
+                stacks[stack] += 1
+                if time.perf_counter() - self._last_beat > self.block_threshold:
+                    with self._lock:
+                        self._blocked_stacks[stack] += 1
+
+        async def heartbeat() -> None:
+            # Пульс чаще порога, чтобы не считать блокировкой обычное ожидание sleep
+            beat_interval = min(self.interval, self.block_threshold / 4)
+            while True:
+                await asyncio.sleep(beat_interval)
+                now = time.perf_counter()
+                lag = now - self._last_beat - beat_interval
+                if lag > self.block_threshold:
+                    with self._lock:
+                        blocked, self._blocked_stacks = self._blocked_stacks, Counter()
+                    episodes.append(BlockingEpisode(
+                        started_at=round(self._last_beat + beat_interval - started, 4),
+                        duration_ms=round(lag * 1000, 1),
+                        stacks=blocked,
+                    ))
+                self._last_beat = now
+
+        sampler = threading.Thread(target=sample, name="sampling-profiler", daemon=True)
+        pulse = asyncio.create_task(heartbeat())
+        sampler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            pulse.cancel()
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"🔬 Профилирование завершено: {sum(stacks.values())} семплов за {elapsed:.1f} с, "
+            f"блокировок event loop: {len(episodes)}"
+        )
+        return ProfileResult(
+            duration=elapsed,
+            interval=self.interval,
+            samples=sum(stacks.values()),
+            stacks=stacks,
+            episodes=episodes,
+        )
+
+
+# Одновременно работает только один профилировщик на процесс
+profiler_lock = asyncio.Lock()
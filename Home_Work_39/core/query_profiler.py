@@ -0,0 +1,109 @@
+# core/query_profiler.py
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class RequestQueryStats:
+    """SQL-запросы, выполненные в рамках одного HTTP-запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_selects(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Одинаковые SELECT, выполненные threshold и более раз, — типичный след N+1:
+        для каждой строки списка подгружается связь отдельным запросом.
+        """
+        return [
+            (statement, times)
+            for statement, times in self.statements.most_common()
+            if times >= threshold and statement.lstrip().upper().startswith("SELECT")
+        ]
+
+
+# Статистика текущего запроса (None — вне HTTP-запроса, например в скриптах)
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    """
+    Подключает подсчёт SQL-запросов к движку через события курсора.
+    Время старта хранится в контексте выполнения запроса, а не на соединении:
+    запрос, упавший с ошибкой, не оставляет метку, сбивающую следующие замеры.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_profiler_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "query_profiler_start", None)
+        stats = current_query_stats.get()
+        if stats is not None and started is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+
+class QueryProfilerMiddleware:
+    """
+    Считает SQL-запросы каждого HTTP-запроса и предупреждает о N+1.
+
+    - в ответ добавляются заголовки X-Query-Count и X-Query-Time-Ms
+      (для потоковых ответов — запросы, выполненные до начала отправки тела)
+    - итог по всему запросу, включая потоковое тело, пишется в лог
+    - если один и тот же SELECT повторился threshold и более раз — предупреждение
+    """
+
+    def __init__(self, app: ASGIApp, threshold: int = 5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append((b"x-query-time-ms", f"{stats.total_time * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+            self.report(scope, stats)
+
+    def report(self, scope: Scope, stats: RequestQueryStats) -> None:
+        if not stats.count:
+            return
+        endpoint = f"{scope['method']} {scope['path']}"
+        logger.debug(f"🔎 {endpoint}: {stats.count} SQL-запросов за {stats.total_time * 1000:.1f} мс")
+        for statement, times in stats.repeated_selects(self.threshold):
+            logger.warning(
+                f"⚠️ Возможный N+1 в {endpoint}: запрос выполнен {times} раз: {' '.join(statement.split())[:200]}"
+            )
@@ -0,0 +1,260 @@
+# core/rate_limit.py
+import json
+import logging
+import math
+import time
+import uuid
+from collections import deque
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Тело запроса входа/регистрации крошечное; больше — не разбираем
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Разбирает лимит вида "5/60" -> (5 запросов, 60 секунд)"""
+    limit, _, window = rate.partition("/")
+    return int(limit), float(window)
+
+
+class MemoryRateLimiter:
+    """
+    Скользящее окно в памяти процесса: для каждого ключа — очередь
+    меток времени разрешённых запросов за последние window секунд.
+    Отклонённые попытки не учитываются, поэтому пользователь может войти
+    сразу после того, как окно освободится.
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, sweep_every: int = 1000):
+        self._hits: dict[str, deque] = {}
+        # Окно запоминается для каждого ключа: у входа и регистрации они разные
+        self._windows: dict[str, float] = {}
+        self._calls = 0
+        self._sweep_every = sweep_every
+
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        """
+        Returns:
+            tuple[bool, float]: Разрешён ли запрос и через сколько секунд повторить
+        """
+        now = time.monotonic()
+        # Очистка до получения очереди ключа — иначе попытка могла бы записаться в уже удалённую
+        self._calls += 1
+        if self._calls % self._sweep_every == 0:
+            self._sweep(now)
+
+        hits = self._hits.setdefault(key, deque())
+        self._windows[key] = window
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+        if len(hits) >= limit:
+            return False, hits[0] + window - now
+        hits.append(now)
+        return True, 0.0
+
+    def _sweep(self, now: float) -> None:
+        # Ключи без попыток в пределах их собственного окна удаляем, чтобы словарь не рос бесконечно
+        expired = [
+            key for key, hits in self._hits.items()
+            if not hits or hits[-1] <= now - self._windows[key]
+        ]
+        for key in expired:
+            del self._hits[key]
+            del self._windows[key]
+
+
+# Проверка и запись попытки одной атомарной операцией в Redis
+REDIS_SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, tostring(tonumber(oldest[2]) + window - now)}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(window))
+return {1, '0'}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Скользящее окно в Redis (sorted set на ключ) — общий лимит для всех
+    воркеров и серверов. Если Redis недоступен, запрос пропускается:
+    ограничитель не должен класть вход целиком.
+    """
+
+    backend_name = "redis"
+
+    def __init__(self, client, prefix: str = "shop:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(REDIS_SLIDING_WINDOW)
+
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._script(
+                keys=[self.prefix + key],
+                args=[time.time(), window, limit, uuid.uuid4().hex],
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Redis недоступен для ограничения частоты {key}: {e}")
+            return True, 0.0
+        return bool(int(allowed)), float(retry_after)
+
+
+def create_rate_limiter(backend: str):
+    """
+    Создаёт хранилище счётчиков выбранного типа.
+
+    Args:
+        backend: "memory" или "redis"
+
+    Returns:
+        Ограничитель. Если Redis-клиент не установлен, используется память процесса.
+    """
+    if backend == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("⚠️ Пакет redis не установлен — лимиты хранятся в памяти процесса")
+        else:
+            return RedisRateLimiter(redis_asyncio.from_url(settings.redis_url))
+    return MemoryRateLimiter()
+
+
+class AuthRateLimitMiddleware:
+    """
+    Ограничивает частоту POST на эндпоинты входа и регистрации по IP и email.
+
+    Решение принимается до вызова приложения — то есть до хеширования пароля
+    и запросов к таблице user. Email берётся из тела запроса (форма входа —
+    поле username, JSON регистрации — поле email); тело затем передаётся
+    приложению без изменений. При превышении — 429 с заголовком Retry-After.
+
+    rules: путь -> {"ip": "20/60", "email": "5/60"} (любой из ключей можно опустить)
+
+    trust_forwarded/trusted_proxies: IP клиента берётся из X-Forwarded-For —
+    адрес, дописанный самым левым из trusted_proxies доверенных прокси
+    (trusted_proxies-я запись справа). Всё, что левее, прислал сам клиент.
+    """
+
+    def __init__(self, app: ASGIApp, limiter, rules: dict[str, dict[str, str]],
+                 trust_forwarded: bool = False, trusted_proxies: int = 1):
+        self.app = app
+        self.limiter = limiter
+        self.rules = {path: {kind: parse_rate(rate) for kind, rate in rule.items()} for path, rule in rules.items()}
+        self.trust_forwarded = trust_forwarded
+        self.trusted_proxies = max(1, trusted_proxies)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = self.rules.get(scope.get("path")) if scope["type"] == "http" else None
+        if rule is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        messages: list[Message] = []
+        email = None
+        if "email" in rule:
+            body, messages = await self.read_body(receive)
+            email = self.extract_email(scope, body)
+
+        checks = [("ip", self.client_ip(scope))]
+        if email:
+            checks.append(("email", email))
+
+        for kind, value in checks:
+            if kind not in rule or value is None:
+                continue
+            limit, window = rule[kind]
+            allowed, retry_after = await self.limiter.hit(f"{scope['path']}:{kind}:{value}", limit, window)
+            if not allowed:
+                logger.warning(f"🚫 Превышен лимит {scope['path']} для {kind}={value}")
+                response = JSONResponse(
+                    {"detail": "Слишком много попыток. Повторите позже."},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, self.replay(messages, receive), send)
+
+    def client_ip(self, scope: Scope) -> Optional[str]:
+        if self.trust_forwarded:
+            # Несколько заголовков склеиваются по порядку, как одна цепочка
+            chain = [
+                entry.strip()
+                for name, value in scope.get("headers", [])
+                if name == b"x-forwarded-for"
+                for entry in value.decode("latin-1").split(",")
+            ]
+            chain = [entry for entry in chain if entry]
+            if len(chain) >= self.trusted_proxies:
+                return chain[-self.trusted_proxies]
+        client = scope.get("client")
+        return client[0] if client else None
+
+    @staticmethod
+    async def read_body(receive: Receive) -> tuple[Optional[bytes], list[Message]]:
+        """Читает тело целиком (до MAX_INSPECTED_BODY) и запоминает сообщения для повтора"""
+        messages: list[Message] = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return None, messages
+            body += message.get("body", b"")
+            if len(body) > MAX_INSPECTED_BODY:
+                return None, messages
+            if not message.get("more_body", False):
+                return body, messages
+
+    @staticmethod
+    def extract_email(scope: Scope, body: Optional[bytes]) -> Optional[str]:
+        if not body:
+            return None
+        content_type = ""
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+                break
+        try:
+            if "application/x-www-form-urlencoded" in content_type:
+                values = parse_qs(body.decode("utf-8")).get("username")
+                email = values[0] if values else None
+            elif "json" in content_type:
+                data = json.loads(body)
+                email = data.get("email") if isinstance(data, dict) else None
+            else:
+                return None
+        except (UnicodeDecodeError, ValueError):
+            return None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    @staticmethod
+    def replay(messages: list[Message], receive: Receive) -> Receive:
+        """receive, который сначала отдаёт уже прочитанные сообщения"""
+        pending = list(messages)
+
+        async def wrapped() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return wrapped
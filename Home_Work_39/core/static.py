@@ -0,0 +1,78 @@
+# core/static.py
+import os
+import re
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from core.config import settings
+
+# Имена файлов хранилища: sha256 содержимого (+ суффикс производного варианта)
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+$")
+
+# Содержимое по такому URL никогда не меняется — кэшируем на год
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def is_hashed_name(filename: str) -> bool:
+    """Имя файла построено из хеша содержимого"""
+    return HASHED_NAME_RE.match(filename) is not None
+
+
+def cache_headers(filename: str) -> dict:
+    """
+    Заголовки кэширования для файла из /uploads.
+
+    Для файлов с хешем в имени ETag строится из самого имени: это сильный
+    валидатор, не зависящий от mtime (одинаков на всех серверах за балансировщиком).
+    Для остальных файлов ETag и Last-Modified выставляет FileResponse по stat().
+    """
+    if is_hashed_name(filename):
+        return {"cache-control": IMMUTABLE_CACHE_CONTROL, "etag": f'"{filename}"'}
+    return {"cache-control": f"public, max-age={settings.uploads_max_age}"}
+
+
+class UploadFiles(StaticFiles):
+    """
+    Раздача загруженных файлов с заголовками для браузеров и CDN.
+
+    - Cache-Control: immutable и сильный ETag для файлов с хешем в имени
+    - If-None-Match / If-Modified-Since -> 304 (логика StaticFiles)
+    - Range / If-Range -> 206 (логика FileResponse, Starlette >= 0.39 —
+      отсюда fastapi>=0.115 в requirements.txt)
+    - если ASGI-сервер поддерживает расширение http.response.pathsend,
+      файл отдаётся им (sendfile), иначе читается блоками uploads_chunk_size
+    - если задан uploads_accel_redirect, тело отдаёт nginx через X-Accel-Redirect
+    """
+
+    def __init__(self, *args, accel_redirect: Optional[str] = None, chunk_size: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accel_redirect = accel_redirect
+        self.chunk_size = chunk_size or settings.uploads_chunk_size
+
+    def file_response(
+        self,
+        full_path: "os.PathLike[str] | str",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = cache_headers(os.path.basename(full_path))
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        response.chunk_size = self.chunk_size
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if self.accel_redirect and status_code == 200:
+            # Прокси сам отдаст файл через sendfile и обработает Range
+            relative = os.path.relpath(full_path, os.path.realpath(self.directory)).replace(os.sep, "/")
+            response.headers["x-accel-redirect"] = self.accel_redirect.rstrip("/") + "/" + relative
+            return Response(status_code=200, headers={
+                key: value for key, value in response.headers.items() if key != "content-length"
+            })
+        return response
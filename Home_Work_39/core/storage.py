@@ -1,7 +1,19 @@
+import hashlib
 import logging
+import os
+import shutil
+import tempfile
+import time
 import uuid
 from pathlib import Path
+from typing import Tuple
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from core.database import AsyncSessionLocal
+from core.images import delete_variants
+from models.product import ProductModel
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -12,10 +24,117 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 МБ
+CHUNK_SIZE = 64 * 1024  # Размер блока при потоковой записи (64 КБ)
+UPLOAD_URL_PREFIX = "/uploads/products/"
 
-async def save_product_image(file: UploadFile) -> str:
+# Файлы хранятся по SHA-256 содержимого: uploads/products/ab/cd/abcd...ef.png.
+# Два уровня по 256 папок — в одной папке не скапливаются миллионы файлов
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+
+# Незавершённые загрузки (*.part) и надгробия удаления (*.deleted) старше этого
+# возраста остались от упавшего процесса. Моложе — могут принадлежать соседнему воркеру
+STALE_FILE_AGE = 3600  # с
+
+def file_too_large_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Файл слишком большой. Максимальный размер: {MAX_FILE_SIZE // (1024*1024)} МБ"
+    )
+
+def blob_relative_path(digest: str, ext: str) -> Path:
+    """Путь блоба относительно UPLOAD_DIR: ab/cd/<digest><ext>"""
+    shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_DEPTH)]
+    return Path(*shards, f"{digest}{ext}")
+
+def _write_chunk(out, hasher, chunk: bytes) -> None:
+    out.write(chunk)
+    hasher.update(chunk)
+
+async def stream_to_temp_file(file: UploadFile, directory: Path) -> Tuple[Path, int, str]:
     """
-    Сохраняет изображение товара с валидацией и возвращает URL-путь
+    Потоково записывает загруженный файл во временный файл в directory
+    и по ходу считает SHA-256 содержимого.
+    Файл читается блоками по CHUNK_SIZE, запись и хеширование идут в пуле потоков,
+    поэтому ни весь файл не попадает в память, ни event loop не блокируется.
+    Как только размер превышает MAX_FILE_SIZE, загрузка прерывается.
+
+    Returns:
+        Tuple[Path, int, str]: Путь к временному файлу, размер в байтах и hex-хеш
+    """
+    # Временный файл в той же папке — чтобы переименование было атомарным
+    fd, temp_name = await run_in_threadpool(tempfile.mkstemp, suffix=".part", dir=directory)
+    temp_path = Path(temp_name)
+    size = 0
+    hasher = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    logger.error(f"❌ Файл слишком большой: более {MAX_FILE_SIZE} байт")
+                    raise file_too_large_error()
+                await run_in_threadpool(_write_chunk, out, hasher, chunk)
+    except BaseException:
+        await run_in_threadpool(temp_path.unlink, True)
+        raise
+    return temp_path, size, hasher.hexdigest()
+
+def _store_blob(temp_path: Path, filepath: Path) -> bool:
+    """
+    Создаёт блоб жёсткой ссылкой на временный файл (или копией, если ФС
+    не поддерживает ссылки). Временный файл остаётся до коммита ссылки
+    на блоб — см. confirm_product_image.
+
+    Returns:
+        bool: False, если такой блоб уже был
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(temp_path, filepath)
+    except FileExistsError:
+        return False
+    except OSError:
+        if filepath.exists():
+            return False
+        fd, copy_name = tempfile.mkstemp(suffix=".part", dir=filepath.parent)
+        os.close(fd)
+        shutil.copyfile(temp_path, copy_name)
+        os.replace(copy_name, filepath)
+    return True
+
+def _restore_blob(temp_path: Path, filepath: Path) -> bool:
+    """
+    Убирает временный файл после коммита. Если блоб за это время удалили
+    (release_product_image другого товара не видел нашу ещё не закоммиченную ссылку),
+    возвращает его на место из временного файла.
+
+    Returns:
+        bool: True, если блоб пришлось восстановить
+    """
+    if filepath.exists():
+        temp_path.unlink(missing_ok=True)
+        return False
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, filepath)
+    return True
+
+async def save_product_image(file: UploadFile) -> Tuple[str, Path]:
+    """
+    Сохраняет изображение товара с валидацией.
+    Имя файла — хеш содержимого, поэтому одинаковые изображения
+    хранятся на диске один раз и разделяются между товарами.
+
+    Блоб может уже существовать и быть удалён параллельным release_product_image,
+    пока ссылка на него не закоммичена. Поэтому возвращается и временный файл
+    с тем же содержимым: после коммита вызовите confirm_product_image,
+    при ошибке — discard_pending_image.
+
+    Returns:
+        Tuple[str, Path]: URL-путь и временный файл
     """
     logger.info(f"📥 Начало загрузки файла: {file.filename}")
     
@@ -28,25 +147,27 @@ async def save_product_image(file: UploadFile) -> str:
             detail=f"Неподдерживаемый формат файла. Разрешены: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Чтение и проверка размера файла
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        logger.error(f"❌ Файл слишком большой: {len(content)} байт")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Файл слишком большой. Максимальный размер: {MAX_FILE_SIZE // (1024*1024)} МБ"
-        )
-    
-    # Генерация уникального имени файла
-    filename = f"{uuid.uuid4()}{ext}"
-    filepath = UPLOAD_DIR / filename
+    # Если клиент сообщил размер, отклоняем заведомо большой файл сразу
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > MAX_FILE_SIZE:
+        logger.error(f"❌ Файл слишком большой: {declared_size} байт")
+        raise file_too_large_error()
     
-    # Сохранение файла
+    # Потоковое сохранение во временный файл, имя — по хешу содержимого
+    temp_path = None
     try:
-        with open(filepath, "wb") as f:
-            f.write(content)
-        logger.info(f"✅ Файл сохранён: {filepath}")
+        temp_path, size, digest = await stream_to_temp_file(file, UPLOAD_DIR)
+        relative_path = blob_relative_path(digest, ext)
+        filepath = UPLOAD_DIR / relative_path
+        if await run_in_threadpool(_store_blob, temp_path, filepath):
+            logger.info(f"✅ Файл сохранён: {filepath} ({size} байт)")
+        else:
+            logger.info(f"♻️ Файл уже есть в хранилище: {filepath}")
+    except HTTPException:
+        raise
     except Exception as e:
+        if temp_path is not None:
+            await discard_pending_image(temp_path)
         logger.error(f"❌ Ошибка сохранения файла: {e}")
         raise HTTPException(
             status_code=500,
@@ -54,15 +175,87 @@ async def save_product_image(file: UploadFile) -> str:
         )
     
     # Возвращаем URL-путь
-    return f"/uploads/products/{filename}"
+    return UPLOAD_URL_PREFIX + relative_path.as_posix(), temp_path
+
+async def confirm_product_image(image_url: str, pending: Path) -> None:
+    """Вызывается после коммита ссылки на изображение: гарантирует, что блоб на диске"""
+    if await run_in_threadpool(_restore_blob, pending, image_path(image_url)):
+        logger.warning(f"♻️ Блоб {image_url} был удалён до коммита ссылки — восстановлен")
+
+async def discard_pending_image(pending: Path) -> None:
+    """Удаляет временный файл, если ссылку на изображение сохранить не удалось"""
+    await run_in_threadpool(pending.unlink, True)
+
+def image_path(image_url: str) -> Path:
+    """
+    Путь к файлу изображения на диске по его URL.
+    Поддерживает и шардированные пути, и старые плоские (uuid4 + ext).
+    """
+    if image_url.startswith(UPLOAD_URL_PREFIX):
+        relative = Path(image_url[len(UPLOAD_URL_PREFIX):])
+    else:
+        relative = Path(Path(image_url).name)
+    # URL приходит из БД, но выход за пределы папки загрузок не допускаем
+    if ".." in relative.parts or relative.is_absolute():
+        return UPLOAD_DIR / relative.name
+    return UPLOAD_DIR / relative
+
+async def count_image_references(session: AsyncSession, image_url: str) -> int:
+    """Сколько товаров ссылаются на изображение (счётчик ссылок блоба)"""
+    result = await session.execute(
+        select(func.count()).select_from(ProductModel).where(ProductModel.image_url == image_url)
+    )
+    return result.scalar_one()
+
+async def release_product_image(session: AsyncSession, image_url: str) -> bool:
+    """
+    Освобождает ссылку на изображение. Вызывается после коммита, когда
+    товар уже не ссылается на файл: блоб и его производные удаляются,
+    только если на него не ссылается больше ни один товар.
+
+    Подсчёт ссылок и удаление не атомарны: загрузка того же содержимого могла
+    закоммитить ссылку между ними. Поэтому блоб сначала переименовывается,
+    ссылки считаются повторно, и файл либо возвращается, либо удаляется.
+    Ссылку, закоммиченную уже после переименования, восстановит confirm_product_image.
+
+    Повторный подсчёт идёт в отдельной сессии (своя транзакция — свежий снимок БД),
+    транзакцию вызывающего кода release_product_image не коммитит.
+
+    Returns:
+        bool: True, если файл был удалён с диска
+    """
+    references = await count_image_references(session, image_url)
+    if references:
+        logger.info(f"🔗 Изображение {image_url} используется ещё в {references} товарах — файл сохранён")
+        return False
+
+    filepath = image_path(image_url)
+    tombstone = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex}.deleted")
+    try:
+        await run_in_threadpool(os.replace, filepath, tombstone)
+    except FileNotFoundError:
+        return await run_in_threadpool(delete_product_image, image_url)
+
+    async with AsyncSessionLocal() as recount_session:
+        references = await count_image_references(recount_session, image_url)
+    if references:
+        await run_in_threadpool(os.replace, tombstone, filepath)
+        logger.info(f"🔗 Изображение {image_url} привязано к товару во время удаления — файл сохранён")
+        return False
+
+    await run_in_threadpool(tombstone.unlink)
+    await run_in_threadpool(delete_variants, image_url)
+    logger.info(f"✅ Файл удалён: {filepath}")
+    return True
 
 def delete_product_image(image_url: str) -> bool:
     """
-    Удаляет файл изображения товара
+    Удаляет файл изображения товара вместе с производными (миниатюры, WebP/AVIF).
+    Ссылки не проверяет — для товаров используйте release_product_image.
     """
     try:
-        filename = Path(image_url).name
-        filepath = UPLOAD_DIR / filename
+        filepath = image_path(image_url)
+        delete_variants(image_url)
         
         if filepath.exists():
             filepath.unlink()
@@ -73,4 +266,46 @@ def delete_product_image(image_url: str) -> bool:
             return False
     except Exception as e:
         logger.error(f"❌ Ошибка удаления файла: {e}")
-        return False
\ No newline at end of file
+        return False
+def _find_stale_files(now: float) -> Tuple[list, list]:
+    """Ищет в UPLOAD_DIR старые *.part и *.deleted (см. STALE_FILE_AGE)"""
+    parts, tombstones = [], []
+    for path in UPLOAD_DIR.rglob("*"):
+        if path.suffix not in (".part", ".deleted") or not path.is_file():
+            continue
+        try:
+            if now - path.stat().st_mtime < STALE_FILE_AGE:
+                continue
+        except FileNotFoundError:
+            continue
+        (parts if path.suffix == ".part" else tombstones).append(path)
+    return parts, tombstones
+
+async def sweep_stale_uploads() -> None:
+    """
+    Уборка после аварийного завершения (вызывается при запуске приложения).
+
+    - *.part — временные файлы загрузок, которые не успели стать блобами: удаляются
+    - *.deleted — блоб, переименованный release_product_image перед удалением:
+      если на него снова ссылаются товары, он возвращается на место, иначе удаляется
+    """
+    parts, tombstones = await run_in_threadpool(_find_stale_files, time.time())
+    for path in parts:
+        await run_in_threadpool(path.unlink, True)
+    if parts:
+        logger.info(f"🧹 Удалено незавершённых загрузок: {len(parts)}")
+
+    for tombstone in tombstones:
+        # <digest><ext>.<uuid>.deleted -> <digest><ext>
+        filepath = tombstone.with_name(tombstone.name.rsplit(".", 2)[0])
+        image_url = UPLOAD_URL_PREFIX + filepath.relative_to(UPLOAD_DIR).as_posix()
+        async with AsyncSessionLocal() as session:
+            references = await count_image_references(session, image_url)
+        if references and not filepath.exists():
+            await run_in_threadpool(os.replace, tombstone, filepath)
+            logger.warning(f"♻️ Блоб {image_url} восстановлен после прерванного удаления")
+        else:
+            await run_in_threadpool(tombstone.unlink, True)
+            if not references:
+                await run_in_threadpool(delete_variants, image_url)
+            logger.info(f"🧹 Удалено надгробие прерванного удаления: {tombstone}")
@@ -1,34 +1,84 @@
 # main.py
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 import logging
 
 # Импорты FastAPI Users
-from fastapi_users import FastAPIUsers
 from auth.backend import auth_backend
-from auth.manager import get_user_manager
-from models.user import User
+from auth.users import current_superuser, fastapi_users
 from schemas.user import UserRead, UserCreate, UserUpdate
 
 from core.config import settings
-from routes import categories, products
+from core.cache import cache
+from routes import admin, categories, products
+from utils.telegram import dispatcher
+from core.images import check_image_support, shutdown_executor
+from core.storage import sweep_stale_uploads
+from auth.passwords import password_helper
+from core.static import UploadFiles
+from core.database import engine
+from core.query_profiler import QueryProfilerMiddleware, install_query_counter
+from core.rate_limit import AuthRateLimitMiddleware, create_rate_limiter
+from shop_common.metrics import MetricsMiddleware, install_sql_metrics, metrics_response
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения: запуск и остановка фоновых сервисов
+    """
+    check_image_support()
+    await sweep_stale_uploads()
+    await dispatcher.start()
+    yield
+    await dispatcher.stop()
+    # shutdown(wait=True) блокирует — ждём пулы в потоке, не останавливая цикл событий
+    await asyncio.to_thread(shutdown_executor)
+    await asyncio.to_thread(password_helper.shutdown)
+
 app = FastAPI(
     title=settings.app_title,
     version=settings.app_version,
-    description=settings.app_description
+    description=settings.app_description,
+    lifespan=lifespan
 )
 
-# --- FastAPI Users (Auth) ---
-fastapi_users = FastAPIUsers[User, int](
-    get_user_manager,
-    [auth_backend],
-)
+# Подсчёт SQL-запросов на каждый HTTP-запрос и поиск N+1 (dev/test)
+if settings.query_profiling:
+    install_query_counter(engine)
+    app.add_middleware(QueryProfilerMiddleware, threshold=settings.query_n_plus_one_threshold)
+    logger.info("🔎 Профилирование SQL-запросов включено")
+
+# Ограничение частоты входа и регистрации — до хеширования пароля и запросов к БД
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        AuthRateLimitMiddleware,
+        limiter=create_rate_limiter(settings.rate_limit_backend),
+        rules={
+            "/auth/jwt/login": {"ip": settings.rate_limit_login_ip, "email": settings.rate_limit_login_email},
+            "/auth/register": {"ip": settings.rate_limit_register_ip, "email": settings.rate_limit_register_email},
+        },
+        trust_forwarded=settings.rate_limit_trust_forwarded,
+        trusted_proxies=settings.rate_limit_trusted_proxies,
+    )
+
+# Метрики: задержка по маршрутам, запросы в обработке, статусы, время SQL.
+# Подключаются последними, т.е. снаружи — учитываются и ответы 429 ограничителя
+if settings.metrics_enabled:
+    install_sql_metrics(engine, settings.slow_query_ms)
+    app.add_middleware(MetricsMiddleware)
+    logger.info("📈 Метрики Prometheus доступны на /metrics")
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики в формате Prometheus"""
+        return metrics_response()
+
+# --- FastAPI Users (Auth) ---
 # Подключаем роутеры аутентификации
 app.include_router(
     fastapi_users.get_auth_router(auth_backend),
@@ -51,9 +101,14 @@ app.include_router(
 # Подключаем существующие роутеры
 app.include_router(products.router, prefix="/api/v1", tags=["products"])
 app.include_router(categories.router, prefix="/api/v1", tags=["categories"])
+app.include_router(admin.router, prefix="/api/v1")
 
-# Монтирование статических файлов
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Монтирование статических файлов (ETag, Cache-Control, Range, sendfile)
+app.mount(
+    "/uploads",
+    UploadFiles(directory="uploads", accel_redirect=settings.uploads_accel_redirect),
+    name="uploads",
+)
 logger.info("✅ Статические файлы (uploads) подключены")
 
 logger.info("✅ Система аутентификации FastAPI Users подключена")
@@ -66,6 +121,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": settings.app_version}
 
+@app.get("/cache/stats", dependencies=[Depends(current_superuser)])
+async def cache_stats():
+    """Счётчики попаданий/промахов кэша товаров (только для суперпользователей)"""
+    return cache.info()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,5 +1,5 @@
 # models/product.py
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, JSON, Index, literal_column
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -11,10 +11,31 @@ class ProductModel(Base):
     description = Column(Text)
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0)
-    image_url = Column(String(500), nullable=True)  # Новое поле для изображения
+    image_url = Column(String(500), nullable=True, index=True)  # Новое поле для изображения (индекс — для подсчёта ссылок на файл)
+    image_variants = Column(JSON, nullable=True)  # URL миниатюр и WebP/AVIF-вариантов
     
     # Внешний ключ для категории
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     
     # Связь с категорией
-    category = relationship("CategoryModel", back_populates="products")
\ No newline at end of file
+    category = relationship("CategoryModel", back_populates="products")
+
+    __table_args__ = (
+        # Фильтр по категории + диапазон/сортировка по цене
+        Index("ix_products_category_id_price", "category_id", "price"),
+        # Фильтр по категории + порядок по id (обычная выдача и пагинация)
+        Index("ix_products_category_id_id", "category_id", "id"),
+        # Частичный индекс только по товарам в наличии — меньше и быстрее для витрины
+        Index(
+            "ix_products_in_stock_category_id_price",
+            "category_id",
+            "price",
+            sqlite_where=literal_column("stock > 0"),
+            postgresql_where=literal_column("stock > 0"),
+        ),
+    )
+
+
+# Условие "в наличии" в том же виде, что и у частичного индекса:
+# константа должна попасть в SQL литералом, иначе планировщик не применит индекс
+IN_STOCK_CONDITION = ProductModel.stock > literal_column("0")
\ No newline at end of file
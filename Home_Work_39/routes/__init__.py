@@ -1,5 +1,6 @@
 # routes/__init__.py
 from .products import router as products_router
 from .categories import router as categories_router
+from .admin import router as admin_router
 
-__all__ = ["products_router", "categories_router"]
\ No newline at end of file
+__all__ = ["products_router", "categories_router", "admin_router"]
\ No newline at end of file
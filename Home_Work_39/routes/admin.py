@@ -0,0 +1,59 @@
+# routes/admin.py
+import logging
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from auth.users import current_superuser
+from core.config import settings
+from core.profiler import SamplingProfiler, profiler_lock
+from models.user import User
+from schemas.profiler import BlockingEpisodeResponse, ProfileReport
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+
+@router.get("/profile", response_model=ProfileReport)
+async def profile_process(
+    seconds: float = Query(5.0, gt=0, le=settings.profiler_max_seconds, description="Длительность профилирования, с"),
+    interval_ms: float = Query(settings.profiler_interval_ms, ge=1, le=1000, description="Интервал семплирования, мс"),
+    block_threshold_ms: float = Query(settings.profiler_block_threshold_ms, ge=5, description="Порог блокировки event loop, мс"),
+    format: Literal["json", "collapsed"] = Query("json", description="collapsed — только профиль текстом, для flamegraph.pl"),
+    user: User = Depends(current_superuser),
+):
+    """
+    Семплирующее профилирование работающего процесса (только для суперпользователей).
+    Запрос держится открытым seconds секунд; в это время воркер продолжает
+    обслуживать остальные запросы, которые и попадают в профиль.
+    """
+    if profiler_lock.locked():
+        raise HTTPException(status_code=409, detail="Profiling is already running in this worker")
+
+    async with profiler_lock:
+        logger.info(f"🔬 {user.email} запустил профилирование на {seconds} с")
+        profiler = SamplingProfiler(interval=interval_ms / 1000, block_threshold=block_threshold_ms / 1000)
+        result = await profiler.run(seconds)
+
+    if format == "collapsed":
+        return PlainTextResponse(result.collapsed())
+
+    return ProfileReport(
+        duration=round(result.duration, 3),
+        interval_ms=interval_ms,
+        samples=result.samples,
+        collapsed=result.collapsed(),
+        blocking_threshold_ms=block_threshold_ms,
+        blocking_episodes=[
+            BlockingEpisodeResponse(
+                started_at=episode.started_at,
+                duration_ms=episode.duration_ms,
+                stacks=dict(episode.stacks.most_common()),
+            )
+            for episode in result.episodes
+        ],
+    )
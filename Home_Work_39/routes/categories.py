@@ -144,9 +144,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import case, func
+from core.cache import cache, CATEGORY_SUMMARY_CACHE_KEY
 from core.database import get_db
 from models.category import CategoryModel
-from schemas.category import CategoryCreate, CategoryResponse
+from models.product import ProductModel
+from schemas.category import CategoryCreate, CategoryResponse, CategorySummary
 
 router = APIRouter(
     prefix="/categories",
@@ -172,9 +175,54 @@ async def create_category(
     db_category = CategoryModel(name=category.name)
     db.add(db_category)
     await db.commit()
+    await cache.delete(CATEGORY_SUMMARY_CACHE_KEY)
     await db.refresh(db_category)
     return db_category
 
+@router.get("/summary", response_model=list[CategorySummary], summary="Категории со статистикой по товарам")
+async def read_categories_summary(
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Все категории с количеством товаров, количеством в наличии и
+    минимальной/максимальной/средней ценой. Считается одним GROUP BY
+    по products и кэшируется до следующего изменения товаров или категорий.
+    """
+    cached = await cache.get(CATEGORY_SUMMARY_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    # LEFT JOIN — категории без товаров тоже попадают в сводку (с нулями)
+    result = await db.execute(
+        select(
+            CategoryModel.id,
+            CategoryModel.name,
+            func.count(ProductModel.id).label("product_count"),
+            func.coalesce(func.sum(case((ProductModel.stock > 0, 1), else_=0)), 0).label("in_stock_count"),
+            func.min(ProductModel.price).label("min_price"),
+            func.max(ProductModel.price).label("max_price"),
+            func.avg(ProductModel.price).label("avg_price"),
+        )
+        .outerjoin(ProductModel, ProductModel.category_id == CategoryModel.id)
+        .group_by(CategoryModel.id, CategoryModel.name)
+        .order_by(CategoryModel.id)
+    )
+
+    summary = [
+        CategorySummary(
+            id=row.id,
+            name=row.name,
+            product_count=row.product_count,
+            in_stock_count=row.in_stock_count,
+            min_price=row.min_price,
+            max_price=row.max_price,
+            avg_price=round(row.avg_price, 2) if row.avg_price is not None else None,
+        ).model_dump()
+        for row in result
+    ]
+    await cache.set(CATEGORY_SUMMARY_CACHE_KEY, summary)
+    return summary
+
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def read_category(
     category_id: int, 
@@ -229,6 +277,7 @@ async def update_category(
 
     db_category.name = category.name
     await db.commit()
+    await cache.delete(CATEGORY_SUMMARY_CACHE_KEY)
     await db.refresh(db_category)
     return db_category
 
@@ -246,4 +295,5 @@ async def delete_category(
 
     await db.delete(db_category)
     await db.commit()
+    await cache.delete(CATEGORY_SUMMARY_CACHE_KEY)
     return {"message": "Category deleted successfully"}
\ No newline at end of file
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from sqlalchemy import update
+from sqlalchemy import insert, update, tuple_
 import logging
-from core.database import get_db
+from core.config import settings
+from core.database import get_db, AsyncSessionLocal
+from core.pagination import encode_cursor, decode_cursor
+from core.cache import cache, product_cache_key, CATEGORY_SUMMARY_CACHE_KEY
+from core.loading import eager_load
+from core.filters import apply_product_filters, apply_product_sort, build_facet_query, bucket_bounds
 from models.product import ProductModel
 from models.category import CategoryModel
-from schemas.product import ProductCreate, ProductResponse
-from core.storage import save_product_image, delete_product_image
+from schemas.product import ProductCreate, ProductResponse, ProductWithCategoryResponse, ProductPage, BulkImportResult, BulkRowResult
+from schemas.product import FacetedSearchResult, CategoryFacet, PriceBucketFacet, ProductFacets
+from core.storage import (
+    save_product_image, confirm_product_image, discard_pending_image, release_product_image, image_path
+)
+from core.images import process_product_image
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -17,6 +33,11 @@ router = APIRouter(
     tags=["products"]
 )
 
+# Сколько строк забирать из курсора БД за один раз при экспорте
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = ["id", "name", "description", "price", "stock", "category_id", "category_name", "image_url"]
+
 async def product_get_by_id(session: AsyncSession, product_id: int) -> ProductModel:
     """
     Вспомогательная функция для получения товара по ID
@@ -27,6 +48,24 @@ async def product_get_by_id(session: AsyncSession, product_id: int) -> ProductMo
     product = result.scalar_one_or_none()
     return product
 
+async def product_get_cached(session: AsyncSession, product_id: int) -> dict | None:
+    """
+    Read-through чтение товара: сначала кэш, при промахе — БД.
+    В кэш кладётся сериализованный ProductResponse, а не ORM-объект.
+    """
+    key = product_cache_key(product_id)
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    product = await product_get_by_id(session, product_id)
+    if product is None:
+        return None
+
+    data = ProductResponse.model_validate(product).model_dump()
+    await cache.set(key, data)
+    return data
+
 @router.post("/", response_model=ProductResponse)
 async def create_product(
     product: ProductCreate, 
@@ -49,30 +88,300 @@ async def create_product(
     )
     db.add(db_product)
     await db.commit()
+    await cache.delete(CATEGORY_SUMMARY_CACHE_KEY)
     await db.refresh(db_product)
     return db_product
 
+async def read_bulk_rows(request: Request) -> list[Any]:
+    """
+    Читает тело запроса массового импорта: JSON-массив или NDJSON
+    (по одному объекту на строку). NDJSON разбирается по мере поступления
+    данных, без загрузки всего тела в одну строку.
+    Строки NDJSON с некорректным JSON возвращаются как исключения,
+    чтобы попасть в построчный отчёт.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows: list[Any] = []
+        buffer = b""
+
+        def parse_line(line: bytes):
+            line = line.strip()
+            if not line:
+                return
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(ValueError(f"Invalid JSON: {e}"))
+
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                parse_line(line)
+            if len(rows) > settings.bulk_max_rows:
+                break
+        parse_line(buffer)
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of products")
+
+    if len(rows) > settings.bulk_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows. Maximum per request: {settings.bulk_max_rows}"
+        )
+    return rows
+
+@router.post("/bulk", response_model=BulkImportResult, summary="Массовый импорт товаров")
+async def bulk_import_products(
+    request: Request,
+    batch_size: int = Query(settings.bulk_batch_size, ge=1, le=5000, description="Размер пачки INSERT"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Импортирует список товаров (JSON-массив или NDJSON, Content-Type: application/x-ndjson).
+    Все category_id проверяются одним запросом, вставка идёт пачками
+    в рамках одной транзакции. Возвращает результат по каждой строке.
+    """
+    rows = await read_bulk_rows(request)
+    results: list[Optional[BulkRowResult]] = [None] * len(rows)
+
+    # Валидация строк
+    valid: list[tuple[int, ProductCreate]] = []
+    for index, raw in enumerate(rows):
+        if isinstance(raw, Exception):
+            results[index] = BulkRowResult(index=index, status="error", errors=[str(raw)])
+            continue
+        try:
+            valid.append((index, ProductCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+            results[index] = BulkRowResult(index=index, status="error", errors=errors)
+
+    # Проверяем все категории одним запросом
+    category_ids = {product.category_id for _, product in valid}
+    existing_ids: set[int] = set()
+    if category_ids:
+        result = await db.execute(
+            select(CategoryModel.id).where(CategoryModel.id.in_(category_ids))
+        )
+        existing_ids = set(result.scalars().all())
+
+    to_insert: list[tuple[int, ProductCreate]] = []
+    for index, product in valid:
+        if product.category_id in existing_ids:
+            to_insert.append((index, product))
+        else:
+            results[index] = BulkRowResult(index=index, status="error", errors=["Category not found"])
+
+    # Пакетная вставка в одной транзакции
+    try:
+        for start in range(0, len(to_insert), batch_size):
+            batch = to_insert[start:start + batch_size]
+            result = await db.execute(
+                insert(ProductModel).returning(ProductModel.id, sort_by_parameter_order=True),
+                [product.model_dump() for _, product in batch]
+            )
+            for (index, _), new_id in zip(batch, result.scalars().all()):
+                results[index] = BulkRowResult(index=index, status="created", id=new_id)
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"❌ Ошибка массового импорта: {e}")
+        raise HTTPException(status_code=500, detail="Ошибка массового импорта, изменения отменены")
+
+    created = len(to_insert)
+    if created:
+        await cache.delete(CATEGORY_SUMMARY_CACHE_KEY)
+    logger.info(f"✅ Импортировано товаров: {created} из {len(rows)}")
+    return BulkImportResult(
+        total=len(rows),
+        created=created,
+        failed=len(rows) - created,
+        results=results,
+    )
+
+async def export_rows(format: str) -> AsyncIterator[bytes]:
+    """
+    Генератор экспорта каталога. Строки читаются серверным курсором
+    (AsyncSession.stream + yield_per) и отдаются клиенту пачками,
+    поэтому расход памяти не зависит от размера таблицы.
+    Сессия открывается внутри генератора: она должна жить, пока идёт ответ.
+    """
+    if format == "csv":
+        # Заголовок уходит клиенту ещё до выполнения запроса
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue().encode("utf-8")
+
+    query = (
+        select(
+            ProductModel.id,
+            ProductModel.name,
+            ProductModel.description,
+            ProductModel.price,
+            ProductModel.stock,
+            ProductModel.category_id,
+            CategoryModel.name.label("category_name"),
+            ProductModel.image_url,
+        )
+        .join(CategoryModel, ProductModel.category_id == CategoryModel.id)
+        .order_by(ProductModel.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(partition)
+                yield buffer.getvalue().encode("utf-8")
+            else:
+                yield "".join(
+                    json.dumps(dict(row._mapping), ensure_ascii=False) + "\n"
+                    for row in partition
+                ).encode("utf-8")
+
+@router.get("/export", summary="Экспорт каталога (NDJSON или CSV)")
+async def export_products(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Формат выгрузки")
+):
+    """
+    Потоковая выгрузка всего каталога вместе с названиями категорий.
+    """
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+@router.get("/keyset", response_model=ProductPage, summary="Список товаров с keyset-пагинацией")
+async def read_products_keyset(
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: Literal["id", "name"] = Query("id", description="Ключ сортировки: id или (name, id)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Постраничная выдача товаров по курсору (keyset/seek-пагинация).
+    В отличие от offset, не пропускает предыдущие строки: каждая страница
+    начинается с поиска по индексу, поэтому её стоимость не зависит от глубины.
+    """
+    after = decode_cursor(cursor, sort)
+
+    query = select(ProductModel).options(eager_load(ProductModel.category))
+    if sort == "name":
+        # Составной ключ (name, id) — id разрешает дубликаты названий
+        if after is not None:
+            query = query.where(tuple_(ProductModel.name, ProductModel.id) > tuple_(*after))
+        query = query.order_by(ProductModel.name, ProductModel.id)
+    else:
+        if after is not None:
+            query = query.where(ProductModel.id > after[0])
+        query = query.order_by(ProductModel.id)
+
+    # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+    result = await db.execute(query.limit(limit + 1))
+    products = result.scalars().all()
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        key = [last.name, last.id] if sort == "name" else [last.id]
+        next_cursor = encode_cursor(sort, key)
+
+    return {"items": products, "next_cursor": next_cursor}
+
+@router.get("/search", response_model=FacetedSearchResult, summary="Фасетный поиск товаров")
+async def search_products(
+    q: Optional[str] = Query(None, description="Текст для поиска в названии и описании"),
+    category_id: Optional[int] = Query(None, description="Только товары этой категории"),
+    min_price: Optional[float] = Query(None, ge=0, description="Минимальная цена"),
+    max_price: Optional[float] = Query(None, ge=0, description="Максимальная цена"),
+    in_stock: Optional[bool] = Query(None, description="true — только в наличии, false — только отсутствующие"),
+    sort: Literal["id", "price_asc", "price_desc"] = Query("id", description="Порядок выдачи"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Поиск с фильтрами и счётчиками для боковой панели витрины:
+    сколько товаров в каждой категории и в каждом ценовом диапазоне.
+    Все счётчики считаются одним запросом, товары страницы — вторым.
+    """
+    filters = dict(category_id=category_id, min_price=min_price, max_price=max_price, in_stock=in_stock, search=q)
+    edges = settings.facet_price_buckets
+
+    query = apply_product_sort(apply_product_filters(select(ProductModel), **filters), sort)
+
+    result = await db.execute(
+        query.options(eager_load(ProductModel.category)).offset(skip).limit(limit)
+    )
+    items = result.scalars().all()
+
+    total = 0
+    categories: list[CategoryFacet] = []
+    bucket_counts: dict[int, int] = {}
+    for kind, key, label, count in await db.execute(build_facet_query(edges, **filters)):
+        if kind == "total":
+            total = count
+        elif kind == "category":
+            categories.append(CategoryFacet(id=key, name=label, count=count))
+        else:
+            bucket_counts[key] = count
+
+    # Пустые диапазоны тоже возвращаем — панель фильтров не "прыгает"
+    price = []
+    for index in range(len(edges) + 1):
+        lower, upper = bucket_bounds(edges, index)
+        price.append(PriceBucketFacet(min_price=lower, max_price=upper, count=bucket_counts.get(index, 0)))
+
+    return FacetedSearchResult(
+        items=items,
+        total=total,
+        facets=ProductFacets(categories=sorted(categories, key=lambda facet: facet.id), price=price),
+    )
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def read_product(
     product_id: int, 
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(ProductModel).where(ProductModel.id == product_id)
-    )
-    product = result.scalar_one_or_none()
+    product = await product_get_cached(db, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
-@router.get("/", response_model=list[ProductResponse])
+@router.get("/", response_model=list[ProductWithCategoryResponse])
 async def read_products(
     skip: int = 0, 
     limit: int = 100, 
+    category_id: Optional[int] = Query(None, description="Только товары этой категории"),
+    min_price: Optional[float] = Query(None, ge=0, description="Минимальная цена"),
+    max_price: Optional[float] = Query(None, ge=0, description="Максимальная цена"),
+    in_stock: Optional[bool] = Query(None, description="true — только в наличии, false — только отсутствующие"),
+    sort: Literal["id", "price_asc", "price_desc"] = Query("id", description="Порядок выдачи"),
     db: AsyncSession = Depends(get_db)
 ):
+    query = apply_product_sort(
+        apply_product_filters(select(ProductModel), category_id, min_price, max_price, in_stock),
+        sort,
+    )
+
+    # Категории загружаются вместе со страницей — без отдельного запроса на каждый товар
     result = await db.execute(
-        select(ProductModel).offset(skip).limit(limit)
+        query.options(eager_load(ProductModel.category)).offset(skip).limit(limit)
     )
     products = result.scalars().all()
     return products
@@ -106,6 +415,7 @@ async def update_product(
     db_product.category_id = product.category_id
 
     await db.commit()
+    await cache.delete(product_cache_key(product_id), CATEGORY_SUMMARY_CACHE_KEY)
     await db.refresh(db_product)
     return db_product
 
@@ -121,23 +431,29 @@ async def delete_product(
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Удаляем связанное изображение, если есть
-    if db_product.image_url:
-        delete_product_image(db_product.image_url)
+    image_url = db_product.image_url
 
     await db.delete(db_product)
     await db.commit()
+    await cache.delete(product_cache_key(product_id), CATEGORY_SUMMARY_CACHE_KEY)
+
+    # Файл удаляется, только если это была последняя ссылка на него
+    if image_url:
+        await release_product_image(db, image_url)
     return {"message": "Product deleted successfully"}
 
 @router.post("/{product_id}/upload-image", summary="Загрузить изображение для товара")
 async def upload_product_image(
     product_id: int,
     file: UploadFile,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Загружает изображение для товара и привязывает его. 
-    Если старое изображение было — оно удаляется.
+    Одинаковые файлы хранятся один раз. Старое изображение удаляется,
+    если на него больше не ссылается ни один товар.
+    Миниатюры и WebP/AVIF-варианты создаются в фоне после ответа.
     """
     logger.info(f"📥 Запрос на загрузку изображения для товара ID={product_id}")
     
@@ -146,14 +462,11 @@ async def upload_product_image(
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Удаляем старое изображение, если оно есть
-    if product.image_url:
-        logger.info(f"🗑️ Удаление старого изображения: {product.image_url}")
-        delete_product_image(product.image_url)
+    old_image_url = product.image_url
     
     # Сохраняем новое изображение
     try:
-        image_url = await save_product_image(file)
+        image_url, pending_image = await save_product_image(file)
     except HTTPException as e:
         logger.error(f"❌ Ошибка загрузки изображения: {e.detail}")
         raise e
@@ -166,15 +479,28 @@ async def upload_product_image(
         await db.execute(
             update(ProductModel)
             .where(ProductModel.id == product_id)
-            .values(image_url=image_url)
+            .values(image_url=image_url, image_variants=None)
         )
         await db.commit()
+        await cache.delete(product_cache_key(product_id))
         logger.info(f"✅ Изображение привязано к товару ID={product_id}: {image_url}")
     except Exception as e:
         logger.error(f"❌ Ошибка обновления БД: {e}")
-        # Пытаемся удалить загруженный файл, если обновление БД не удалось
-        delete_product_image(image_url)
+        # Загруженный файл удаляем, если обновление БД не удалось и другим товарам он не нужен
+        await db.rollback()
+        await discard_pending_image(pending_image)
+        await release_product_image(db, image_url)
         raise HTTPException(status_code=500, detail="Ошибка обновления базы данных")
+    await confirm_product_image(image_url, pending_image)
+    
+    # Старое изображение освобождаем только после успешной замены,
+    # чтобы отклонённая загрузка не оставила товар без картинки
+    if old_image_url and old_image_url != image_url:
+        logger.info(f"🗑️ Освобождение старого изображения: {old_image_url}")
+        await release_product_image(db, old_image_url)
+    
+    # Производные изображения — в пуле процессов, вне пути запроса
+    background_tasks.add_task(process_product_image, product_id, image_url, image_path(image_url))
     
     return {"product_id": product_id, "image_url": image_url}
 
@@ -184,7 +510,8 @@ async def delete_product_image_endpoint(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Удаляет изображение товара (с диска и из БД).
+    Удаляет изображение товара из БД, а с диска — если оно
+    больше не используется другими товарами.
     """
     logger.info(f"🗑️ Запрос на удаление изображения для товара ID={product_id}")
     
@@ -197,20 +524,23 @@ async def delete_product_image_endpoint(
     if not product.image_url:
         raise HTTPException(status_code=400, detail="У товара нет изображения")
     
-    # Удаляем файл с диска
-    delete_success = delete_product_image(product.image_url)
+    image_url = product.image_url
     
     # Обновляем БД
     try:
         await db.execute(
             update(ProductModel)
             .where(ProductModel.id == product_id)
-            .values(image_url=None)
+            .values(image_url=None, image_variants=None)
         )
         await db.commit()
+        await cache.delete(product_cache_key(product_id))
         logger.info(f"✅ Изображение удалено из БД для товара ID={product_id}")
     except Exception as e:
         logger.error(f"❌ Ошибка обновления БД: {e}")
         raise HTTPException(status_code=500, detail="Ошибка обновления базы данных")
     
+    # Удаляем файл с диска, если это была последняя ссылка
+    await release_product_image(db, image_url)
+    
     return {"message": "Изображение удалено", "product_id": product_id}
@@ -1,5 +1,6 @@
 # schemas/__init__.py
-from .product import ProductCreate, ProductResponse
-from .category import CategoryCreate, CategoryResponse
+from .product import ProductCreate, ProductResponse, ProductWithCategoryResponse, ProductPage, FacetedSearchResult, BulkImportResult
+from .category import CategoryCreate, CategoryResponse, CategorySummary
+from .profiler import ProfileReport
 
-__all__ = ["ProductCreate", "ProductResponse", "CategoryCreate", "CategoryResponse"]
\ No newline at end of file
+__all__ = ["ProductCreate", "ProductResponse", "ProductWithCategoryResponse", "ProductPage", "FacetedSearchResult", "BulkImportResult", "CategoryCreate", "CategoryResponse", "CategorySummary", "ProfileReport"]
\ No newline at end of file
@@ -1,4 +1,5 @@
 # schemas/category.py
+from typing import Optional
 from pydantic import BaseModel
 
 class CategoryCreate(BaseModel):
@@ -9,4 +10,14 @@ class CategoryResponse(BaseModel):
     name: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CategorySummary(BaseModel):
+    """Категория со статистикой по её товарам"""
+    id: int
+    name: str
+    product_count: int
+    in_stock_count: int
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
\ No newline at end of file
@@ -1,6 +1,7 @@
 # schemas/product.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Literal, Optional
+from schemas.category import CategoryResponse
 
 class ProductCreate(BaseModel):
     name: str = Field(..., min_length=1, description="Название товара")
@@ -17,6 +18,53 @@ class ProductResponse(BaseModel):
     stock: int
     category_id: int
     image_url: Optional[str] = None  # Добавляем поле для изображения
+    image_variants: Optional[Dict[str, str]] = None  # Миниатюры и WebP/AVIF-варианты изображения
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductWithCategoryResponse(ProductResponse):
+    """Товар вместе с категорией (для списков, категория загружается жадно)"""
+    category: Optional[CategoryResponse] = None
+
+class ProductPage(BaseModel):
+    """Страница товаров для keyset-пагинации"""
+    items: List[ProductWithCategoryResponse]
+    next_cursor: Optional[str] = Field(default=None, description="Курсор следующей страницы (None — страниц больше нет)")
+
+class CategoryFacet(BaseModel):
+    """Количество найденных товаров в категории"""
+    id: int
+    name: str
+    count: int
+
+class PriceBucketFacet(BaseModel):
+    """Количество найденных товаров в ценовом диапазоне [min_price, max_price)"""
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    count: int
+
+class ProductFacets(BaseModel):
+    categories: List[CategoryFacet]
+    price: List[PriceBucketFacet]
+
+class FacetedSearchResult(BaseModel):
+    """Страница результатов поиска вместе со счётчиками для фильтров"""
+    items: List[ProductWithCategoryResponse]
+    total: int = Field(..., description="Сколько всего товаров подходит под все фильтры")
+    facets: ProductFacets
+
+
+class BulkRowResult(BaseModel):
+    """Результат импорта одной строки"""
+    index: int = Field(..., description="Порядковый номер строки во входных данных")
+    status: Literal["created", "error"]
+    id: Optional[int] = None
+    errors: List[str] = Field(default_factory=list)
+
+class BulkImportResult(BaseModel):
+    """Итог массового импорта товаров"""
+    total: int
+    created: int
+    failed: int
+    results: List[BulkRowResult]
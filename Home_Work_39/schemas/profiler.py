@@ -0,0 +1,18 @@
+# schemas/profiler.py
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+class BlockingEpisodeResponse(BaseModel):
+    """Период, когда event loop был занят синхронным кодом дольше порога"""
+    started_at: float = Field(..., description="Начало, секунды от старта профилирования")
+    duration_ms: float
+    stacks: Dict[str, int] = Field(..., description="Стеки потока event loop во время блокировки (collapsed) -> число семплов")
+
+class ProfileReport(BaseModel):
+    """Результат семплирующего профилирования процесса"""
+    duration: float = Field(..., description="Фактическая длительность, с")
+    interval_ms: float
+    samples: int
+    collapsed: str = Field(..., description="Профиль в collapsed-формате для flamegraph.pl / speedscope")
+    blocking_threshold_ms: float
+    blocking_episodes: List[BlockingEpisodeResponse]
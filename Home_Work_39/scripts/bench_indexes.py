@@ -0,0 +1,137 @@
+# scripts/bench_indexes.py
+"""
+Проверка индексов каталога: план запроса (EXPLAIN QUERY PLAN) и время
+типичных запросов GET /api/v1/products/ с фильтрами — без новых индексов и с ними.
+
+Запуск из корня проекта:
+    python scripts/bench_indexes.py --rows 200000 --categories 50 --repeat 200
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import random
+import tempfile
+import time
+
+# --- Добавляем корень проекта в путь поиска модулей ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# -----------------------------------------------------
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import sqlite
+from core.database import make_engine
+from core.filters import apply_product_filters, apply_product_sort
+from models.base import Base
+from models.category import CategoryModel
+from models.product import ProductModel
+
+# Индексы, которые проверяет бенчмарк (из ProductModel.__table_args__)
+QUERY_INDEXES = [
+    index for index in ProductModel.__table__.indexes
+    if index.name in (
+        "ix_products_category_id_price",
+        "ix_products_category_id_id",
+        "ix_products_in_stock_category_id_price",
+    )
+]
+
+# Типичные запросы каталога: (название, фильтры, сортировка)
+SCENARIOS = [
+    ("Категория, по id", {"category_id": 7}, "id"),
+    ("Категория, по цене", {"category_id": 7}, "price_asc"),
+    ("Категория + диапазон цен", {"category_id": 7, "min_price": 100, "max_price": 200}, "price_asc"),
+    ("Категория + в наличии, по цене", {"category_id": 7, "in_stock": True}, "price_asc"),
+    ("Категория + в наличии + цены", {"category_id": 7, "in_stock": True, "min_price": 100, "max_price": 200}, "price_desc"),
+]
+
+
+def build_query(filters: dict, sort: str, limit: int = 50):
+    """Тот же запрос, что строит read_products"""
+    query = apply_product_sort(apply_product_filters(select(ProductModel), **filters), sort)
+    return query.limit(limit)
+
+
+def compile_sql(query) -> str:
+    return str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def seed(engine, rows: int, categories: int) -> None:
+    """Заполняет БД товарами пачками через Core insert"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(CategoryModel), [{"name": f"Категория {i}"} for i in range(1, categories + 1)])
+        batch = 10000
+        for start in range(0, rows, batch):
+            await conn.execute(insert(ProductModel), [
+                {
+                    "name": f"Товар {i}",
+                    "description": "Описание товара для бенчмарка",
+                    "price": round(random.uniform(1, 1000), 2),
+                    # примерно треть товаров закончилась
+                    "stock": random.choice([0, 0, 1, 5, 10, 50]),
+                    "category_id": random.randint(1, categories),
+                }
+                for i in range(start, min(start + batch, rows))
+            ])
+        await conn.execute(text("ANALYZE"))
+
+
+async def run_scenarios(engine, repeat: int) -> dict:
+    results = {}
+    async with engine.connect() as conn:
+        for title, filters, sort in SCENARIOS:
+            query = build_query(filters, sort)
+            plan = await conn.execute(text("EXPLAIN QUERY PLAN " + compile_sql(query)))
+            started = time.perf_counter()
+            for _ in range(repeat):
+                (await conn.execute(query)).all()
+            elapsed = time.perf_counter() - started
+            results[title] = {
+                "plan": "; ".join(row[3] for row in plan),
+                "ms": elapsed / repeat * 1000,
+            }
+    return results
+
+
+async def set_indexes(engine, enabled: bool) -> None:
+    async with engine.begin() as conn:
+        for index in QUERY_INDEXES:
+            if enabled:
+                await conn.run_sync(index.create, checkfirst=True)
+            else:
+                await conn.run_sync(index.drop, checkfirst=True)
+        await conn.execute(text("ANALYZE"))
+
+
+async def main(rows: int, categories: int, repeat: int):
+    tmp_dir = tempfile.mkdtemp()
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_dir}/bench.db")
+
+    print(f"🚀 Бенчмарк индексов: {rows} товаров, {categories} категорий, {repeat} повторов на запрос")
+    await seed(engine, rows, categories)
+
+    await set_indexes(engine, enabled=False)
+    before = await run_scenarios(engine, repeat)
+    await set_indexes(engine, enabled=True)
+    after = await run_scenarios(engine, repeat)
+    await engine.dispose()
+
+    for title, _, _ in SCENARIOS:
+        speedup = before[title]["ms"] / after[title]["ms"] if after[title]["ms"] else 0.0
+        print(f"\n📊 {title}: {before[title]['ms']:.3f} мс -> {after[title]['ms']:.3f} мс (×{speedup:.1f})")
+        print(f"   без индексов: {before[title]['plan']}")
+        print(f"   с индексами:  {after[title]['plan']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк индексов каталога")
+    parser.add_argument("--rows", type=int, default=200000, help="Количество товаров")
+    parser.add_argument("--categories", type=int, default=50, help="Количество категорий")
+    parser.add_argument("--repeat", type=int, default=200, help="Повторов каждого запроса")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.categories, args.repeat))
@@ -0,0 +1,136 @@
+# scripts/bench_passwords.py
+"""
+Бенчмарк хеширования паролей.
+
+1. Стоимость одного хеша argon2id при разных параметрах.
+2. "Шторм" входов через /auth/jwt/login и одновременно опрос /health:
+   как ведёт себя задержка постороннего эндпоинта, если хеширование идёт
+   в event loop (inline), в пуле потоков (thread) или процессов (process).
+
+Запуск из корня проекта:
+    python scripts/bench_passwords.py --logins 40 --concurrency 20
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import statistics
+import tempfile
+import time
+
+# --- Добавляем корень проекта в путь поиска модулей ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# -----------------------------------------------------
+
+# Отдельная БД, чтобы не трогать рабочую
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_passwords.db")
+os.environ.setdefault("QUERY_PROFILING", "false")
+
+import logging
+logging.disable(logging.WARNING)
+
+import httpx
+from pwdlib.hashers.argon2 import Argon2Hasher
+from auth.passwords import password_helper
+from core.database import create_tables
+from main import app
+
+# (название, time_cost, memory_cost КиБ, parallelism)
+ARGON2_PROFILES = [
+    ("pwdlib по умолчанию", 3, 65536, 4),
+    ("OWASP (19 МиБ)", 2, 19456, 1),
+    ("OWASP (46 МиБ)", 1, 47104, 1),
+]
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password-123"
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def bench_profiles(repeat: int) -> None:
+    print("🔐 Стоимость одного хеша argon2id:")
+    for title, time_cost, memory_cost, parallelism in ARGON2_PROFILES:
+        hasher = Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            hasher.hash(PASSWORD)
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        print(f"   {title:<22} t={time_cost} m={memory_cost:>6} p={parallelism}: {elapsed:7.1f} мс")
+
+
+async def login_storm(client: httpx.AsyncClient, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    login_times: list[float] = []
+    health_times: list[float] = []
+    done = asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/auth/jwt/login", data={"username": EMAIL, "password": PASSWORD})
+            response.raise_for_status()
+            login_times.append(time.perf_counter() - started)
+
+    async def probe():
+        # Посторонний эндпоинт, который не должен страдать от шторма входов.
+        # Время считается от запланированного момента отправки: если event loop
+        # занят хешированием, опоздание запроса тоже входит в задержку
+        while not done.is_set():
+            scheduled = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            await client.get("/health")
+            health_times.append(time.perf_counter() - scheduled)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    return {
+        "logins_per_sec": logins / elapsed,
+        "login_p50": statistics.median(login_times) * 1000,
+        "login_p95": percentile(login_times, 0.95) * 1000,
+        "health_p50": statistics.median(health_times) * 1000,
+        "health_p99": percentile(health_times, 0.99) * 1000,
+        "health_max": max(health_times) * 1000,
+    }
+
+
+async def main(logins: int, concurrency: int, repeat: int):
+    bench_profiles(repeat)
+
+    await create_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+
+        print(f"\n🚀 Шторм входов: {logins} входов, {concurrency} одновременно, воркеров пула: {password_helper.workers}")
+        for mode in ("inline", "thread", "process"):
+            password_helper.shutdown()
+            password_helper.mode = mode
+            result = await login_storm(client, logins, concurrency)
+            print(
+                f"📊 {mode:<8} входов/с: {result['logins_per_sec']:6.1f}   "
+                f"вход p50/p95: {result['login_p50']:7.1f}/{result['login_p95']:7.1f} мс   "
+                f"/health p50/p99/max: {result['health_p50']:6.1f}/{result['health_p99']:6.1f}/{result['health_max']:6.1f} мс"
+            )
+    password_helper.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк хеширования паролей")
+    parser.add_argument("--logins", type=int, default=40, help="Количество входов в шторме")
+    parser.add_argument("--concurrency", type=int, default=20, help="Одновременных входов")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов при замере одного хеша")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.logins, args.concurrency, args.repeat))
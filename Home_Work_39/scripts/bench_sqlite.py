@@ -0,0 +1,109 @@
+# scripts/bench_sqlite.py
+"""
+Сравнение пропускной способности SQLite до и после профиля производительности.
+
+Запуск из корня проекта:
+    python scripts/bench_sqlite.py --workers 20 --ops 200
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import random
+import tempfile
+import time
+
+# --- Добавляем корень проекта в путь поиска модулей ---
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# -----------------------------------------------------
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from core.database import make_engine
+from models.base import Base
+from models.category import CategoryModel
+from models.product import ProductModel
+
+
+async def writer(session_factory, ops: int, stats: dict):
+    """Вставляет товары, по одному коммиту на операцию (как POST /products/)"""
+    for i in range(ops):
+        async with session_factory() as session:
+            session.add(ProductModel(
+                name=f"Товар {i}",
+                description="Описание товара для бенчмарка",
+                price=random.uniform(1, 1000),
+                stock=random.randint(0, 100),
+                category_id=1,
+            ))
+            await session.commit()
+        stats["writes"] += 1
+
+
+async def reader(session_factory, ops: int, stats: dict):
+    """Читает товары по ID (как GET /products/{id})"""
+    for _ in range(ops):
+        async with session_factory() as session:
+            await session.execute(
+                select(ProductModel).where(ProductModel.id == random.randint(1, 1000))
+            )
+        stats["reads"] += 1
+
+
+async def run_profile(tuned: bool, workers: int, ops: int) -> dict:
+    """Запускает смешанную нагрузку на отдельном файле БД"""
+    tmp_dir = tempfile.mkdtemp()
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_dir}/bench.db", tuned=tuned)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add(CategoryModel(name="Бенчмарк"))
+        await session.commit()
+
+    stats = {"writes": 0, "reads": 0}
+    # Половина воркеров пишет, половина читает — одновременно
+    writers = [writer(session_factory, ops, stats) for _ in range(workers - workers // 2)]
+    readers = [reader(session_factory, ops, stats) for _ in range(workers // 2)]
+
+    async def timed(tasks) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    write_elapsed, read_elapsed = await asyncio.gather(timed(writers), timed(readers))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    return {
+        "elapsed": elapsed,
+        "writes_per_sec": stats["writes"] / write_elapsed if write_elapsed else 0.0,
+        "reads_per_sec": stats["reads"] / read_elapsed if read_elapsed else 0.0,
+    }
+
+
+async def main(workers: int, ops: int):
+    print(f"🚀 Бенчмарк SQLite: {workers} конкурентных воркеров × {ops} операций")
+    for title, tuned in (("По умолчанию", False), ("Профиль производительности", True)):
+        result = await run_profile(tuned, workers, ops)
+        print(
+            f"📊 {title:<28} "
+            f"запись: {result['writes_per_sec']:8.1f} оп/с   "
+            f"чтение: {result['reads_per_sec']:8.1f} оп/с   "
+            f"время: {result['elapsed']:.2f} с"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк профиля SQLite")
+    parser.add_argument("--workers", type=int, default=20, help="Количество конкурентных воркеров")
+    parser.add_argument("--ops", type=int, default=200, help="Операций на воркер")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.ops))
@@ -1,9 +1,17 @@
 import asyncio
+import random
 import sys
+import time
+from bisect import bisect
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 from pathlib import Path
 import shutil
+from sqlalchemy import insert, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.schema import CreateIndex
 from core.database import AsyncSessionLocal, engine
 from models.product import ProductModel
 from models.category import CategoryModel
@@ -119,10 +127,7 @@ async def seed_categories(session: AsyncSession):
     """Заполнение категорий"""
     categories_map = {}
     for category_data in CATEGORIES:
-        category = CategoryModel(
-            name=category_data["name"],
-            description=category_data["description"]
-        )
+        category = CategoryModel(name=category_data["name"])
         session.add(category)
         await session.flush()
         categories_map[category_data["name"]] = category.id
@@ -143,29 +148,272 @@ async def seed_products(session: AsyncSession, categories_map: dict):
         session.add(product)
     await session.commit()
 
+# --- Генератор синтетического каталога ---
+
+# Товарные группы: (название, медианная цена). Цена товара — логнормальный
+# разброс вокруг медианы, поэтому дешёвых товаров много, дорогих — длинный хвост
+PRODUCT_KINDS = [
+    ("Смартфон", 450), ("Ноутбук", 900), ("Планшет", 350), ("Наушники", 80), ("Колонка", 120),
+    ("Монитор", 300), ("Клавиатура", 60), ("Мышь", 25), ("Телевизор", 700), ("Фотоаппарат", 650),
+    ("Чайник", 35), ("Пылесос", 220), ("Кофемашина", 400), ("Фен", 45), ("Утюг", 40),
+    ("Блендер", 70), ("Лампа", 30), ("Термос", 25), ("Рюкзак", 55), ("Кроссовки", 90),
+    ("Часы", 150), ("Велосипед", 500), ("Палатка", 180), ("Настольная игра", 40), ("Книга", 15),
+]
+BRANDS = [
+    "Nimbus", "Orbis", "Vega", "Kraft", "Polar", "Zenit", "Aurora", "Terra", "Helix", "Quanta",
+    "Lumen", "Sputnik", "Volna", "Kedr", "Atlas", "Briz", "Iskra", "Raduga", "Neva", "Altai",
+]
+MODEL_SUFFIXES = ["", " Pro", " Lite", " Max", " Mini", " Plus", " SE", " Ultra"]
+CATEGORY_WORDS = [
+    "Электроника", "Бытовая техника", "Компьютеры", "Аксессуары", "Дом и сад", "Спорт", "Туризм",
+    "Книги", "Игры", "Одежда", "Обувь", "Красота", "Здоровье", "Детские товары", "Офис", "Авто",
+]
+CATEGORY_QUALIFIERS = ["", "для дома", "премиум", "эконом", "для детей", "профессиональные", "б/у", "новинки"]
+DESCRIPTION_SENTENCES = [
+    "{name} — надёжный выбор на каждый день.",
+    "Модель {year} года с улучшенной сборкой.",
+    "Гарантия производителя {warranty} мес.",
+    "Подходит как для дома, так и для работы.",
+    "Корпус выполнен из прочных материалов и не боится царапин.",
+    "Комплектация: устройство, инструкция и фирменная упаковка.",
+    "Один из самых популярных товаров бренда {brand}.",
+    "Лёгкая настройка: всё готово к работе за пару минут.",
+    "Энергоэффективность класса A+.",
+    "Доставка по всей стране, возврат в течение 14 дней.",
+    "Покупатели отмечают отличное соотношение цены и качества.",
+    "Доступен в нескольких цветах.",
+]
+# Доля товаров, которых нет в наличии
+OUT_OF_STOCK_SHARE = 0.12
+
+
+def generate_category_names(count: int) -> list[str]:
+    """Уникальные правдоподобные названия категорий: "Электроника", "Спорт для детей", ..."""
+    names = []
+    for index in range(count):
+        word = CATEGORY_WORDS[index % len(CATEGORY_WORDS)]
+        qualifier = CATEGORY_QUALIFIERS[(index // len(CATEGORY_WORDS)) % len(CATEGORY_QUALIFIERS)]
+        name = f"{word} {qualifier}".strip()
+        cycle = index // (len(CATEGORY_WORDS) * len(CATEGORY_QUALIFIERS))
+        names.append(f"{name} {cycle + 1}" if cycle else name)
+    return names
+
+
+def category_cum_weights(count: int) -> list[float]:
+    """
+    Накопленные веса категорий по закону Ципфа: несколько больших
+    категорий и длинный хвост маленьких, как в реальных каталогах.
+    """
+    return list(accumulate(1 / (rank + 1) ** 1.07 for rank in range(count)))
+
+
+def generate_product_rows(
+    chunk_index: int,
+    chunk_size: int,
+    total: int,
+    category_ids: list[int],
+    cum_weights: list[float],
+    seed: int,
+) -> list[dict]:
+    """
+    Строки одного чанка товаров. У каждого чанка свой генератор случайных
+    чисел (seed + номер чанка), поэтому результат не зависит от того,
+    в каком процессе и в каком порядке создаются чанки.
+    Выполняется в пуле процессов, поэтому функция верхнего уровня.
+    """
+    rng = random.Random(f"{seed}:{chunk_index}")
+    # rng.random() на порядок быстрее choice/randint/sample — на миллионах строк это заметно
+    rand = rng.random
+
+    def pick(items):
+        return items[int(rand() * len(items))]
+
+    sentence_count = len(DESCRIPTION_SENTENCES)
+    start = chunk_index * chunk_size
+    rows = []
+    for number in range(start + 1, min(start + chunk_size, total) + 1):
+        kind, median_price = pick(PRODUCT_KINDS)
+        brand = pick(BRANDS)
+        name = f"{kind} {brand} {pick('ABCKMSTXZ')}{int(rand() * 999) + 1}{pick(MODEL_SUFFIXES)}"
+
+        # 2–5 предложений подряд со случайного места
+        first = int(rand() * sentence_count)
+        sentences = [DESCRIPTION_SENTENCES[(first + offset) % sentence_count] for offset in range(2 + int(rand() * 4))]
+        description = " ".join(sentences).format(
+            name=name, brand=brand, year=2015 + int(rand() * 11), warranty=pick((6, 12, 24, 36))
+        )
+
+        price = median_price * rng.lognormvariate(0, 0.45)
+        # Цены "с девятками": 449.99, 1299.99
+        price = round(price) - 0.01 if price >= 10 else round(price, 2)
+
+        if rand() < OUT_OF_STOCK_SHARE:
+            stock = 0
+        else:
+            stock = min(int(rng.paretovariate(1.3) * 3), 999)
+
+        rows.append({
+            "name": name,
+            "description": description,
+            "price": max(price, 0.5),
+            "stock": stock,
+            "category_id": category_ids[bisect(cum_weights, rand() * cum_weights[-1])],
+        })
+    return rows
+
+
+async def insert_rows(table, rows: list[dict]) -> None:
+    """Один чанк — одна транзакция с пакетным INSERT (executemany)"""
+    async with engine.begin() as conn:
+        await conn.execute(insert(table), rows)
+
+
+async def drop_secondary_indexes(table) -> list[str]:
+    """
+    Удаляет вторичные индексы таблицы и возвращает DDL для их восстановления.
+    Построить индекс по готовым данным в разы быстрее, чем обновлять его
+    на каждой вставке.
+
+    Определения берутся из самой БД (sqlite_master) — так восстанавливаются
+    ровно те индексы, что создали миграции, включая частичные и отсутствующие
+    в моделях. Для других СУБД — из метаданных SQLAlchemy.
+    """
+    async with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # sql IS NULL — автоиндексы PRIMARY KEY/UNIQUE, их не трогаем
+            result = await conn.execute(
+                text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+                {"table": table.name},
+            )
+            indexes = result.all()
+            for name, _ in indexes:
+                await conn.execute(text(f'DROP INDEX "{name}"'))
+            return [sql for _, sql in indexes]
+
+        statements = []
+        for index in table.indexes:
+            statements.append(str(CreateIndex(index).compile(dialect=conn.dialect)))
+            await conn.run_sync(lambda sync_conn: index.drop(sync_conn, checkfirst=True))
+        return statements
+
+
+async def restore_indexes(statements: list[str]) -> None:
+    """Создаёт индексы по DDL, сохранённому drop_secondary_indexes"""
+    async with engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+async def generate_catalog(
+    categories: int,
+    products: int,
+    seed: int = 0,
+    chunk_size: int = 5000,
+    workers: int = 1,
+    defer_indexes: bool = True,
+) -> list[int]:
+    """
+    Генерирует каталог заданного размера пакетными Core-вставками.
+
+    Товары создаются чанками по chunk_size строк. Следующие чанки
+    генерируются, пока вставляется текущий; при workers > 1 — параллельно
+    в пуле процессов (генерация строк — работа для процессора). Вставка идёт
+    одним писателем по мере готовности: SQLite всё равно допускает только
+    одну пишущую транзакцию.
+
+    При defer_indexes индексы товаров удаляются на время загрузки и строятся
+    заново в конце — на больших объёмах это основная часть выигрыша.
+
+    Returns:
+        list[int]: id созданных категорий
+    """
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(insert(CategoryModel.__table__), [{"name": name} for name in generate_category_names(categories)])
+        result = await conn.execute(select(CategoryModel.id).order_by(CategoryModel.id.desc()).limit(categories))
+        category_ids = sorted(result.scalars().all())
+    print(f"📂 Категорий: {len(category_ids)}")
+
+    cum_weights = category_cum_weights(len(category_ids))
+    chunks = (products + chunk_size - 1) // chunk_size
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def produce(chunk_index: int) -> asyncio.Future:
+        args = (chunk_index, chunk_size, products, category_ids, cum_weights, seed)
+        # executor=None — поток по умолчанию: генерация не останавливает вставку
+        return loop.run_in_executor(executor, generate_product_rows, *args)
+
+    dropped_indexes = await drop_secondary_indexes(ProductModel.__table__) if defer_indexes else []
+
+    inserted = 0
+    last_report = started
+    # Держим наготове не больше 2 чанков на воркер — память не растёт с размером каталога
+    pending: deque = deque()
+    next_chunk = 0
+    try:
+        while next_chunk < chunks or pending:
+            while next_chunk < chunks and len(pending) < max(workers, 1) * 2:
+                pending.append(produce(next_chunk))
+                next_chunk += 1
+            rows = await pending.popleft()
+            await insert_rows(ProductModel.__table__, rows)
+            inserted += len(rows)
+
+            now = time.perf_counter()
+            if now - last_report >= 2 or inserted == products:
+                print(f"📦 {inserted:>10,} / {products:,} товаров — {inserted / (now - started):,.0f} строк/с")
+                last_report = now
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if dropped_indexes:
+            print(f"🗂️ Построение индексов ({len(dropped_indexes)})...")
+            await restore_indexes(dropped_indexes)
+
+    elapsed = time.perf_counter() - started
+    total_rows = inserted + len(category_ids)
+    print(f"⚡ {total_rows:,} строк за {elapsed:.1f} с — {total_rows / elapsed:,.0f} строк/с (чанк {chunk_size}, воркеров {workers}, с учётом индексов)")
+    return category_ids
+
+
 async def copy_sample_images():
     """Копирование примеров изображений (заглушки)"""
     uploads_dir = Path("uploads/products")
     uploads_dir.mkdir(parents=True, exist_ok=True)
     
-    # Создаем простые текстовые файлы как заглушки для изображений
+    # Создаем простые текстовые файлы как заглушки для изображений (запись — в пуле потоков)
     for product in PRODUCTS:
         filename = Path(product["image_url"]).name
         filepath = uploads_dir / filename
-        with open(filepath, "w") as f:
-            f.write(f"Sample image for {product['name']}")
+        await asyncio.to_thread(filepath.write_text, f"Sample image for {product['name']}")
 
-async def main(clear: bool = False):
+async def main(
+    clear: bool = False,
+    categories: int = 0,
+    products: int = 0,
+    seed: int = 0,
+    chunk_size: int = 5000,
+    workers: int = 1,
+    defer_indexes: bool = True,
+):
     """Основная функция"""
     print("🚀 Начало наполнения базы данных...")
     
     await create_tables()
     
-    async with AsyncSessionLocal() as session:
-        if clear:
-            print("🧹 Очистка таблиц...")
+    if clear:
+        print("🧹 Очистка таблиц...")
+        async with AsyncSessionLocal() as session:
             await clear_tables(session)
-        
+    
+    if categories or products:
+        print(f"🎲 Генерация каталога: {categories} категорий, {products} товаров...")
+        await generate_catalog(max(categories, 1), products, seed, chunk_size, workers, defer_indexes)
+        print("✅ Наполнение базы данных завершено!")
+        return
+    
+    async with AsyncSessionLocal() as session:
         print("📂 Создание категорий...")
         categories_map = await seed_categories(session)
         
@@ -183,7 +431,21 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Наполнение базы данных")
     parser.add_argument("--clear", action="store_true", help="Очистить таблицы перед наполнением")
+    parser.add_argument("--categories", type=int, default=0, help="Сгенерировать столько категорий вместо демо-данных")
+    parser.add_argument("--products", type=int, default=0, help="Сгенерировать столько товаров вместо демо-данных")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора случайных чисел")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Товаров в одной транзакции")
+    parser.add_argument("--workers", type=int, default=1, help="Процессов, параллельно генерирующих чанки")
+    parser.add_argument("--keep-indexes", action="store_true", help="Не удалять индексы товаров на время генерации")
     
     args = parser.parse_args()
     
-    asyncio.run(main(clear=args.clear))
\ No newline at end of file
+    asyncio.run(main(
+        clear=args.clear,
+        categories=args.categories,
+        products=args.products,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        defer_indexes=not args.keep_indexes,
+    ))
\ No newline at end of file
@@ -0,0 +1,339 @@
+# serve.py
+"""
+Продакшен-запуск: несколько процессов-воркеров uvicorn на одном порту (pre-fork).
+
+- мастер один раз импортирует приложение (настройки, метаданные моделей,
+  маршруты, OpenAPI-схема) и замораживает сборщик мусора — воркеры после fork
+  разделяют эти страницы памяти copy-on-write
+- мастер не открывает соединений с БД; каждый воркер после fork создаёт свой пул,
+  поэтому соединения SQLite/aiosqlite никогда не переходят между процессами
+- все воркеры принимают соединения с одного сокета, открытого мастером
+
+Сигналы мастеру:
+    HUP       — плавный перезапуск: новые воркеры стартуют, и только когда
+                все готовы, старые дообслуживают запросы и завершаются
+    TERM, INT — плавная остановка
+    TTIN/TTOU — добавить / убрать одного воркера
+
+С несколькими воркерами кэш и ограничитель частоты должны храниться в Redis
+(CACHE_BACKEND=redis, RATE_LIMIT_BACKEND=redis): в памяти процесса каждый воркер
+видел бы свою копию, и мастер отказывается запускаться.
+
+Упавший воркер перезапускается автоматически. Новый код подхватывается
+только перезапуском мастера (HUP перезапускает воркеры из уже загруженного кода).
+
+Запуск из корня проекта:
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+from multiprocessing import Value
+
+import uvicorn
+
+from core.config import settings
+
+# Настройка логирования
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("serve")
+
+# На Windows большей части этих сигналов нет — там используется запуск через uvicorn
+MASTER_SIGNALS = {
+    getattr(signal, name) for name in ("SIGHUP", "SIGTERM", "SIGINT", "SIGCHLD", "SIGTTIN", "SIGTTOU")
+    if hasattr(signal, name)
+}
+# Воркер, упавший быстрее этого, считается упавшим при старте — перезапуск с паузой
+MIN_WORKER_UPTIME = 1.0
+# Сколько ждать, пока воркер выполнит lifespan и начнёт принимать соединения
+WORKER_START_TIMEOUT = 60.0
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn.Server, который сообщает мастеру о готовности через pipe"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+def preload():
+    """
+    Всё, что можно разделить между воркерами, делается в мастере до fork.
+    Соединения с БД здесь не открываются — иначе их унаследуют все воркеры.
+    """
+    from main import app
+
+    app.openapi()
+    app.middleware_stack = app.build_middleware_stack()
+    # Объекты, созданные при импорте, больше не просматриваются сборщиком мусора:
+    # он не трогает их счётчики и страницы не копируются в каждом воркере
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def process_local_state_errors() -> list[str]:
+    """
+    Состояние в памяти процесса, с которым несколько воркеров отдают неверные данные
+    или ослабляют защиту. С такими настройками больше одного воркера не запускается.
+    """
+    errors = []
+    if settings.cache_backend == "memory":
+        errors.append("CACHE_BACKEND=memory: инвалидация видна только одному воркеру, остальные отдают устаревшие товары")
+    if settings.rate_limit_enabled and settings.rate_limit_backend == "memory":
+        errors.append("RATE_LIMIT_BACKEND=memory: каждый воркер считает лимиты отдельно, лимит умножается на число воркеров")
+    if settings.auth_mode == "claims":
+        errors.append("AUTH_MODE=claims: отзыв токенов действует только в воркере, где он выполнен")
+    return errors
+
+
+def warn_process_local_state(workers: int) -> None:
+    """Состояние в памяти процесса, которое с несколькими воркерами лишь менее удобно"""
+    if workers < 2:
+        return
+    if settings.telegram_bot_api_key:
+        logger.warning(
+            "⚠️ Telegram: у каждого воркера свой диспетчер — лимит частоты на чат делится между воркерами, "
+            "сводки собираются в каждом воркере отдельно"
+        )
+    if settings.metrics_enabled:
+        logger.warning("⚠️ METRICS_ENABLED: /metrics отдаёт счётчики одного воркера — Prometheus увидит их вперемешку")
+
+
+class Arbiter:
+    """Мастер-процесс: запускает, перезапускает и останавливает воркеры"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, graceful_timeout: float, max_requests: int):
+        self.app = app
+        self.sock = sock
+        self.target = workers
+        self.graceful_timeout = graceful_timeout
+        self.max_requests = max_requests
+        self.workers: dict[int, float] = {}  # pid -> время запуска
+        self.retiring: set[int] = set()  # воркеры, которым уже отправлен TERM
+        self.stopping = False
+        # Раньше этого момента упавших воркеров не перезапускаем (защита от цикла падений)
+        self.respawn_at = 0.0
+        # Число воркеров в разделяемой памяти: воркеры читают его при каждой отправке в Telegram
+        self.shared_target = Value("i", workers, lock=False)
+
+    # --- Воркер (выполняется в дочернем процессе) ---
+
+    def run_worker(self, ready_fd: int) -> None:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, MASTER_SIGNALS)
+        for sig in MASTER_SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+
+        # Свой пул соединений: унаследованный от мастера выбрасывается, не закрываясь
+        from core.database import dispose_inherited_pool
+        dispose_inherited_pool()
+
+        # Диспетчер Telegram свой в каждом воркере — суммарная частота не должна превышать лимит
+        from utils.telegram import dispatcher
+        shared_target = self.shared_target
+        dispatcher.share_rate(lambda: shared_target.value)
+
+        # Разброс, чтобы воркеры не перезапускались по счётчику одновременно
+        limit = self.max_requests + random.randint(0, self.max_requests // 10) if self.max_requests else None
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            timeout_graceful_shutdown=self.graceful_timeout,
+            limit_max_requests=limit,
+        )
+        WorkerServer(config, ready_fd).run(sockets=[self.sock])
+
+    # --- Мастер ---
+
+    def spawn(self) -> tuple[int, int]:
+        """Запускает воркер и возвращает (pid, fd для ожидания готовности)"""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                self.run_worker(ready_w)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                logger.exception("❌ Воркер завершился с ошибкой")
+                code = 1
+            finally:
+                os._exit(code)
+
+        os.close(ready_w)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"👷 Воркер {pid} запущен")
+        return pid, ready_r
+
+    def wait_ready(self, ready: dict[int, int], timeout: float) -> set[int]:
+        """Ждёт сигнала готовности от воркеров; возвращает pid готовых"""
+        started = set()
+        deadline = time.monotonic() + timeout
+        pending = dict(ready)
+        while pending and time.monotonic() < deadline:
+            readable, _, _ = select.select(list(pending.values()), [], [], max(deadline - time.monotonic(), 0))
+            for pid, fd in list(pending.items()):
+                if fd in readable:
+                    if os.read(fd, 1) == b"1":
+                        started.add(pid)
+                    os.close(fd)
+                    del pending[pid]
+        for fd in pending.values():
+            os.close(fd)
+        return started
+
+    def spawn_many(self, count: int) -> set[int]:
+        ready = dict(self.spawn() for _ in range(count))
+        return self.wait_ready(ready, timeout=WORKER_START_TIMEOUT)
+
+    def retire(self, pids) -> None:
+        for pid in pids:
+            if pid in self.workers and pid not in self.retiring:
+                self.retiring.add(pid)
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def reload(self) -> None:
+        """Плавный перезапуск: сначала поднимаем новое поколение, потом гасим старое"""
+        old = [pid for pid in self.workers if pid not in self.retiring]
+        logger.info(f"🔄 Перезапуск воркеров: {len(old)} -> {self.target}")
+        new = self.spawn_many(self.target)
+        if len(new) < self.target:
+            logger.error("❌ Новые воркеры не запустились — старые продолжают работу")
+            self.retire(set(self.workers) - set(old))
+            return
+        self.retire(old)
+
+    def reap(self) -> None:
+        """Собирает завершившиеся воркеры и при необходимости запускает замену"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started_at = self.workers.pop(pid, None)
+            if started_at is None:
+                continue
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                logger.info(f"👋 Воркер {pid} остановлен")
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                logger.info(f"♻️ Воркер {pid} обработал лимит запросов и завершился")
+            else:
+                logger.warning(f"⚠️ Воркер {pid} завершился (статус {code})")
+            if time.monotonic() - started_at < MIN_WORKER_UPTIME:
+                # Падает сразу при старте — замену запустит maintain() после паузы,
+                # а мастер тем временем продолжает обрабатывать сигналы
+                self.respawn_at = time.monotonic() + MIN_WORKER_UPTIME
+
+    def set_target(self, target: int) -> None:
+        if target > 1 and (errors := process_local_state_errors()):
+            for error in errors:
+                logger.error(f"❌ {error}")
+            logger.error("❌ Число воркеров не изменено: нужно общее состояние в Redis")
+            return
+        self.target = target
+        self.shared_target.value = target
+
+    def maintain(self) -> None:
+        """Поддерживает нужное число воркеров"""
+        active = len(self.workers) - len(self.retiring)
+        if active < self.target:
+            if time.monotonic() < self.respawn_at:
+                return
+            self.spawn_many(self.target - active)
+        elif active > self.target:
+            extra = [pid for pid in self.workers if pid not in self.retiring][: active - self.target]
+            self.retire(extra)
+
+    def stop(self) -> None:
+        """Плавная остановка: TERM всем воркерам, KILL тем, кто не уложился в таймаут"""
+        self.stopping = True
+        logger.info("🛑 Остановка воркеров...")
+        self.retire(list(self.workers))
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            logger.warning(f"⚠️ Воркер {pid} не остановился вовремя — SIGKILL")
+            os.kill(pid, signal.SIGKILL)
+        self.sock.close()
+
+    def run(self) -> None:
+        # Сигналы мастеру обрабатываются синхронно в цикле, а не в обработчиках
+        signal.pthread_sigmask(signal.SIG_BLOCK, MASTER_SIGNALS)
+        self.maintain()
+        logger.info(f"✅ Мастер {os.getpid()}: {self.target} воркеров на {self.sock.getsockname()}")
+
+        while True:
+            timeout = min(max(self.respawn_at - time.monotonic(), 0.05), 1.0)
+            info = signal.sigtimedwait(MASTER_SIGNALS, timeout)
+            self.reap()
+            if info is None or info.si_signo == signal.SIGCHLD:
+                pass
+            elif info.si_signo in (signal.SIGTERM, signal.SIGINT):
+                self.stop()
+                return
+            elif info.si_signo == signal.SIGHUP:
+                self.reload()
+            elif info.si_signo == signal.SIGTTIN:
+                self.set_target(self.target + 1)
+            elif info.si_signo == signal.SIGTTOU:
+                self.set_target(max(self.target - 1, 1))
+            self.maintain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Многопроцессный запуск API магазина")
+    parser.add_argument("--host", default=settings.web_host)
+    parser.add_argument("--port", type=int, default=settings.web_port)
+    parser.add_argument("--workers", type=int, default=settings.web_workers, help="Количество процессов-воркеров")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.web_graceful_timeout, help="Сколько ждать завершения запросов при остановке, с")
+    parser.add_argument("--max-requests", type=int, default=settings.web_max_requests, help="Перезапускать воркер после стольких запросов (0 — никогда)")
+    args = parser.parse_args()
+
+    if args.workers > 1 and (errors := process_local_state_errors()):
+        for error in errors:
+            logger.error(f"❌ {error}")
+        logger.error(f"❌ {args.workers} воркеров не запущено: переключите эти настройки на redis или используйте --workers 1")
+        sys.exit(1)
+
+    if not hasattr(os, "fork"):
+        # Windows: без fork нет pre-fork и copy-on-write — uvicorn сам запускает процессы через spawn
+        logger.warning("⚠️ os.fork недоступен — воркеры uvicorn без предзагрузки")
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+        return
+
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    sock.set_inheritable(True)
+
+    warn_process_local_state(args.workers)
+    app = preload()
+    Arbiter(app, sock, args.workers, args.graceful_timeout, args.max_requests).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте приложения: БД и загрузки — во временной папке,
+# ограничитель частоты отключён (его проверяют отдельно, см. test_rate_limit.py)
+WORK_DIR = tempfile.mkdtemp(prefix="shop-tests-")
+os.chdir(WORK_DIR)
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{WORK_DIR}/test.db",
+    CACHE_BACKEND="memory",
+    RATE_LIMIT_ENABLED="false",
+    IMAGE_DERIVATIVES="false",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import models.user  # noqa: E402,F401
+from core.cache import cache  # noqa: E402
+from core.database import engine  # noqa: E402
+from main import app  # noqa: E402
+from models.base import Base  # noqa: E402
+
+
+async def reset_database() -> None:
+    """Чистые таблицы и пустой кэш для каждого теста"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await cache.clear()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        test_client.portal.call(reset_database)
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+@pytest.fixture
+def category_id(client) -> int:
+    response = client.post("/api/v1/categories/", json={"name": "Телефоны"})
+    return response.json()["id"]
+
+
+@pytest.fixture
+def create_product(client, category_id):
+    def create(name: str = "Товар", price: float = 100.0, stock: int = 1, description: str = "Описание товара") -> dict:
+        response = client.post("/api/v1/products/", json={
+            "name": name,
+            "description": description,
+            "price": price,
+            "stock": stock,
+            "category_id": category_id,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
@@ -0,0 +1,62 @@
+# tests/test_keyset_pagination.py
+import pytest
+
+from core.pagination import encode_cursor
+
+
+def read_all_pages(client, sort: str, limit: int) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/products/keyset", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 100])
+def test_pages_by_id_cover_catalog_once(client, create_product, limit):
+    ids = [create_product(name=f"Товар {i}")["id"] for i in range(7)]
+
+    items = read_all_pages(client, "id", limit)
+
+    assert [item["id"] for item in items] == sorted(ids)
+
+
+def test_pages_by_name_break_ties_by_id(client, create_product):
+    # Повторяющиеся названия: курсор (name, id) не должен терять и повторять строки
+    created = [create_product(name=f"Товар {i % 3}") for i in range(8)]
+
+    items = read_all_pages(client, "name", 3)
+
+    expected = sorted((product["name"], product["id"]) for product in created)
+    assert [(item["name"], item["id"]) for item in items] == expected
+
+
+def test_last_page_has_no_cursor(client, create_product):
+    create_product()
+
+    page = client.get("/api/v1/products/keyset", params={"limit": 1}).json()
+
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] is None
+
+
+def test_rejects_damaged_cursor(client):
+    response = client.get("/api/v1/products/keyset", params={"cursor": "не-курсор"})
+    assert response.status_code == 400
+
+
+def test_rejects_cursor_of_other_sort(client, create_product):
+    create_product()
+    cursor = encode_cursor("id", [1])
+
+    response = client.get("/api/v1/products/keyset", params={"sort": "name", "cursor": cursor})
+
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+# tests/test_product_cache.py
+from core.cache import cache, product_cache_key
+
+
+def cached(client, key: str):
+    return client.portal.call(cache.get, key)
+
+
+def test_second_read_is_served_from_cache(client, create_product):
+    product = create_product(name="Смартфон")
+    hits = cache.stats.hits
+
+    first = client.get(f"/api/v1/products/{product['id']}")
+    second = client.get(f"/api/v1/products/{product['id']}")
+
+    assert first.json() == second.json()
+    assert cache.stats.hits == hits + 1
+
+
+def test_update_invalidates_cached_product(client, create_product, category_id):
+    product = create_product(name="Смартфон", price=100)
+    client.get(f"/api/v1/products/{product['id']}")
+
+    response = client.put(f"/api/v1/products/{product['id']}", json={
+        "name": "Смартфон Pro",
+        "description": "Новое описание",
+        "price": 150,
+        "stock": 2,
+        "category_id": category_id,
+    })
+    assert response.status_code == 200
+
+    fresh = client.get(f"/api/v1/products/{product['id']}").json()
+    assert fresh["name"] == "Смартфон Pro"
+    assert fresh["price"] == 150
+
+
+def test_delete_invalidates_cached_product(client, create_product):
+    product = create_product()
+    client.get(f"/api/v1/products/{product['id']}")
+
+    assert client.delete(f"/api/v1/products/{product['id']}").status_code == 200
+
+    assert client.get(f"/api/v1/products/{product['id']}").status_code == 404
+    assert cached(client, product_cache_key(product["id"])) is None
+
+
+def test_product_changes_invalidate_category_summary(client, create_product, category_id):
+    create_product(price=100)
+    assert client.get("/api/v1/categories/summary").json()[0]["product_count"] == 1
+
+    product = create_product(price=300)
+    summary = client.get("/api/v1/categories/summary").json()[0]
+    assert summary["product_count"] == 2
+    assert summary["max_price"] == 300
+
+    client.delete(f"/api/v1/products/{product['id']}")
+    assert client.get("/api/v1/categories/summary").json()[0]["product_count"] == 1
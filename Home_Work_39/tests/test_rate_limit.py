@@ -0,0 +1,117 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from core.rate_limit import AuthRateLimitMiddleware, MemoryRateLimiter
+
+
+def scope_with(headers: list[tuple[bytes, bytes]], client: str = "10.0.0.9") -> dict:
+    return {"type": "http", "headers": headers, "client": (client, 12345)}
+
+
+def middleware(**kwargs) -> AuthRateLimitMiddleware:
+    return AuthRateLimitMiddleware(None, MemoryRateLimiter(), rules={}, **kwargs)
+
+
+class TestClientIp:
+    def test_ignores_forwarded_header_by_default(self):
+        scope = scope_with([(b"x-forwarded-for", b"1.1.1.1")])
+        assert middleware().client_ip(scope) == "10.0.0.9"
+
+    def test_takes_address_added_by_trusted_proxy(self):
+        # Клиент подставил 6.6.6.6, прокси дописал реальный адрес справа
+        scope = scope_with([(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")])
+        assert middleware(trust_forwarded=True).client_ip(scope) == "203.0.113.7"
+
+    def test_counts_hops_from_the_right(self):
+        scope = scope_with([(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7, 10.0.0.2")])
+        assert middleware(trust_forwarded=True, trusted_proxies=2).client_ip(scope) == "203.0.113.7"
+
+    def test_joins_repeated_headers(self):
+        scope = scope_with([(b"x-forwarded-for", b"6.6.6.6"), (b"x-forwarded-for", b"203.0.113.7")])
+        assert middleware(trust_forwarded=True).client_ip(scope) == "203.0.113.7"
+
+    def test_short_chain_falls_back_to_peer(self):
+        scope = scope_with([(b"x-forwarded-for", b"203.0.113.7")])
+        assert middleware(trust_forwarded=True, trusted_proxies=2).client_ip(scope) == "10.0.0.9"
+
+
+class TestExtractEmail:
+    def test_login_form_username(self):
+        scope = scope_with([(b"content-type", b"application/x-www-form-urlencoded")])
+        body = b"username=%20User%40Example.com&password=secret"
+        assert AuthRateLimitMiddleware.extract_email(scope, body) == "user@example.com"
+
+    def test_registration_json_email(self):
+        scope = scope_with([(b"content-type", b"application/json")])
+        body = b'{"email": "New@Example.com", "password": "secret"}'
+        assert AuthRateLimitMiddleware.extract_email(scope, body) == "new@example.com"
+
+    @pytest.mark.parametrize("content_type, body", [
+        (b"application/json", b"{broken"),
+        (b"application/json", b'["not", "an", "object"]'),
+        (b"text/plain", b"email=user@example.com"),
+        (b"application/json", b""),
+    ])
+    def test_unparsable_body_has_no_email(self, content_type, body):
+        scope = scope_with([(b"content-type", content_type)])
+        assert AuthRateLimitMiddleware.extract_email(scope, body) is None
+
+
+def test_memory_limiter_does_not_count_rejected_attempts():
+    async def scenario():
+        limiter = MemoryRateLimiter()
+        results = [await limiter.hit("key", 2, 0.2) for _ in range(4)]
+        await asyncio.sleep(0.25)
+        results.append(await limiter.hit("key", 2, 0.2))
+        return [allowed for allowed, _ in results]
+
+    assert asyncio.run(scenario()) == [True, True, False, False, True]
+
+
+@pytest.fixture
+def limited_client():
+    async def echo(request: Request):
+        return JSONResponse({"body": (await request.body()).decode()})
+
+    app = Starlette(routes=[Route("/auth/jwt/login", echo, methods=["POST"]), Route("/auth/register", echo, methods=["POST"])])
+    app.add_middleware(
+        AuthRateLimitMiddleware,
+        limiter=MemoryRateLimiter(),
+        rules={
+            "/auth/jwt/login": {"ip": "10/60", "email": "2/60"},
+            "/auth/register": {"ip": "10/60", "email": "1/60"},
+        },
+    )
+    return TestClient(app)
+
+
+def test_login_is_limited_per_email(limited_client):
+    login = {"username": "user@example.com", "password": "wrong"}
+    statuses = [limited_client.post("/auth/jwt/login", data=login).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+    # Лимит по email не задевает других пользователей с того же IP
+    other = limited_client.post("/auth/jwt/login", data={"username": "other@example.com", "password": "x"})
+    assert other.status_code == 200
+
+
+def test_rejection_has_retry_after(limited_client):
+    payload = {"email": "new@example.com", "password": "secret123"}
+    limited_client.post("/auth/register", json=payload)
+
+    response = limited_client.post("/auth/register", json={**payload, "email": "NEW@example.com"})
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_body_reaches_application_unchanged(limited_client):
+    response = limited_client.post("/auth/jwt/login", data={"username": "user@example.com", "password": "p@ss"})
+    assert response.json() == {"body": "username=user%40example.com&password=p%40ss"}
@@ -0,0 +1,65 @@
+# tests/test_search.py
+from sqlalchemy import text
+
+from core.database import engine
+
+
+def search(client, **params) -> dict:
+    response = client.get("/api/v1/products/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def names(result: dict) -> list[str]:
+    return sorted(item["name"] for item in result["items"])
+
+
+def test_search_ignores_case_of_cyrillic(client, create_product):
+    create_product(name="Смартфон Alpha")
+    create_product(name="Чехол для смартфона")
+    create_product(name="Ноутбук")
+
+    assert names(search(client, q="СМАРТ")) == ["Смартфон Alpha", "Чехол для смартфона"]
+    assert names(search(client, q="ноут")) == ["Ноутбук"]
+
+
+def test_search_looks_into_description(client, create_product):
+    create_product(name="Чехол", description="Подходит для СМАРТФОНОВ")
+
+    assert names(search(client, q="смартфон")) == ["Чехол"]
+
+
+def test_like_wildcards_are_literal(client, create_product):
+    create_product(name="Скидка 100%")
+    create_product(name="Скидка 1000")
+
+    assert names(search(client, q="100%")) == ["Скидка 100%"]
+    assert names(search(client, q="_")) == []
+
+
+def test_facets_count_matches_before_pagination(client, create_product, category_id):
+    create_product(name="Смартфон A", price=40, stock=0)
+    create_product(name="Смартфон B", price=120, stock=3)
+    create_product(name="Смартфон C", price=900, stock=1)
+    create_product(name="Ноутбук", price=1500)
+
+    result = search(client, q="смартфон", limit=1)
+
+    assert result["total"] == 3
+    assert len(result["items"]) == 1
+    assert result["facets"]["categories"] == [{"id": category_id, "name": "Телефоны", "count": 3}]
+    assert sum(bucket["count"] for bucket in result["facets"]["price"]) == 3
+
+    in_stock = search(client, q="смартфон", in_stock="true")
+    assert names(in_stock) == ["Смартфон B", "Смартфон C"]
+
+
+def test_builtin_lower_is_not_overridden(client):
+    # Unicode-регистр нужен только поиску; остальные запросы (например, поиск
+    # пользователя по email) работают со встроенной lower() SQLite
+    async def lower_and_casefold():
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT lower('ÄБВ'), py_casefold('ÄБВ')"))
+            return tuple(result.one())
+
+    assert client.portal.call(lower_and_casefold) == ("ÄБВ", "äбв")
@@ -1,9 +1,8 @@
 from fastapi import FastAPI, HTTPException, Path, Query
 from typing import List, Optional, Dict
-from data import products
 from schemas.product import Product
 from schemas.product_create import ProductCreate
-from utils.helpers import get_next_id
+from utils.product_store import product_store
 
 app = FastAPI(
     title="Бондарчук Андрей — Домашнее задание №32",
@@ -22,13 +21,25 @@ app = FastAPI(
 async def get_products(
     search: Optional[str] = Query(None, description="Поиск по названию или описанию"),
     currency: Optional[str] = Query(None, description="Валюта для сортировки (shmeckles, credits, flurbos)"),
-    sort_order: Optional[str] = Query(None, description="Направление сортировки (asc, desc)")
+    sort_order: Optional[str] = Query(None, description="Направление сортировки (asc, desc)"),
+    skip: int = Query(0, ge=0, description="Сколько продуктов пропустить"),
+    limit: Optional[int] = Query(None, ge=1, description="Максимум продуктов в ответе (по умолчанию — все)")
 ):
     """
     Возвращает список всех продуктов из датасета.
-    Поддерживает фильтрацию по тексту и сортировку по цене.
+    Поддерживает фильтрацию по тексту, сортировку по цене и постраничный вывод.
     """
-    result = products
+    if currency and sort_order and not search:
+        # Страница берётся прямо из отсортированного индекса цен — O(limit), без обхода каталога
+        return product_store.sorted_by_price(
+            currency,
+            descending=sort_order.lower() == "desc",
+            missing_value=float('-inf'), # Используем -inf, если цены нет
+            offset=skip,
+            limit=limit
+        )
+
+    result = product_store.all()
 
     # Фильтрация поиска
     if search:
@@ -40,23 +51,16 @@ async def get_products(
 
     # Сортировка
     if currency and sort_order:
-        # Проверяем, что валюта существует хотя бы в одном продукте
-        if any(currency in product["prices"] for product in result):
-            reverse = sort_order.lower() == "desc"
-            try:
-                result = sorted(
-                    result,
-                    key=lambda p: p["prices"].get(currency, float('-inf')), # Используем -inf, если цены нет
-                    reverse=reverse
-                )
-            except TypeError:
-                # На случай, если цены не числовые
-                raise HTTPException(status_code=500, detail="Ошибка сортировки: неверный формат цены")
-        else:
-            # Если валюта не найдена ни в одном продукте
-            result = []
-
-    return result
+        # Результаты поиска упорядочиваются по индексу цен, без sorted() на каждый запрос.
+        # Если валюта не найдена ни в одном продукте, вернётся пустой список
+        result = product_store.sorted_by_price(
+            currency,
+            descending=sort_order.lower() == "desc",
+            missing_value=float('-inf'), # Используем -inf, если цены нет
+            candidates=result
+        )
+
+    return result[skip:None if limit is None else skip + limit]
 
 
 # --- READ (One) ---
@@ -73,10 +77,10 @@ async def get_product(
     """
     Возвращает один продукт по его ID.
     """
-    for product in products:
-        if product["id"] == product_id:
-            return product
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    product = product_store.get(product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return product
 
 
 # --- CREATE ---
@@ -93,13 +97,7 @@ async def create_product(
     """
     Создаёт новый продукт и добавляет его в список.
     """
-    new_id = get_next_id()
-    new_product = {
-        "id": new_id,
-        **product_data.model_dump()
-    }
-    products.append(new_product)
-    return new_product
+    return product_store.create(product_data.model_dump())
 
 
 # --- UPDATE ---
@@ -117,17 +115,11 @@ async def update_product(
     """
     Обновляет существующий продукт по ID.
     """
-    for i, product in enumerate(products):
-        if product["id"] == product_id:
-            # Обновляем, сохранив ID
-            updated_product = {
-                "id": product_id,
-                **product_data.model_dump()
-            }
-            products[i] = updated_product
-            return updated_product
-
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    # Обновляем, сохранив ID
+    updated_product = product_store.update(product_id, product_data.model_dump())
+    if updated_product is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return updated_product
 
 
 # --- DELETE ---
@@ -143,11 +135,9 @@ async def delete_product(
     """
     Удаляет продукт по ID.
     """
-    for i, product in enumerate(products):
-        if product["id"] == product_id:
-            products.pop(i)
-            return # 204 No Content
-    raise HTTPException(status_code=404, detail="Продукт не найден")
+    if not product_store.delete(product_id):
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return # 204 No Content
 
 
 # --- ROOT ---
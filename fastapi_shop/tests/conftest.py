@@ -0,0 +1,20 @@
+# tests/conftest.py
+import pytest
+from fastapi.testclient import TestClient
+from shop_common.product_store import ProductStore
+
+import main
+from data import products
+
+
+@pytest.fixture
+def store(monkeypatch) -> ProductStore:
+    """Своё хранилище на каждый тест: изменения не переходят в следующие тесты"""
+    fresh = ProductStore(products)
+    monkeypatch.setattr(main, "product_store", fresh)
+    return fresh
+
+
+@pytest.fixture
+def client(store):
+    return TestClient(main.app)
@@ -0,0 +1,56 @@
+# tests/test_products.py
+from data import products
+
+NEW_PRODUCT = {
+    "name": "Микроверсия в батарейке",
+    "description": "Целая цивилизация вырабатывает для вас электричество",
+    "prices": {"shmeckles": 42.0},
+    "image_url": "/images/microverse.webp",
+}
+
+
+def test_lists_catalog_in_creation_order(client):
+    response = client.get("/products/")
+
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [product["id"] for product in products]
+
+
+def test_create_get_update_delete(client):
+    created = client.post("/products/", json=NEW_PRODUCT).json()
+    assert created["id"] == max(product["id"] for product in products) + 1
+    assert client.get(f"/products/{created['id']}").json()["name"] == NEW_PRODUCT["name"]
+
+    updated = client.put(f"/products/{created['id']}", json={**NEW_PRODUCT, "prices": {"shmeckles": 1.0}})
+    assert updated.json()["prices"] == {"shmeckles": 1.0}
+
+    assert client.delete(f"/products/{created['id']}").status_code == 204
+    assert client.get(f"/products/{created['id']}").status_code == 404
+
+
+def test_deleted_ids_are_not_reused(client):
+    last_id = max(product["id"] for product in products)
+    client.delete(f"/products/{last_id}")
+
+    created = client.post("/products/", json=NEW_PRODUCT).json()
+
+    assert created["id"] == last_id + 1
+
+
+def test_search_is_case_insensitive(client):
+    response = client.get("/products/", params={"search": "ПЛЮМБУС"})
+
+    assert "Стандартный Плюмбус" in [product["name"] for product in response.json()]
+
+
+def test_cheapest_first_after_price_update(client, store):
+    cheapest = client.get("/products/", params={"currency": "credits", "sort_order": "asc", "limit": 1}).json()[0]
+    dearest = client.get("/products/", params={"currency": "credits", "sort_order": "desc", "limit": 1}).json()[0]
+
+    client.put(f"/products/{dearest['id']}", json={
+        **{key: dearest[key] for key in ("name", "description", "image_url")},
+        "prices": {**dearest["prices"], "credits": cheapest["prices"]["credits"] / 2},
+    })
+
+    first = client.get("/products/", params={"currency": "credits", "sort_order": "asc", "limit": 1}).json()[0]
+    assert first["id"] == dearest["id"]
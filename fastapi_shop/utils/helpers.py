@@ -1,9 +1,7 @@
-from data import products
+from utils.product_store import product_store
 
 def get_next_id():
     """
     Возвращает следующий доступный ID.
     """
-    if not products:
-        return 1
-    return max(product["id"] for product in products) + 1
\ No newline at end of file
+    return product_store.peek_next_id()
\ No newline at end of file
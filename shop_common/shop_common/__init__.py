@@ -0,0 +1,9 @@
+# shop_common/__init__.py
+"""
+Общий код приложений магазина (Home_Work_34_new, fastapi_shop, Home_Work_36–39).
+
+Устанавливается как пакет и указан в requirements.txt каждого приложения:
+    pip install -e ../shop_common
+(extras [metrics] и [telegram] — для приложений с метриками Prometheus
+и уведомлениями в Telegram).
+"""
@@ -0,0 +1,228 @@
+# shop_common/metrics.py
+import logging
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Базовая метрика с набором меток. Значения хранятся по кортежу значений меток."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счётчики по корзинам..., сумма, количество]
+        self.values: dict[tuple, list[float]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        for index, upper in enumerate(self.buckets):
+            if value <= upper:
+                state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, state in sorted(self.values.items()):
+            for index, upper in enumerate(self.buckets):
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(upper)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(state[index])}")
+            inf_labels = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса и их вывод в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "Количество HTTP-запросов", ("method", "route", "status")
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route")
+))
+HTTP_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке прямо сейчас", ("method",)
+))
+DB_QUERY_LATENCY = registry.register(Histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запроса", ("operation",), buckets=DB_BUCKETS
+))
+DB_SLOW_QUERIES = registry.register(Counter(
+    "db_slow_queries_total", "SQL-запросы дольше порога медленного запроса", ("operation",)
+))
+
+
+def route_label(scope: Scope, root_path: str) -> str:
+    """
+    Шаблон маршрута вместо фактического пути ("/api/v1/products/{product_id}"),
+    чтобы число временных рядов не росло с каждым id.
+    """
+    route = scope.get("route")
+    if route is not None:
+        # Новые версии FastAPI не копируют маршруты при include_router: в scope["route"]
+        # лежит исходный маршрут без префикса ("/api/v1"), а шаблон с префиксом —
+        # в контексте выбранного маршрута
+        context = scope.get("fastapi", {}).get("effective_route_context")
+        path_format = getattr(context, "path_format", None) or getattr(route, "path_format", None)
+        if path_format:
+            return path_format
+    # Смонтированное приложение (например, StaticFiles): метка — префикс монтирования
+    mounted = scope.get("root_path", root_path)
+    if mounted != root_path:
+        return mounted[len(root_path):] + "/*"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики HTTP: гистограмму задержки и счётчик статусов по шаблону
+    маршрута, число запросов в обработке. Время считается до конца отправки
+    тела, поэтому потоковые ответы тоже учитываются целиком.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status = 500
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc((method,))
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec((method,))
+            route = route_label(scope, root_path)
+            HTTP_LATENCY.observe((method, route), elapsed)
+            HTTP_REQUESTS.inc((method, route, str(status)))
+
+
+def install_sql_metrics(engine: AsyncEngine, slow_query_ms: Optional[float] = None) -> None:
+    """
+    Подключает к движку замер каждого SQL-запроса (события курсора) и журнал
+    медленных запросов: всё, что дольше slow_query_ms, пишется в лог с текстом запроса.
+    """
+
+    # Время старта хранится в контексте выполнения самого запроса: он живёт ровно
+    # один запрос, поэтому запрос, упавший с ошибкой, не сбивает замеры следующих
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "metrics_query_start", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERY_LATENCY.observe((operation,), elapsed)
+        if slow_query_ms is not None and elapsed * 1000 >= slow_query_ms:
+            DB_SLOW_QUERIES.inc((operation,))
+            logger.warning(f"🐢 Медленный SQL-запрос ({elapsed * 1000:.1f} мс): {' '.join(statement.split())[:500]}")
+
+
+def metrics_response() -> Response:
+    """Ответ для эндпоинта /metrics"""
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,214 @@
+# shop_common/product_store.py
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ProductStore:
+    """
+    Хранилище товаров в памяти с индексами.
+
+    - id -> товар: словарь, поиск/удаление за O(1), порядок вставки сохраняется
+    - монотонный счётчик id: удалённые id повторно не выдаются
+    - для каждой валюты — отсортированный список (цена, id), O(log n) на поиск позиции
+
+    Все изменения выполняются под блокировкой, поэтому хранилище можно
+    использовать и из async-обработчиков, и из потоков (BackgroundTasks, threadpool).
+    """
+
+    def __init__(self, initial: Iterable[dict] = ()):
+        self._lock = threading.RLock()
+        self._items: Dict[int, dict] = {}
+        self._price_index: Dict[str, List[Tuple[float, int]]] = {}
+        self._next_id = 1
+        for product in initial:
+            self._insert(dict(product))
+
+    # --- Внутренние операции (вызываются под блокировкой) ---
+
+    def _index_prices(self, product: dict) -> None:
+        for currency, price in product["prices"].items():
+            insort(self._price_index.setdefault(currency, []), (price, product["id"]))
+
+    def _unindex_prices(self, product: dict) -> None:
+        for currency, price in product["prices"].items():
+            index = self._price_index.get(currency)
+            if not index:
+                continue
+            pos = bisect_left(index, (price, product["id"]))
+            if pos < len(index) and index[pos] == (price, product["id"]):
+                del index[pos]
+            if not index:
+                del self._price_index[currency]
+
+    def _insert(self, product: dict) -> dict:
+        self._items[product["id"]] = product
+        self._index_prices(product)
+        self._next_id = max(self._next_id, product["id"] + 1)
+        return product
+
+    # --- Публичный API ---
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def peek_next_id(self) -> int:
+        """Возвращает id, который получит следующий созданный товар"""
+        return self._next_id
+
+    def all(self) -> List[dict]:
+        """Все товары в порядке создания"""
+        with self._lock:
+            return list(self._items.values())
+
+    def get(self, product_id: int) -> Optional[dict]:
+        return self._items.get(product_id)
+
+    def create(self, data: dict) -> dict:
+        """Создаёт товар с новым id"""
+        with self._lock:
+            product = {"id": self._next_id, **data}
+            return self._insert(product)
+
+    def update(self, product_id: int, data: dict) -> Optional[dict]:
+        """Полностью заменяет данные товара. Возвращает None, если товара нет"""
+        with self._lock:
+            old = self._items.get(product_id)
+            if old is None:
+                return None
+            self._unindex_prices(old)
+            product = {"id": product_id, **data}
+            self._items[product_id] = product
+            self._index_prices(product)
+            return product
+
+    def delete(self, product_id: int) -> bool:
+        """Удаляет товар. Возвращает False, если товара нет"""
+        with self._lock:
+            product = self._items.pop(product_id, None)
+            if product is None:
+                return False
+            self._unindex_prices(product)
+            return True
+
+    def currencies(self) -> List[str]:
+        """Валюты, которые есть хотя бы у одного товара"""
+        with self._lock:
+            return list(self._price_index)
+
+    def sorted_by_price(
+        self,
+        currency: str,
+        descending: bool = False,
+        missing_value: float = float("inf"),
+        candidates: Optional[List[dict]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Товары в порядке цены в указанной валюте — срез готового индекса без сортировки.
+
+        Порядок совпадает с sorted(..., key=цена или missing_value, reverse=descending):
+        товары с равной ценой и товары без цены в этой валюте идут в порядке создания.
+        Без candidates страница offset/limit берётся срезом индекса за O(limit · log n);
+        весь каталог обходится, только если страница заходит в товары без цены.
+
+        Args:
+            currency: Валюта сортировки
+            descending: Сортировка по убыванию
+            missing_value: Какой ценой считать отсутствующую (inf — в конец при asc, -inf — в начало)
+            candidates: Подмножество товаров (например, результат поиска); None — все товары
+            offset: Сколько товаров пропустить
+            limit: Размер страницы; None — до конца
+
+        Returns:
+            List[dict]: Отсортированные товары или [], если ни у одного кандидата нет этой валюты
+        """
+        # Отсутствующая цена "меньше" всех при -inf и "больше" всех при inf
+        missing_first = (missing_value > 0) == descending
+        with self._lock:
+            if candidates is not None:
+                return self._sorted_candidates(currency, descending, missing_first, candidates)[
+                    offset:None if limit is None else offset + limit
+                ]
+
+            index = self._price_index.get(currency)
+            if not index:
+                return []
+            total = len(self._items)
+            stop = total if limit is None else min(total, offset + limit)
+            if offset >= stop:
+                return []
+
+            # Страница — это пересечение [offset, stop) с двумя участками:
+            # товары с ценой (индекс) и товары без цены (в порядке создания)
+            priced = len(index)
+            missing_count = total - priced
+            if missing_first:
+                missing_range = (0, missing_count)
+                priced_start = missing_count
+            else:
+                missing_range = (priced, total)
+                priced_start = 0
+
+            lo, hi = max(offset, priced_start), min(stop, priced_start + priced)
+            ordered_ids = self._index_slice(index, lo - priced_start, hi - lo, descending) if lo < hi else []
+            lo, hi = max(offset, missing_range[0]), min(stop, missing_range[1])
+            missing = self._missing_slice(currency, lo - missing_range[0], hi - lo) if lo < hi else []
+
+            ordered = [self._items[product_id] for product_id in ordered_ids]
+            return missing + ordered if missing_first else ordered + missing
+
+    # --- Вспомогательные методы сортировки (вызываются под блокировкой) ---
+
+    @staticmethod
+    def _index_slice(index: List[Tuple[float, int]], start: int, count: int, descending: bool) -> List[int]:
+        """id товаров с позиции start в порядке цены; по убыванию равные цены остаются по возрастанию id"""
+        if not descending:
+            return [product_id for _, product_id in index[start:start + count]]
+
+        # По убыванию идут группы равных цен от дорогих к дешёвым, внутри группы — как в индексе.
+        # Группа, в которую попадает start, находится по зеркальной позиции в индексе
+        price = index[len(index) - 1 - start][0]
+        group_start = bisect_left(index, (price,))
+        group_end = bisect_right(index, (price, float("inf")))
+        position = group_start + start - (len(index) - group_end)
+
+        ids: List[int] = []
+        while len(ids) < count:
+            take = min(group_end, position + count - len(ids))
+            ids.extend(product_id for _, product_id in index[position:take])
+            if group_start == 0:
+                break
+            # Следующая (более дешёвая) группа
+            group_end = group_start
+            group_start = bisect_left(index, (index[group_end - 1][0],))
+            position = group_start
+        return ids
+
+    def _missing_slice(self, currency: str, start: int, count: int) -> List[dict]:
+        """Товары без цены в валюте в порядке создания — единственный обход всего каталога"""
+        missing = (product for product in self._items.values() if currency not in product["prices"])
+        return list(islice(missing, start, start + count))
+
+    def _sorted_candidates(
+        self, currency: str, descending: bool, missing_first: bool, candidates: List[dict]
+    ) -> List[dict]:
+        """Подмножество товаров в порядке индекса (кандидаты уже отобраны полным обходом)"""
+        ids = {product["id"] for product in candidates}
+        entries = [entry for entry in self._price_index.get(currency, []) if entry[1] in ids]
+        if not entries:
+            return []
+
+        if descending:
+            ordered_ids = []
+            for _, group in groupby(reversed(entries), key=itemgetter(0)):
+                ordered_ids.extend(reversed([product_id for _, product_id in group]))
+        else:
+            ordered_ids = [product_id for _, product_id in entries]
+
+        missing = [product for product in candidates if currency not in product["prices"]]
+        ordered = [self._items[product_id] for product_id in ordered_ids]
+        return missing + ordered if missing_first else ordered + missing
@@ -0,0 +1,243 @@
+# shop_common/telegram_dispatcher.py
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+import telegram
+from telegram.error import NetworkError, RetryAfter
+
+# Уровень и обработчики логов настраивает приложение (main.py), а не библиотечный модуль
+logger = logging.getLogger(__name__)
+
+# Максимальная длина одного сообщения в Telegram
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n———\n\n"
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate токенов в секунду, не более capacity подряд.
+    Если задан share, лимит делится на текущее число процессов, которые
+    отправляют в тот же чат (значение читается при каждом запросе токена).
+    """
+
+    def __init__(self, rate: float, capacity: int, share: Optional[Callable[[], int]] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.share = share
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Ждёт, пока появится свободный токен, и забирает его"""
+        while True:
+            processes = max(1, self.share()) if self.share else 1
+            rate = self.rate / processes
+            capacity = max(1, self.capacity // processes)
+            now = time.monotonic()
+            self.tokens = min(capacity, self.tokens + (now - self.updated_at) * rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / rate)
+
+
+class TelegramDispatcher:
+    """
+    Долгоживущий отправщик уведомлений.
+
+    - один клиент telegram.Bot (одно HTTP-соединение) на всё приложение
+    - сообщения складываются в asyncio.Queue и не задерживают обработчики запросов
+    - сообщения, пришедшие в пределах окна, объединяются в одну сводку
+    - частота отправки в каждый чат ограничивается token bucket
+    - при сетевых ошибках и RetryAfter — повтор с экспоненциальной задержкой
+    - при остановке очередь дописывается не дольше drain_timeout секунд
+
+    Настройки (токен, чат, лимиты) передаются в конструктор — каждое приложение
+    создаёт свой экземпляр из своего config (см. utils/telegram.py приложений).
+    """
+
+    def __init__(
+        self,
+        token: Optional[str],
+        chat_id: Optional[str],
+        base_url: Optional[str] = None,
+        window_seconds: float = 2.0,
+        max_batch: int = 20,
+        rate_per_second: float = 1.0,
+        burst: int = 3,
+        max_retries: int = 5,
+        drain_timeout: float = 10.0,
+        bot: Optional[telegram.Bot] = None,
+    ):
+        self.token = token
+        self.chat_id = chat_id
+        self.base_url = base_url
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.drain_timeout = drain_timeout
+
+        self.processes: Optional[Callable[[], int]] = None
+
+        self.bot = bot
+        self.queue: Optional[asyncio.Queue] = None
+        self.buckets: dict[str, TokenBucket] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {"queued": 0, "sent": 0, "digests": 0, "retries": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def share_rate(self, processes: Callable[[], int]) -> None:
+        """
+        Делит лимит частоты на чат между процессами, в каждом из которых
+        работает свой диспетчер (несколько воркеров serve.py).
+        processes возвращает текущее число процессов — оно меняется при TTIN/TTOU.
+        """
+        self.processes = processes
+
+    async def start(self) -> None:
+        """
+        Создаёт клиента бота и запускает фоновую задачу отправки.
+        Сеть здесь не используется: недоступный Telegram не должен мешать запуску API,
+        поэтому бот инициализируется при первой отправке (см. send_with_retry).
+        """
+        if self.running:
+            return
+        if self.bot is None:
+            if not self.token:
+                logger.warning("⚠️ Токен Telegram не задан — уведомления отключены")
+                return
+            kwargs = {"base_url": self.base_url} if self.base_url else {}
+            self.bot = telegram.Bot(token=self.token, **kwargs)
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self.run())
+        logger.info("✅ Диспетчер уведомлений Telegram запущен")
+
+    async def stop(self) -> None:
+        """
+        Отправляет то, что осталось в очереди, и закрывает клиента.
+        Ждём не дольше drain_timeout секунд: при недоступном Telegram повторы
+        с задержкой иначе задержали бы остановку приложения на минуты.
+        """
+        if self.task is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                dropped = self.queue.qsize()
+                self.stats["dropped"] += dropped
+                logger.warning(
+                    f"⚠️ Очередь уведомлений не отправлена за {self.drain_timeout} с — "
+                    f"пропущено сообщений: {dropped} (и прерывается текущая пачка)"
+                )
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.bot is not None:
+            await self.bot.shutdown()
+        logger.info("🛑 Диспетчер уведомлений Telegram остановлен")
+
+    def enqueue(self, message: str, parse_mode: Optional[str] = "Markdown", chat_id: Optional[str] = None) -> None:
+        """Ставит сообщение в очередь, не дожидаясь отправки"""
+        if not self.running:
+            logger.warning("⚠️ Диспетчер Telegram не запущен — сообщение пропущено")
+            return
+        self.queue.put_nowait((chat_id or self.chat_id, parse_mode, message))
+        self.stats["queued"] += 1
+
+    async def run(self) -> None:
+        """Основной цикл: собираем пачку за окно и отправляем сводки"""
+        while True:
+            first = await self.queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self.flush(batch)
+            except Exception as e:
+                logger.error(f"❌ Ошибка отправки пачки уведомлений: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def flush(self, batch: list[tuple]) -> None:
+        """Группирует пачку по чату и режиму разметки и отправляет сводки"""
+        groups: dict[tuple, list[str]] = {}
+        for chat_id, parse_mode, message in batch:
+            groups.setdefault((chat_id, parse_mode), []).append(message)
+
+        for (chat_id, parse_mode), messages in groups.items():
+            for text in self.build_digests(messages):
+                await self.send_with_retry(chat_id, text, parse_mode)
+
+    def build_digests(self, messages: list[str]) -> list[str]:
+        """Склеивает сообщения в сводки, не превышая лимит длины Telegram"""
+        if len(messages) == 1:
+            return [messages[0][:TELEGRAM_MAX_MESSAGE_LENGTH]]
+
+        self.stats["digests"] += 1
+        digests: list[str] = []
+        current = ""
+        for message in messages:
+            candidate = message if not current else current + DIGEST_SEPARATOR + message
+            if len(candidate) > TELEGRAM_MAX_MESSAGE_LENGTH and current:
+                digests.append(current)
+                current = message
+            else:
+                current = candidate
+        digests.append(current[:TELEGRAM_MAX_MESSAGE_LENGTH])
+
+        header = f"📬 *Сводка уведомлений ({len(messages)})*\n\n"
+        if len(header) + len(digests[0]) <= TELEGRAM_MAX_MESSAGE_LENGTH:
+            digests[0] = header + digests[0]
+        return digests
+
+    async def send_with_retry(self, chat_id: str, text: str, parse_mode: Optional[str]) -> None:
+        bucket = self.buckets.setdefault(chat_id, TokenBucket(self.rate_per_second, self.burst, self.processes))
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                # Повторный вызов ничего не делает; сетевая ошибка повторится вместе с отправкой
+                await self.bot.initialize()
+                await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                self.stats["sent"] += 1
+                logger.info(f'Сообщение "{text[:50]}..." отправлено в чат {chat_id}')
+                return
+            except RetryAfter as e:
+                # Telegram сам говорит, сколько подождать
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+            except NetworkError as e:
+                # Включает TimedOut: временная проблема, пробуем ещё раз
+                delay = min(2 ** attempt * 0.5, 30)
+                logger.warning(f"⚠️ Сетевая ошибка Telegram (попытка {attempt + 1}): {e}")
+            except Exception as e:
+                # BadRequest, Forbidden и т.п. — повтор не поможет.
+                # Ошибка одной сводки не должна терять остальные сообщения пачки
+                self.stats["failed"] += 1
+                logger.error(f"Ошибка отправки сообщения в чат {chat_id}: {e}")
+                return
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+        self.stats["failed"] += 1
+        logger.error(f"Сообщение в чат {chat_id} не отправлено после {self.max_retries} повторов")
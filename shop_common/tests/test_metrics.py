@@ -0,0 +1,95 @@
+# tests/test_metrics.py
+import asyncio
+import re
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from shop_common.metrics import MetricsMiddleware, install_sql_metrics, metrics_response, registry
+
+
+def sample(name: str, **labels: str) -> float:
+    """Значение временного ряда из вывода /metrics (0, если ряда ещё нет)"""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    for line in registry.render().splitlines():
+        match = re.fullmatch(rf"{name}\{{(.*)\}} (\S+)", line)
+        if match and match.group(1) == wanted:
+            return float(match.group(2))
+    return 0.0
+
+
+@pytest.fixture
+def client(tmp_path):
+    products = APIRouter()
+    admin = APIRouter()
+
+    @products.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    # Тот же путь в другом роутере — метки не должны смешиваться
+    @admin.get("/items/{item_id}")
+    async def read_admin_item(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(products, prefix="/api/v1")
+    app.include_router(admin, prefix="/admin")
+    app.mount("/static", StaticFiles(directory=tmp_path), name="static")
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics")
+    async def metrics():
+        return metrics_response()
+
+    return TestClient(app)
+
+
+def test_requests_are_labelled_by_route_template(client):
+    before = sample("http_requests_total", method="GET", route="/api/v1/items/{item_id}", status="200")
+
+    for item_id in (1, 2, 3):
+        assert client.get(f"/api/v1/items/{item_id}").status_code == 200
+    client.get("/admin/items/1")
+
+    assert sample("http_requests_total", method="GET", route="/api/v1/items/{item_id}", status="200") == before + 3
+    assert sample("http_requests_total", method="GET", route="/admin/items/{item_id}", status="200") >= 1
+
+
+def test_unknown_and_mounted_paths_do_not_create_series_per_path(client):
+    before_unmatched = sample("http_requests_total", method="GET", route="unmatched", status="404")
+    before_static = sample("http_requests_total", method="GET", route="/static/*", status="404")
+
+    client.get("/no/such/path")
+    client.get("/static/missing.png")
+
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") == before_unmatched + 1
+    assert sample("http_requests_total", method="GET", route="/static/*", status="404") == before_static + 1
+
+
+def test_metrics_endpoint_uses_prometheus_format(client):
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+def test_sql_timing_survives_failed_queries():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        install_sql_metrics(engine)
+        async with engine.connect() as conn:
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM no_such_table"))
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    before = sample("db_query_duration_seconds_count", operation="SELECT")
+    asyncio.run(scenario())
+
+    # Упавший запрос не замеряется, успешный — ровно один раз
+    assert sample("db_query_duration_seconds_count", operation="SELECT") == before + 1
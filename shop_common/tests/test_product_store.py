@@ -0,0 +1,90 @@
+# tests/test_product_store.py
+import random
+
+import pytest
+
+from shop_common.product_store import ProductStore
+
+
+def make_products(count: int, seed: int) -> list[dict]:
+    """Товары с повторяющимися ценами и без цены в части валют"""
+    rng = random.Random(seed)
+    products = []
+    for product_id in range(1, count + 1):
+        prices = {}
+        for currency in ("USD", "EUR"):
+            if rng.random() < 0.8:
+                prices[currency] = float(rng.randint(1, 8))
+        products.append({"id": product_id, "name": f"Товар {product_id}", "prices": prices})
+    return products
+
+
+def reference_order(products: list[dict], currency: str, descending: bool, missing_value: float) -> list[int]:
+    ordered = sorted(products, key=lambda product: product["prices"].get(currency, missing_value), reverse=descending)
+    return [product["id"] for product in ordered]
+
+
+def ids(products: list[dict]) -> list[int]:
+    return [product["id"] for product in products]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("missing_value", [float("inf"), float("-inf")])
+def test_sorted_by_price_matches_sorted(seed, descending, missing_value):
+    products = make_products(40, seed)
+    store = ProductStore(products)
+    expected = reference_order(products, "USD", descending, missing_value)
+
+    assert ids(store.sorted_by_price("USD", descending, missing_value)) == expected
+
+    # Любая страница — срез полного порядка, в том числе на границе товаров без цены
+    for offset in range(0, 45, 3):
+        for limit in (1, 4, 7):
+            page = store.sorted_by_price("USD", descending, missing_value, offset=offset, limit=limit)
+            assert ids(page) == expected[offset:offset + limit], (offset, limit)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_candidates_keep_the_same_order(descending):
+    products = make_products(30, seed=7)
+    store = ProductStore(products)
+    candidates = [product for product in products if product["id"] % 3]
+
+    result = store.sorted_by_price("EUR", descending, candidates=candidates, offset=2, limit=10)
+
+    assert ids(result) == reference_order(candidates, "EUR", descending, float("inf"))[2:12]
+
+
+def test_unknown_currency_gives_empty_list():
+    store = ProductStore(make_products(5, seed=1))
+    assert store.sorted_by_price("GBP") == []
+
+
+def test_update_and_delete_keep_price_index_in_sync():
+    store = ProductStore()
+    cheap = store.create({"name": "Дешёвый", "prices": {"USD": 1.0}})
+    dear = store.create({"name": "Дорогой", "prices": {"USD": 9.0}})
+
+    store.update(cheap["id"], {"name": "Подорожал", "prices": {"USD": 20.0}})
+    assert ids(store.sorted_by_price("USD")) == [dear["id"], cheap["id"]]
+
+    store.update(dear["id"], {"name": "Только евро", "prices": {"EUR": 5.0}})
+    assert ids(store.sorted_by_price("USD")) == [cheap["id"], dear["id"]]
+    assert sorted(store.currencies()) == ["EUR", "USD"]
+
+    assert store.delete(dear["id"])
+    assert store.currencies() == ["USD"]
+    assert ids(store.sorted_by_price("USD")) == [cheap["id"]]
+
+
+def test_ids_are_not_reused_after_delete():
+    store = ProductStore(make_products(3, seed=2))
+    assert store.delete(3)
+
+    created = store.create({"name": "Новый", "prices": {}})
+
+    assert created["id"] == 4
+    assert store.get(3) is None
+    assert not store.delete(3)
+    assert ids(store.all()) == [1, 2, 4]
@@ -0,0 +1,93 @@
+# tests/test_telegram_dispatcher.py
+import asyncio
+import time
+
+from shop_common.telegram_dispatcher import TELEGRAM_MAX_MESSAGE_LENGTH, TelegramDispatcher, TokenBucket
+
+
+class FakeBot:
+    """Заменяет telegram.Bot: запоминает отправленное, может «зависать» на отправке"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[str] = []
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def send_message(self, chat_id, text, parse_mode=None) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+
+def dispatcher(bot: FakeBot, **kwargs) -> TelegramDispatcher:
+    options = {"window_seconds": 0.05, "rate_per_second": 1000, "burst": 1000, **kwargs}
+    return TelegramDispatcher(token=None, chat_id="1", bot=bot, **options)
+
+
+def test_messages_within_window_are_sent_as_one_digest():
+    async def scenario():
+        bot = FakeBot()
+        notifier = dispatcher(bot)
+        await notifier.start()
+        for number in range(5):
+            notifier.enqueue(f"Сообщение {number}")
+        await notifier.stop()
+        return bot.sent, notifier.stats
+
+    sent, stats = asyncio.run(scenario())
+
+    assert len(sent) == 1
+    assert sent[0].startswith("📬 *Сводка уведомлений (5)*")
+    assert all(f"Сообщение {number}" in sent[0] for number in range(5))
+    assert stats["sent"] == 1 and stats["queued"] == 5
+
+
+def test_digests_respect_telegram_length_limit():
+    notifier = dispatcher(FakeBot())
+    messages = [f"{number}:" + "x" * 1500 for number in range(7)]
+
+    digests = notifier.build_digests(messages)
+
+    assert len(digests) > 1
+    assert all(len(digest) <= TELEGRAM_MAX_MESSAGE_LENGTH for digest in digests)
+    assert all(any(message in digest for digest in digests) for message in messages)
+
+
+def test_stop_gives_up_after_drain_timeout():
+    async def scenario():
+        notifier = dispatcher(FakeBot(delay=10), drain_timeout=0.2)
+        await notifier.start()
+        notifier.enqueue("первое")
+        await asyncio.sleep(0.1)
+        notifier.enqueue("второе")
+        started = time.monotonic()
+        await notifier.stop()
+        return time.monotonic() - started, notifier.stats
+
+    elapsed, stats = asyncio.run(scenario())
+
+    assert elapsed < 1
+    assert stats["dropped"] == 1
+
+
+def test_token_bucket_splits_rate_between_processes():
+    async def tokens_in(seconds: float, processes: int) -> int:
+        bucket = TokenBucket(rate=20, capacity=4, share=lambda: processes)
+        taken = 0
+        deadline = time.monotonic() + seconds
+        while True:
+            await bucket.acquire()
+            if time.monotonic() > deadline:
+                return taken
+            taken += 1
+
+    alone = asyncio.run(tokens_in(0.5, 1))
+    shared = asyncio.run(tokens_in(0.5, 4))
+
+    # 4 + 20·0.5 = 14 токенов в одиночку, 1 + 5·0.5 ≈ 3 на четверых
+    assert 12 <= alone <= 15
+    assert 2 <= shared <= 4